@@ -1,10 +1,20 @@
 import sys
 import os
+import time
 import tkinter as tk
 from tkinter import messagebox
 from youtube_stopper import YouTubeBlocker
+from blocker_daemon import connect_blocker, daemon_available
+from blocklist_formats import normalize_rule
+from blocker_worker import BlockerWorker
+from blocklist_view import VirtualListView
 from motivation_widget import MotivationWidget
 from pomodoro_widget import PomodoroWidget
+from tick_service import TickService
+from refresh_manager import RefreshManager
+from session_history import format_duration
+from session_history import block_and_record, unblock_and_record
+from instrumentation import format_operation, serve_metrics_from_env
 
 def is_admin():
     try:
@@ -77,7 +87,7 @@ def run_as_admin():
             return False
 
 class YouTubeStopperApp:
-    def __init__(self, root):
+    def __init__(self, root, blocker=None, history=None, on_hide=None):
         self.root = root
         self.root.title("🎯 YouTube Stopper")
         self.root.geometry("520x800")  # Increased height for better layout
@@ -87,13 +97,57 @@ class YouTubeStopperApp:
         # Set window icon if available and center the window
         self.center_window()
         
-        self.blocker = YouTubeBlocker()
+        # In tray mode the blocker and history outlive the window and are handed in
+        self.owns_state = blocker is None
+        if self.owns_state:
+            # Use the background daemon when it is running, otherwise block in-process
+            blocker = connect_blocker() or YouTubeBlocker()
+            # Serve status checks from memory, invalidated by a file watcher
+            blocker.start_watching()
+            # Put the hosts section back if another program edits it
+            blocker.start_watchdog()
+            # Focus sessions and Pomodoro cycles, kept across restarts by
+            # whichever blocker records them (this process or the daemon)
+            history = blocker.open_history()
+        self.blocker = blocker
+        self.history = history
+        # With a tray icon, closing the window hides it to the tray
+        self.on_hide = on_hide
+        self.root.protocol("WM_DELETE_WINDOW", self.hide_to_tray if on_hide else self.on_close)
+        # All blocker I/O runs on a worker thread so the window never freezes
+        self.worker = BlockerWorker(self.root, on_busy_changed=self.set_busy)
+        # Cosmetic redraws pause while the window is hidden; one
+        # once-a-second tick drives every timer label
+        self.refresh = RefreshManager(self.root)
+        self.ticker = TickService(self.root, refresh=self.refresh)
         self.create_widgets()
         self.update_status()
         
         # Add hover effects for better UX
         self.add_hover_effects()
         
+    def on_close(self):
+        """Stop background watchers and report cache savings before exiting"""
+        print(f"📊 Status cache avoided {self.blocker.cache_hits} disk reads this session")
+        self.teardown()
+        if self.owns_state:
+            self.blocker.close()
+            self.history.close()
+
+    def hide_to_tray(self):
+        """Destroy the whole window; the tray icon keeps the blocker running"""
+        self.on_hide()
+        self.teardown()
+
+    def teardown(self):
+        wakeups = self.refresh.stats()
+        print(f"⏰ Timer wake-ups: {wakeups['visible_per_minute']:.1f}/min visible, "
+              f"{wakeups['hidden_per_minute']:.1f}/min hidden")
+        self.worker.shutdown()
+        # Flush results must not reach widgets that no longer exist
+        self.blocker.set_flush_callback(None)
+        self.root.destroy()
+
     def center_window(self):
         """Center the window on the screen"""
         self.root.update_idletasks()
@@ -127,8 +181,20 @@ class YouTubeStopperApp:
         self.session_label = tk.Label(self.root, text="Session: Not started", bg="#232946", fg="#b8c1ec", font=("Segoe UI", 11))
         self.session_label.pack(pady=5)
 
-        self.time_label = tk.Label(self.root, text="Time Blocked: 00:00:00", bg="#232946", fg="#b8c1ec", font=("Segoe UI", 11, "bold"))
-        self.time_label.pack(pady=(5, 20))
+        time_frame = tk.Frame(self.root, bg="#232946")
+        time_frame.pack(pady=(5, 4))
+        self.time_label = tk.Label(time_frame, text="Time Blocked Today: 00:00:00", bg="#232946", fg="#b8c1ec", font=("Segoe UI", 11, "bold"))
+        self.time_label.pack(side="left")
+        self.stats_btn = tk.Button(
+            time_frame, text="📊 Stats", command=self.show_stats,
+            bg="#2c3454", fg="#eebbc3", font=("Segoe UI", 9), bd=0, relief="flat", cursor="hand2"
+        )
+        self.stats_btn.pack(side="left", padx=(8, 0))
+
+        # DNS flushes run in the background and report back here
+        self.flush_label = tk.Label(self.root, text="", bg="#232946", fg="#b8c1ec", font=("Segoe UI", 9))
+        self.flush_label.pack(pady=(0, 12))
+        self.blocker.set_flush_callback(lambda result: self.root.after(0, self.show_flush_result, result))
 
         # Add a frame for a modern border effect
         border = tk.Frame(self.root, bg="#eebbc3", height=2)
@@ -138,10 +204,8 @@ class YouTubeStopperApp:
         self.footer = tk.Label(self.root, text="Made with 💌 by Aymal Khalid Khan", bg="#232946", fg="#eebbc3", font=("Segoe UI", 9))
         self.footer.pack(side="bottom", pady=8)
 
-        self.session_active = False
-        self.session_start = None
-        self.session_seconds = 0
-        self.update_timer()
+        self.resume_session()
+        self.ticker.subscribe(self.update_timer)
 
         # Motivation widget with visual separator
         separator1 = tk.Frame(self.root, bg="#3d4465", height=1)
@@ -150,14 +214,15 @@ class YouTubeStopperApp:
         motivation_header = tk.Label(self.root, text="💪 Daily Motivation", bg="#232946", fg="#eebbc3", font=("Segoe UI", 11, "bold"))
         motivation_header.pack(pady=(0, 10))
         
-        self.motivation_label = MotivationWidget(self.root, bg="#232946", fg="#fffffe", font=("Segoe UI", 11, "italic"), wraplength=340, justify="center")
+        self.motivation_label = MotivationWidget(self.root, refresh=self.refresh, bg="#232946", fg="#fffffe", font=("Segoe UI", 11, "italic"), wraplength=340, justify="center")
         self.motivation_label.pack(pady=(0, 20))
 
         # Pomodoro widget with visual separator
         separator2 = tk.Frame(self.root, bg="#3d4465", height=1)
         separator2.pack(fill="x", padx=40, pady=(0, 15))
         
-        self.pomodoro_widget = PomodoroWidget(self.root)
+        self.pomodoro_widget = PomodoroWidget(self.root, on_focus_complete=self.history.record_pomodoro,
+                                              ticker=self.ticker)
         self.pomodoro_widget.pack(pady=(0, 20))
 
         # Custom blocklist UI with better styling
@@ -170,13 +235,23 @@ class YouTubeStopperApp:
         # Create a frame for the listbox with padding - reduced height for better fit
         listbox_frame = tk.Frame(self.root, bg="#2c3454", relief="flat", bd=1)
         listbox_frame.pack(pady=(0, 8), padx=30, fill="x")
-        
-        self.custom_blocklist_listbox = tk.Listbox(
-            listbox_frame, bg="#2c3454", fg="#fffffe", 
-            selectbackground="#eebbc3", selectforeground="#232946", 
-            font=("Segoe UI", 10), height=3, bd=0, highlightthickness=0  # Reduced height from 4 to 3
-        )
-        self.custom_blocklist_listbox.pack(pady=6, padx=6, fill="x")  # Reduced padding
+
+        # Search box: filters the list as you type
+        search_frame = tk.Frame(listbox_frame, bg="#2c3454")
+        search_frame.pack(pady=(6, 0), padx=6, fill="x")
+        tk.Label(search_frame, text="🔍", bg="#2c3454", fg="#b8c1ec", font=("Segoe UI", 9)).pack(side="left")
+        self.blocklist_search_var = tk.StringVar()
+        self.blocklist_search_var.trace_add("write", lambda *_: self.filter_custom_blocklist())
+        tk.Entry(
+            search_frame, textvariable=self.blocklist_search_var, font=("Segoe UI", 9),
+            bg="#232946", fg="#fffffe", insertbackground="#fffffe", bd=0, relief="flat"
+        ).pack(side="left", fill="x", expand=True, padx=(4, 8))
+        self.blocklist_count_label = tk.Label(search_frame, text="", bg="#2c3454", fg="#b8c1ec", font=("Segoe UI", 9))
+        self.blocklist_count_label.pack(side="right")
+
+        # Only the visible rows are drawn, so large lists stay fast
+        self.custom_blocklist_view = VirtualListView(listbox_frame, height=3)
+        self.custom_blocklist_view.pack(pady=6, padx=6, fill="x")  # Reduced padding
         
         self.update_custom_blocklist_listbox()
         
@@ -226,35 +301,88 @@ class YouTubeStopperApp:
         else:
             self.unblock_youtube()
 
+    def set_busy(self, busy):
+        """Disable the controls and show progress while a background job runs"""
+        state = "disabled" if busy else "normal"
+        for widget in (self.toggle_button, self.add_btn, self.remove_btn):
+            widget.config(state=state)
+        self.root.config(cursor="watch" if busy else "")
+        if busy:
+            self.status_label.config(text="Status: ⏳ Working...", fg="#b8c1ec")
+        else:
+            self.update_status()
+
+    def show_job_error(self, error):
+        self.show_error_message("❌ Operation Failed", f"Something went wrong:\n\n{error}")
+
+    def resume_session(self):
+        """Pick up a session left open when the app was last closed"""
+        start = self.history.open_session
+        if start is None:
+            return
+        if self.blocker.is_blocked():
+            self.session_label.config(text=f"Session: Started at {time.strftime('%H:%M:%S', time.localtime(start))}")
+        else:
+            # Unblocked while the app was closed; when exactly is unknown
+            self.history.end_session(start)
+
+    def relaunch_if_needed(self):
+        """
+        Without admin rights the blocker would relaunch the app elevated and
+        exit from the worker thread. Do it here instead: ask, start the
+        elevated copy and close this window cleanly. Returns True if the
+        operation cannot go ahead.
+        """
+        if not self.blocker.needs_admin():
+            return False
+        if not messagebox.askyesno("🔐 Admin Rights Needed",
+                                   "Changing the hosts file needs administrator rights.\n\n"
+                                   "Restart YouTube Stopper as administrator?"):
+            self.update_status()
+            return True
+        try:
+            relaunched = run_as_admin()
+        except SystemExit:
+            # The elevated copy is starting; this one steps aside
+            self.on_close()
+            raise
+        if not relaunched:
+            self.show_error_message("❌ Admin Rights Needed",
+                                    "Could not restart with admin rights. Please run as administrator.")
+            self.update_status()
+        return True
+
     def block_youtube(self):
-        if self.blocker.block_youtube():
+        if self.relaunch_if_needed():
+            return
+        self.worker.submit(block_and_record, self.blocker, self.history,
+                           on_done=self.on_block_done, on_error=self.show_job_error)
+
+    def on_block_done(self, success):
+        if success:
             # Success feedback with better UX
             self.show_success_message("✅ YouTube Blocked Successfully", "Focus mode activated! YouTube is now blocked.")
-            if not self.session_active:
-                self.session_active = True
-                from datetime import datetime
-                self.session_start = datetime.now()
-                self.session_label.config(text=f"Session: Started at {self.session_start.strftime('%H:%M:%S')}")
+            start = self.history.open_session
+            if start is not None:
+                self.session_label.config(text=f"Session: Started at {time.strftime('%H:%M:%S', time.localtime(start))}")
         else:
             self.show_error_message("❌ Blocking Failed", "Could not block YouTube. Please run as administrator.")
         self.update_status()
 
     def unblock_youtube(self):
-        if self.blocker.unblock_youtube():
+        if self.relaunch_if_needed():
+            return
+        self.worker.submit(unblock_and_record, self.blocker, self.history,
+                           on_done=self.on_unblock_done, on_error=self.show_job_error)
+
+    def on_unblock_done(self, result):
+        success, elapsed = result
+        if success:
             # Success feedback with session summary
             session_summary = ""
-            if self.session_active:
-                self.session_active = False
-                from datetime import datetime
-                end_time = datetime.now()
-                if self.session_start:
-                    elapsed = (end_time - self.session_start).total_seconds()
-                    self.session_seconds += int(elapsed)
-                    hours = int(elapsed // 3600)
-                    minutes = int((elapsed % 3600) // 60)
-                    session_summary = f"\n\nSession Duration: {hours:02d}:{minutes:02d}:{int(elapsed % 60):02d}"
-                self.session_label.config(text=f"Session: Ended at {end_time.strftime('%H:%M:%S')}")
-                self.session_start = None
+            if elapsed:
+                session_summary = f"\n\nSession Duration: {format_duration(elapsed)}"
+                self.session_label.config(text=f"Session: Ended at {time.strftime('%H:%M:%S')}")
             
             self.show_success_message("🔓 YouTube Unblocked", f"YouTube is now accessible.{session_summary}")
         else:
@@ -269,6 +397,13 @@ class YouTubeStopperApp:
         """Show a styled error message"""
         messagebox.showerror(title, message)
 
+    def show_flush_result(self, result):
+        """Show the outcome of a background DNS flush"""
+        if result.ok:
+            self.flush_label.config(text=f"🔄 DNS cache flushed in {result.latency * 1000:.0f} ms", fg="#b8c1ec")
+        else:
+            self.flush_label.config(text="⚠️ Could not flush DNS cache - restart your browser if sites still load", fg="#fb7185")
+
     def update_status(self):
         if self.blocker.is_blocked():
             self.status_label.config(text="Status: ✅ YouTube Blocked", fg="#4ade80")  # Success green
@@ -279,78 +414,153 @@ class YouTubeStopperApp:
             self.toggle_var.set(0)
             self.toggle_button.config(text="Block YouTube", bg="#86efac")  # Light green
 
-    def update_timer(self):
-        if self.session_active and self.session_start:
-            from datetime import datetime
-            elapsed = (datetime.now() - self.session_start).total_seconds() + self.session_seconds
-        else:
-            elapsed = self.session_seconds
-        h = int(elapsed // 3600)
-        m = int((elapsed % 3600) // 60)
-        s = int(elapsed % 60)
-        self.time_label.config(text=f"Time Blocked: {h:02d}:{m:02d}:{s:02d}")
-        self.root.after(1000, self.update_timer)
+    def update_timer(self, now=None):
+        """Tick subscriber: today's total, redrawn only when the text changes"""
+        elapsed = self.history.today_seconds()
+        self.ticker.set_text(self.time_label, f"Time Blocked Today: {format_duration(elapsed)}")
+
+    def show_stats(self):
+        """Show focus totals for today, the week and the year"""
+        summary = self.history.summary()
+        window = tk.Toplevel(self.root)
+        window.title("📊 Focus Stats")
+        window.configure(bg="#232946")
+        window.resizable(False, False)
+
+        rows = [
+            ("Today", format_duration(summary["today"])),
+            ("Last 7 days", format_duration(summary["week"])),
+            ("Last 365 days", format_duration(summary["year"])),
+            ("Sessions", str(summary["sessions"])),
+            ("Pomodoro cycles", str(summary["pomodoros"])),
+            ("Active days", str(summary["active_days"])),
+            ("Wake-ups (last minute)", str(self.refresh.wakeups_per_minute())),
+        ]
+        for row, (name, value) in enumerate(rows):
+            tk.Label(window, text=name, bg="#232946", fg="#b8c1ec", font=("Segoe UI", 10)).grid(
+                row=row, column=0, sticky="w", padx=(20, 10), pady=2)
+            tk.Label(window, text=value, bg="#232946", fg="#fffffe", font=("Segoe UI", 10, "bold")).grid(
+                row=row, column=1, sticky="e", padx=(10, 20), pady=2)
+
+        # The last few weeks, straight from the weekly rollup
+        weeks = self.history.weekly_totals(weeks=8)
+        if weeks:
+            tk.Label(window, text="Recent weeks", bg="#232946", fg="#eebbc3", font=("Segoe UI", 10, "bold")).grid(
+                row=len(rows), column=0, columnspan=2, pady=(12, 4))
+            for offset, (week, seconds, _, _) in enumerate(reversed(weeks)):
+                row = len(rows) + 1 + offset
+                tk.Label(window, text=week, bg="#232946", fg="#b8c1ec", font=("Segoe UI", 9)).grid(
+                    row=row, column=0, sticky="w", padx=(20, 10))
+                tk.Label(window, text=format_duration(seconds), bg="#232946", fg="#fffffe", font=("Segoe UI", 9)).grid(
+                    row=row, column=1, sticky="e", padx=(10, 20))
+        # Recent blocker operations, when YOUTUBE_STOPPER_TRACE is on
+        try:
+            timings = self.blocker.get_timings(5)
+        except Exception:
+            timings = []
+        row = len(rows) + len(weeks) + 2
+        if timings:
+            tk.Label(window, text="Recent operations", bg="#232946", fg="#eebbc3", font=("Segoe UI", 10, "bold")).grid(
+                row=row, column=0, columnspan=2, pady=(12, 4))
+            for record in reversed(timings):
+                row += 1
+                tk.Label(window, text=format_operation(record), bg="#232946", fg="#b8c1ec",
+                         font=("Consolas", 9), justify="left").grid(
+                    row=row, column=0, columnspan=2, sticky="w", padx=20)
+            row += 1
+        tk.Button(window, text="Close", command=window.destroy, bg="#eebbc3", fg="#232946",
+                  font=("Segoe UI", 10), bd=0, relief="flat", width=10).grid(
+            row=row, column=0, columnspan=2, pady=12)
 
     def update_custom_blocklist_listbox(self):
-        self.custom_blocklist_listbox.delete(0, tk.END)
-        for domain in self.blocker.get_custom_domains():
-            self.custom_blocklist_listbox.insert(tk.END, domain)
+        """Load the whole list once; later edits are applied one row at a time"""
+        self.custom_blocklist_view.set_items(self.blocker.get_custom_domains())
+        self.update_blocklist_count()
+
+    def filter_custom_blocklist(self):
+        self.custom_blocklist_view.set_filter(self.blocklist_search_var.get())
+        self.update_blocklist_count()
+
+    def update_blocklist_count(self):
+        view = self.custom_blocklist_view
+        total = len(view)
+        if view.query:
+            self.blocklist_count_label.config(text=f"{view.match_count():,} of {total:,}")
+        else:
+            self.blocklist_count_label.config(text=f"{total:,} site{'s' if total != 1 else ''}")
 
     def add_custom_domain(self):
         domain = self.custom_blocklist_entry.get().strip()
         if domain:
-            # Basic validation
-            if self.validate_domain(domain):
+            # Basic validation; the list shows the domain as it is stored
+            rule = self.validate_domain(domain)
+            if rule:
+                domain = rule
                 # Check for duplicates
-                existing_domains = self.blocker.get_custom_domains()
-                if domain not in existing_domains:
-                    self.blocker.add_custom_domain(domain)
-                    self.update_custom_blocklist_listbox()
+                if not self.blocker.has_custom_domain(domain):
                     self.custom_blocklist_entry.delete(0, tk.END)
-                    
-                    # Enhanced feedback message
-                    if self.blocker.is_blocked():
-                        messagebox.showinfo("✅ Domain Added", 
-                            f"Added '{domain}' to custom blocklist!\n\n"
-                            f"The domain is now blocked. You may need to:\n"
-                            f"• Clear your browser cache\n"
-                            f"• Restart your browser\n"
-                            f"• Wait a few seconds for DNS changes to take effect")
-                    else:
-                        messagebox.showinfo("✅ Domain Added", 
-                            f"Added '{domain}' to custom blocklist!\n\n"
-                            f"The domain will be blocked when you activate YouTube blocking.")
+                    # Edits queued back to back share one hosts file write
+                    self.worker.submit(self.blocker.add_custom_domain, domain,
+                                       on_done=lambda added: self.on_domain_added(domain, added),
+                                       on_error=self.show_job_error, batch=self.blocker.batch)
                 else:
                     messagebox.showwarning("⚠️ Duplicate Domain", f"'{domain}' is already in your blocklist!")
             else:
-                messagebox.showerror("❌ Invalid Domain", f"'{domain}' is not a valid domain format!\n\nExamples:\n• youtube.com\n• www.example.org\n• subdomain.site.net")
+                messagebox.showerror("❌ Invalid Domain", f"'{domain}' is not a valid domain format!\n\nExamples:\n• youtube.com\n• www.example.org\n• subdomain.site.net\n• *.example.com (all subdomains)\n• !accounts.example.com (exception)")
         else:
             messagebox.showwarning("⚠️ Empty Input", "Please enter a domain to block!")
 
-    def remove_selected_custom_domain(self):
-        selection = self.custom_blocklist_listbox.curselection()
-        if selection:
-            domain = self.custom_blocklist_listbox.get(selection[0])
-            self.blocker.remove_custom_domain(domain)
+    def on_domain_added(self, domain, added):
+        if not added:
+            messagebox.showerror("❌ Domain Not Added", f"'{domain}' could not be added to your blocklist.")
             self.update_custom_blocklist_listbox()
-            
-            # Enhanced feedback message
-            if self.blocker.is_blocked():
-                messagebox.showinfo("🗑️ Domain Removed", 
-                    f"Removed '{domain}' from blocklist!\n\n"
-                    f"The domain has been removed from your hosts file.\n"
-                    f"You should now be able to access it again.")
-            else:
-                messagebox.showinfo("🗑️ Domain Removed", f"Removed '{domain}' from blocklist!")
+            return
+        self.custom_blocklist_view.insert(domain)
+        self.update_blocklist_count()
+
+        # Enhanced feedback message
+        if self.blocker.is_blocked():
+            messagebox.showinfo("✅ Domain Added", 
+                f"Added '{domain}' to custom blocklist!\n\n"
+                f"The domain is now blocked. You may need to:\n"
+                f"• Clear your browser cache\n"
+                f"• Restart your browser\n"
+                f"• Wait a few seconds for DNS changes to take effect")
+        else:
+            messagebox.showinfo("✅ Domain Added", 
+                f"Added '{domain}' to custom blocklist!\n\n"
+                f"The domain will be blocked when you activate YouTube blocking.")
+
+    def remove_selected_custom_domain(self):
+        domain = self.custom_blocklist_view.selected()
+        if domain:
+            self.worker.submit(self.blocker.remove_custom_domain, domain,
+                               on_done=lambda removed: self.on_domain_removed(domain, removed),
+                               on_error=self.show_job_error, batch=self.blocker.batch)
         else:
             messagebox.showwarning("⚠️ No Selection", "Please select a domain from the list to remove!")
 
+    def on_domain_removed(self, domain, removed):
+        if not removed:
+            messagebox.showerror("❌ Domain Not Removed",
+                f"'{domain}' is no longer in your blocklist; the list has been reloaded.")
+            self.update_custom_blocklist_listbox()
+            return
+        self.custom_blocklist_view.delete(domain)
+        self.update_blocklist_count()
+
+        # Enhanced feedback message
+        if self.blocker.is_blocked():
+            messagebox.showinfo("🗑️ Domain Removed", 
+                f"Removed '{domain}' from blocklist!\n\n"
+                f"The domain has been removed from your hosts file.\n"
+                f"You should now be able to access it again.")
+        else:
+            messagebox.showinfo("🗑️ Domain Removed", f"Removed '{domain}' from blocklist!")
+
     def validate_domain(self, domain):
-        """Basic domain validation"""
-        import re
-        # Simple domain validation pattern
-        pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?)*$'
-        return re.match(pattern, domain) and len(domain) <= 253
+        """The normalized rule (lowercase, no trailing dot), or None if domain is not valid"""
+        return normalize_rule(domain)
 
     def add_hover_effects(self):
         """Add hover effects to interactive elements"""
@@ -405,6 +615,11 @@ if __name__ == "__main__":
                 print("❌ Still not running with admin privileges despite relaunch")
                 # Continue anyway, maybe some features will work
         
+        # A running daemon does the privileged work, no need to relaunch. Not on
+        # Windows: its pipe has the default DACL, which only admins can write to
+        elif sys.platform != "win32" and daemon_available():
+            print("✅ Using the YouTube Stopper daemon, admin rights not needed")
+
         # If not admin and no --as-admin flag, try to relaunch
         elif not is_admin():
             print("Requesting admin rights...")
@@ -421,16 +636,25 @@ if __name__ == "__main__":
         from pomodoro_widget import PomodoroWidget
         print("✅ All imports successful")
         
+        # Per-stage timings on /metrics when YOUTUBE_STOPPER_METRICS_PORT is set
+        serve_metrics_from_env()
+
         # Test if tkinter works
-        print("Initializing GUI...")
-        root = tk.Tk()
-        print("✅ Tkinter root created")
-        
-        app = YouTubeStopperApp(root)
-        print("✅ App instance created")
-        
-        print("Starting main loop...")
-        root.mainloop()
+        from tray_mode import TrayController, tray_available
+        if tray_available() and '--no-tray' not in sys.argv:
+            # Closing the window leaves a tray icon; --tray starts there
+            print("Starting with system tray support...")
+            TrayController(YouTubeStopperApp).run(start_in_tray='--tray' in sys.argv)
+        else:
+            print("Initializing GUI...")
+            root = tk.Tk()
+            print("✅ Tkinter root created")
+            
+            app = YouTubeStopperApp(root)
+            print("✅ App instance created")
+            
+            print("Starting main loop...")
+            root.mainloop()
         
     except ImportError as e:
         error_msg = f"Import Error: {e}\n\nMissing required modules. Please install dependencies with:\npip install -r requirements.txt"
@@ -0,0 +1,714 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the hosts file engine
+Measures time and peak Python memory of block / update / unblock against
+synthetic hosts files of different sizes. Nothing outside a temporary
+directory is touched, and no admin rights are needed.
+
+The suite mode is the regression harness: seeded fixtures, every
+blocker operation, wall time / peak RSS / bytes written, saved as JSON
+and optionally compared with the JSON of an earlier commit.
+
+Usage: python benchmark_hosts.py [line_count ...]
+       python benchmark_hosts.py suite [--lines N,N] [--domains N,N] [--seed N] [--repeat N]
+                                       [--output FILE] [--compare FILE] [--threshold RATIO]
+       python benchmark_hosts.py matcher [hostname_count] [rule_count]
+       python benchmark_hosts.py dns [query_count]
+       python benchmark_hosts.py daemon [query_count]
+       python benchmark_hosts.py subscriptions [domain_count]
+       python benchmark_hosts.py durability [line_count ...]
+       python benchmark_hosts.py startup [runs] [--check]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import struct
+import hashlib
+import argparse
+import platform
+import statistics
+import contextlib
+import asyncio
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+import concurrent.futures
+from pathlib import Path
+
+import instrumentation
+from youtube_stopper import DomainTrie
+from blocker_daemon import BlockerDaemon, DaemonClient, DAEMON_ADDRESS_ENV_VAR
+from dns_sinkhole import DnsSinkhole
+from fakes import FakeUpstream, make_query, make_blocker, serve_blocklist
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def generate_hosts_file(path, line_count):
+    """Write a hosts file that looks like a corporate ad/malware list"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write("# Copyright (c) 1993-2009 Microsoft Corp.\r\n")
+        f.write("127.0.0.1 localhost\r\n")
+        for i in range(line_count):
+            f.write(f"0.0.0.0 ads{i}.tracker-network{i % 997}.example\r\n")
+
+
+OPERATIONS = ["block", "is_blocked", "update", "unblock"]
+
+
+def update_with_new_domain(blocker):
+    """Add one domain behind the blocker's back so update has a change to apply"""
+    blocker.store.add([f"bench{len(blocker.store)}.example"])
+    blocker.update_blocked_domains()
+
+
+def run_operations(blocker, trace_memory):
+    """Run every operation once, return {name: seconds or peak bytes}"""
+    funcs = {
+        "block": blocker.block_youtube,
+        "is_blocked": blocker.is_blocked,
+        "update": lambda: update_with_new_domain(blocker),
+        "unblock": blocker.unblock_youtube,
+    }
+    results = {}
+    for name in OPERATIONS:
+        if trace_memory:
+            tracemalloc.start()
+            funcs[name]()
+            results[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            start = time.perf_counter()
+            funcs[name]()
+            results[name] = time.perf_counter() - start
+    return results
+
+
+def run_benchmark(line_count):
+    with tempfile.TemporaryDirectory() as directory:
+        blocker = make_blocker(directory)
+        generate_hosts_file(blocker.hosts_file, line_count)
+        size_mb = os.path.getsize(blocker.hosts_file) / (1024 * 1024)
+
+        # Timing and memory tracing are separate passes because
+        # tracemalloc slows down every allocation it records.
+        timings = run_operations(blocker, trace_memory=False)
+        peaks = run_operations(blocker, trace_memory=True)
+
+    print(f"\n📄 {line_count:,} lines ({size_mb:.1f} MB)")
+    for name in OPERATIONS:
+        print(f"   {name:<11} {timings[name] * 1000:9.1f} ms   peak {peaks[name] / 1024:9.1f} KiB")
+
+
+DURABILITY_OPERATIONS = ["block", "update", "unblock"]
+
+
+def _span_total(spans, names):
+    return sum((span["ms"] if span["name"] in names else 0)
+               + _span_total(span.get("spans", []), names) for span in spans)
+
+
+def run_durability_benchmark(line_count, rounds=7):
+    """
+    Median latency of the hosts writes with and without fsync + journal.
+    The durable run is traced too, so the time spent in fsync and the
+    journal is reported on its own; wall times on a busy disk vary more
+    than that.
+    """
+    medians = {}
+    flush_ms = {name: [] for name in DURABILITY_OPERATIONS}
+    for durable in (False, True):
+        recorder = instrumentation.enable() if durable else None
+        with tempfile.TemporaryDirectory() as directory:
+            blocker = make_blocker(directory)
+            blocker.backend.hosts.durable = durable
+            generate_hosts_file(blocker.hosts_file, line_count)
+            size_mb = os.path.getsize(blocker.hosts_file) / 2**20
+            funcs = {
+                "block": blocker.block_youtube,
+                "update": lambda: update_with_new_domain(blocker),
+                "unblock": blocker.unblock_youtube,
+            }
+            samples = {name: [] for name in DURABILITY_OPERATIONS}
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(rounds):
+                    for name in DURABILITY_OPERATIONS:
+                        start = time.perf_counter()
+                        funcs[name]()
+                        samples[name].append(time.perf_counter() - start)
+                        if recorder is not None:
+                            record = recorder.recent_operations(1)[0]
+                            flush_ms[name].append(_span_total(record.get("spans", []), {"fsync", "journal"}))
+            blocker.close()
+        instrumentation.disable()
+        medians[durable] = {name: statistics.median(times) for name, times in samples.items()}
+
+    print(f"\n💾 {line_count:,} lines ({size_mb:.1f} MB), median of {rounds}")
+    print(f"   {'':<9} {'rename only':>12} {'durable':>12} {'difference':>12} {'fsync+journal':>14}")
+    for name in DURABILITY_OPERATIONS:
+        plain, durable = medians[False][name], medians[True][name]
+        print(f"   {name:<9} {plain * 1000:9.1f} ms {durable * 1000:9.1f} ms "
+              f"{(durable - plain) * 1000:+9.1f} ms {statistics.median(flush_ms[name]):11.1f} ms")
+
+
+def run_matcher_benchmark(hostname_count=1_000_000, rule_count=100_000):
+    """Match random hostnames against a mixed set of exact/wildcard/exception rules"""
+    rng = random.Random(42)
+    words = [f"w{i}" for i in range(2000)]
+    tlds = ["com", "net", "org", "io", "example"]
+
+    def random_domain():
+        return f"{rng.choice(words)}{rng.randrange(1000)}.{rng.choice(tlds)}"
+
+    rules = []
+    for _ in range(rule_count):
+        roll = rng.random()
+        if roll < 0.6:
+            rules.append(random_domain())
+        elif roll < 0.95:
+            rules.append(f"*.{random_domain()}")
+        else:
+            rules.append(f"!{rng.choice(words)}.{random_domain()}")
+    hostnames = [f"{rng.choice(['www', 'cdn', 'api', 'm', 'static'])}.{random_domain()}"
+                 if rng.random() < 0.5 else random_domain()
+                 for _ in range(hostname_count)]
+
+    start = time.perf_counter()
+    trie = DomainTrie(rules)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blocked = sum(1 for hostname in hostnames if trie.match(hostname))
+    match_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concrete = trie.concrete_hosts()
+    concrete_time = time.perf_counter() - start
+
+    print(f"\n🌳 {rule_count:,} rules, {hostname_count:,} hostnames")
+    print(f"   build       {build_time * 1000:9.1f} ms")
+    print(f"   match       {match_time * 1000:9.1f} ms   "
+          f"{hostname_count / match_time:,.0f} lookups/s   {blocked:,} blocked")
+    print(f"   concrete    {concrete_time * 1000:9.1f} ms   {len(concrete):,} hostnames")
+
+
+class _QueryClient(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.pending = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        future = self.pending.pop(struct.unpack_from("!H", data)[0], None)
+        if future is not None and not future.done():
+            future.set_result(data)
+
+
+async def _run_dns_scenario(client, address, names, window=64):
+    """Send queries with up to window in flight, return (seconds, latencies)"""
+    loop = asyncio.get_running_loop()
+    latencies = []
+    semaphore = asyncio.Semaphore(window)
+
+    async def one(qid, name):
+        async with semaphore:
+            future = loop.create_future()
+            client.pending[qid] = future
+            start = time.perf_counter()
+            client.transport.sendto(make_query(qid, name), address)
+            await asyncio.wait_for(future, 2)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i % 65536, name) for i, name in enumerate(names)))
+    return time.perf_counter() - start, latencies
+
+
+async def _dns_benchmark(query_count):
+    loop = asyncio.get_running_loop()
+    upstream_transport, _ = await loop.create_datagram_endpoint(
+        FakeUpstream, local_addr=("127.0.0.1", 0))
+    upstream = upstream_transport.get_extra_info("sockname")[:2]
+
+    trie = DomainTrie(["*.youtube.com", "youtu.be"])
+    sinkhole = DnsSinkhole(trie.match, upstream=upstream, listen=("127.0.0.1", 0),
+                           cache_size=query_count)
+    await sinkhole.start()
+    client_transport, client = await loop.create_datagram_endpoint(
+        _QueryClient, remote_addr=None, local_addr=("127.0.0.1", 0))
+
+    scenarios = [
+        ("blocked", [f"v{i}.youtube.com" for i in range(query_count)]),
+        ("forwarded", [f"site{i}.example.org" for i in range(query_count)]),
+        ("cached", [f"site{i}.example.org" for i in range(query_count)]),
+    ]
+    print(f"\n🕳️ DNS sinkhole, {query_count:,} queries per scenario")
+    for name, names in scenarios:
+        elapsed, latencies = await _run_dns_scenario(client, sinkhole.listen, names)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        print(f"   {name:<10} {query_count / elapsed:10,.0f} qps   p50 {p50:7.0f} us   p99 {p99:7.0f} us")
+
+    client_transport.close()
+    await sinkhole.close()
+    upstream_transport.close()
+    print(f"   stats      {sinkhole.stats}")
+
+
+def run_dns_benchmark(query_count=20_000):
+    asyncio.run(_dns_benchmark(query_count))
+
+
+def run_daemon_benchmark(query_count=10_000):
+    """Status round trips through the daemon versus a one-shot CLI process"""
+    with tempfile.TemporaryDirectory() as directory:
+        blocker = make_blocker(Path(directory))
+        daemon = BlockerDaemon(blocker, address=os.path.join(directory, "daemon.sock"))
+        daemon.start_in_thread()
+        client = DaemonClient(daemon.address).connect()
+        try:
+            client.request("status")
+            latencies = []
+            for _ in range(query_count):
+                start = time.perf_counter()
+                client.request("status")
+                latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            one_shot = DaemonClient(daemon.address)
+            one_shot.request("status")
+            one_shot.close()
+            connect_time = time.perf_counter() - start
+
+            # A fresh interpreter per query, as before the daemon existed
+            env = dict(os.environ, YOUTUBE_STOPPER_BACKEND="dry-run",
+                       **{DAEMON_ADDRESS_ENV_VAR: os.path.join(directory, "absent.sock")})
+            start = time.perf_counter()
+            subprocess.run([sys.executable, str(Path(__file__).with_name("youtube_stopper.py")),
+                            "status"], env=env, capture_output=True, check=True)
+            process_time = time.perf_counter() - start
+        finally:
+            client.close()
+            daemon.stop()
+            blocker.close()
+
+    latencies.sort()
+    print(f"\n🛡️ {query_count:,} status queries through the daemon")
+    print(f"   median      {latencies[len(latencies) // 2] * 1e6:9.1f} µs")
+    print(f"   p99         {latencies[int(len(latencies) * 0.99)] * 1e6:9.1f} µs")
+    print(f"   connect+1   {connect_time * 1e6:9.1f} µs")
+    print(f"   CLI process {process_time * 1000:9.1f} ms")
+
+
+def run_subscription_benchmark(domain_count=100_000):
+    """Initial fetch, a 304 refresh and a refresh with a small delta, against a local server"""
+    domains = [f"ads{i}.tracker-network{i % 997}.example" for i in range(domain_count)]
+    server = serve_blocklist(domains, 1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/hosts"
+    steps = []
+    with tempfile.TemporaryDirectory() as directory:
+        blocker = make_blocker(directory)
+        generate_hosts_file(blocker.hosts_file, 1000)
+        blocker.block_youtube()
+        try:
+            start = time.perf_counter()
+            result = blocker.add_subscription(url, "bench")
+            steps.append(("subscribe", time.perf_counter() - start, result))
+
+            start = time.perf_counter()
+            result, = blocker.refresh_subscriptions()
+            steps.append(("not modified", time.perf_counter() - start, result))
+
+            # One percent of the list replaced
+            changed = domain_count // 100
+            server.body = "".join(f"0.0.0.0 {domain}\n"
+                                  for domain in domains[changed:] + [f"new{i}.example"
+                                                                     for i in range(changed)]).encode()
+            server.version = 2
+            start = time.perf_counter()
+            result, = blocker.refresh_subscriptions()
+            steps.append(("1% changed", time.perf_counter() - start, result))
+            blocked = blocker.is_domain_blocked("new0.example")
+        finally:
+            blocker.close()
+            server.shutdown()
+
+    print(f"\n📡 Subscription to a {domain_count:,} domain list")
+    for name, seconds, result in steps:
+        print(f"   {name:<13} {seconds * 1000:9.1f} ms   {result}")
+    print(f"   new domain blocked: {blocked}")
+
+
+# ----------------------------------------------------------------------
+# Regression suite
+
+SUITE_LINES = [10_000, 100_000]
+SUITE_DOMAINS = [1_000, 10_000]
+SUITE_SEED = 1234
+# A case is reported as a regression when it is this much slower...
+REGRESSION_RATIO = 1.25
+# ...and at least this many seconds slower (ignores jitter on fast operations)
+REGRESSION_MIN_SECONDS = 0.002
+
+SUITE_OPERATIONS = ["block", "is_blocked", "update", "get_custom_domains",
+                    "add", "remove", "unblock"]
+
+TLDS = ["com", "net", "org", "io", "info", "biz", "co", "xyz"]
+
+
+def random_domain(rng):
+    labels = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=rng.randint(3, 12)))
+              for _ in range(rng.randint(1, 3))]
+    return ".".join(labels) + "." + rng.choice(TLDS)
+
+
+def generate_fixture(directory, line_count, domain_count, seed):
+    """
+    Write a hosts file and a custom blocklist from a seeded generator. The
+    hosts file mixes comments, blank lines, IPv6 entries and several names
+    per line, like real merged ad lists. Returns (hosts path, domains, sha256).
+    """
+    rng = random.Random(seed)
+    path = Path(directory) / "hosts"
+    digest = hashlib.sha256()
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        def write(line):
+            data = line + "\r\n"
+            digest.update(data.encode())
+            f.write(data)
+
+        write("# Copyright (c) 1993-2009 Microsoft Corp.")
+        write("127.0.0.1 localhost")
+        write("::1 localhost")
+        for _ in range(line_count):
+            kind = rng.random()
+            if kind < 0.05:
+                write(f"# {random_domain(rng)}")
+            elif kind < 0.07:
+                write("")
+            elif kind < 0.12:
+                write(f"::0 {random_domain(rng)}")
+            elif kind < 0.20:
+                write("0.0.0.0 " + " ".join(random_domain(rng) for _ in range(rng.randint(2, 4))))
+            else:
+                write(f"0.0.0.0 {random_domain(rng)}")
+    domains = sorted({random_domain(rng) for _ in range(domain_count)})
+    digest.update("\n".join(domains).encode())
+    return path, domains, digest.hexdigest()
+
+
+def reset_peak_rss():
+    """Reset the process's RSS high-water mark (Linux); False where not possible"""
+    try:
+        with open("/proc/self/clear_refs", 'w') as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """High-water resident memory of this process in bytes, or None"""
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    except ImportError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+def bytes_written():
+    """Bytes this process has passed to write() so far, or None"""
+    try:
+        with open("/proc/self/io", 'r') as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().io_counters().write_bytes
+    except (ImportError, AttributeError):
+        return None
+
+
+def measure(func):
+    """Run func once; returns (seconds, peak RSS bytes, bytes written)"""
+    # Keep the blocker's prints out of the timing and the write count
+    with contextlib.redirect_stdout(io.StringIO()):
+        reset_peak_rss()
+        written = bytes_written()
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        peak = peak_rss()
+        if written is not None:
+            written = bytes_written() - written
+    return seconds, peak, written
+
+
+def run_suite_case(line_count, domain_count, seed, repeat):
+    """One fixture size, run in its own process so RSS figures do not mix"""
+    with tempfile.TemporaryDirectory() as directory:
+        with contextlib.redirect_stdout(io.StringIO()):
+            blocker = make_blocker(directory)
+            _, domains, fixture_hash = generate_fixture(directory, line_count, domain_count, seed)
+            blocker.store.add(domains)
+        hosts_bytes = os.path.getsize(blocker.hosts_file)
+        samples = {name: [] for name in SUITE_OPERATIONS}
+        try:
+            for round_number in range(repeat):
+                extra = f"suite-extra{round_number}.example"
+                funcs = {
+                    "block": blocker.block_youtube,
+                    "is_blocked": blocker.is_blocked,
+                    "update": lambda: update_with_new_domain(blocker),
+                    "get_custom_domains": blocker.get_custom_domains,
+                    "add": lambda: blocker.add_custom_domain(extra),
+                    "remove": lambda: blocker.remove_custom_domain(extra),
+                    "unblock": blocker.unblock_youtube,
+                }
+                for name in SUITE_OPERATIONS:
+                    samples[name].append(measure(funcs[name]))
+        finally:
+            blocker.close()
+
+    operations = {}
+    for name, runs in samples.items():
+        seconds = [run[0] for run in runs]
+        peaks = [run[1] for run in runs if run[1] is not None]
+        written = [run[2] for run in runs if run[2] is not None]
+        operations[name] = {
+            "seconds": statistics.median(seconds),
+            "min_seconds": min(seconds),
+            "peak_rss": max(peaks) if peaks else None,
+            "bytes_written": int(statistics.median(written)) if written else None,
+        }
+    return {
+        "lines": line_count,
+        "domains": domain_count,
+        "hosts_bytes": hosts_bytes,
+        "fixture_sha256": fixture_hash,
+        "operations": operations,
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=Path(__file__).parent)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def case_key(case):
+    return f"{case['lines']}x{case['domains']}"
+
+
+def compare_results(results, baseline, threshold=REGRESSION_RATIO):
+    """Print the change from a baseline run; returns the regressions found"""
+    previous = {case_key(case): case for case in baseline["cases"]}
+    regressions = []
+    print(f"\n📊 Compared with {baseline['meta'].get('commit') or 'baseline'}")
+    for case in results["cases"]:
+        old = previous.get(case_key(case))
+        if old is None:
+            continue
+        if old["fixture_sha256"] != case["fixture_sha256"]:
+            print(f"   {case_key(case)}: different fixture (seed or generator changed), skipped")
+            continue
+        for name, now in case["operations"].items():
+            before = old["operations"].get(name)
+            if not before:
+                continue
+            ratio = now["seconds"] / before["seconds"] if before["seconds"] else 1.0
+            slower = now["seconds"] - before["seconds"]
+            regressed = ratio > threshold and slower > REGRESSION_MIN_SECONDS
+            marker = "❌" if regressed else "  "
+            print(f" {marker} {case_key(case):<14} {name:<19} {before['seconds'] * 1000:9.2f} ms -> "
+                  f"{now['seconds'] * 1000:9.2f} ms  ({ratio:5.2f}x)")
+            if regressed:
+                regressions.append((case_key(case), name, ratio))
+    return regressions
+
+
+def run_suite(args):
+    parser = argparse.ArgumentParser(prog="benchmark_hosts.py suite")
+    parser.add_argument("--lines", default=",".join(map(str, SUITE_LINES)))
+    parser.add_argument("--domains", default=",".join(map(str, SUITE_DOMAINS)))
+    parser.add_argument("--seed", type=int, default=SUITE_SEED)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="JSON of an earlier run; exit 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_RATIO)
+    options = parser.parse_args(args)
+    line_counts = [int(value) for value in options.lines.split(",")]
+    domain_counts = [int(value) for value in options.domains.split(",")]
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": options.seed,
+            "repeat": options.repeat,
+            "created": time.time(),
+        },
+        "cases": [],
+    }
+    print(f"⏱️ YouTube Stopper regression suite (seed {options.seed}, {options.repeat} rounds)")
+    for line_count in line_counts:
+        for domain_count in domain_counts:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+                case = pool.submit(run_suite_case, line_count, domain_count,
+                                   options.seed, options.repeat).result()
+            results["cases"].append(case)
+            print(f"\n📄 {line_count:,} lines ({case['hosts_bytes'] / 2**20:.1f} MB), "
+                  f"{domain_count:,} custom domains")
+            for name, op in case["operations"].items():
+                peak = f"{op['peak_rss'] / 2**20:7.1f} MB" if op["peak_rss"] is not None else "      n/a"
+                written = (f"{op['bytes_written'] / 1024:9.1f} KiB"
+                           if op["bytes_written"] is not None else "          n/a")
+                print(f"   {name:<19} {op['seconds'] * 1000:9.2f} ms   rss {peak}   written {written}")
+
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {options.output}")
+    if options.compare:
+        with open(options.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, options.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) over {options.threshold:.2f}x")
+            return False
+        print("✅ No regressions")
+    return True
+
+
+# Cold start budget for `stopper_cli.py status`
+STARTUP_BUDGET_MS = 50
+
+# Modules `status` must never import (requests is loaded only by the subscription commands)
+GUI_ONLY_MODULES = ("tkinter", "PIL", "pystray", "psutil", "requests")
+
+
+def parse_importtime(stderr):
+    """Return {module: (cumulative µs, nesting depth)} from -X importtime output"""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name[1:].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports[name.strip()] = (int(cumulative), depth)
+    return imports
+
+
+def run_startup_benchmark(runs=15, check=False):
+    """
+    Start `stopper_cli.py status` in fresh interpreters with -X importtime.
+    With check=True, return False if the median exceeds STARTUP_BUDGET_MS
+    or a GUI-only module was imported.
+    """
+    script = str(Path(__file__).with_name("stopper_cli.py"))
+    command = [sys.executable, "-X", "importtime", script, "status"]
+    # Compile the .pyc files first so every measured run is a plain cold start
+    subprocess.run(command, capture_output=True)
+
+    wall_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True)
+        wall_times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            print(f"❌ status failed:\n{result.stderr[-2000:]}")
+            return False
+    imports = parse_importtime(result.stderr)
+
+    wall_times.sort()
+    median_ms = wall_times[len(wall_times) // 2] * 1000
+    gui_imports = sorted(name for name in imports if name.split(".")[0] in GUI_ONLY_MODULES)
+    top_level = sorted(((us, name) for name, (us, depth) in imports.items() if depth == 0),
+                       reverse=True)
+
+    print(f"\n🚀 stopper_cli.py status, {runs} cold starts")
+    print(f"   median      {median_ms:9.1f} ms   (budget {STARTUP_BUDGET_MS} ms)")
+    print(f"   fastest     {wall_times[0] * 1000:9.1f} ms")
+    print(f"   imports     {sum(us for us, _ in top_level) / 1000:9.1f} ms   "
+          f"{len(imports)} modules")
+    for us, name in top_level[:8]:
+        print(f"     {name:<28} {us / 1000:7.1f} ms")
+
+    ok = median_ms <= STARTUP_BUDGET_MS and not gui_imports
+    if gui_imports:
+        print(f"❌ GUI-only modules imported: {', '.join(gui_imports)}")
+    elif median_ms > STARTUP_BUDGET_MS:
+        print(f"❌ Over the start-up budget by {median_ms - STARTUP_BUDGET_MS:.1f} ms")
+    elif check:
+        print("✅ Within the start-up budget")
+    return ok
+
+
+def main():
+    if sys.argv[1:2] == ["suite"]:
+        if not run_suite(sys.argv[2:]):
+            sys.exit(1)
+        return
+    if sys.argv[1:2] == ["startup"]:
+        check = "--check" in sys.argv
+        runs = [int(arg) for arg in sys.argv[2:] if arg != "--check"]
+        ok = run_startup_benchmark(*runs[:1], check=check)
+        if check and not ok:
+            sys.exit(1)
+        return
+    if sys.argv[1:2] == ["dns"]:
+        run_dns_benchmark(*[int(arg) for arg in sys.argv[2:3]])
+        return
+    if sys.argv[1:2] == ["daemon"]:
+        run_daemon_benchmark(*[int(arg) for arg in sys.argv[2:3]])
+        return
+    if sys.argv[1:2] == ["durability"]:
+        print("⏱️ Cost of fsync + journal on hosts file writes")
+        for line_count in [int(arg) for arg in sys.argv[2:]] or [10_000, 100_000]:
+            run_durability_benchmark(line_count)
+        return
+    if sys.argv[1:2] == ["subscriptions"]:
+        run_subscription_benchmark(*[int(arg) for arg in sys.argv[2:3]])
+        return
+    if sys.argv[1:2] == ["matcher"]:
+        counts = [int(arg) for arg in sys.argv[2:4]]
+        run_matcher_benchmark(*counts)
+        return
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print("⏱️ YouTube Stopper hosts file benchmark")
+    for line_count in sizes:
+        run_benchmark(line_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,784 @@
+#!/usr/bin/env python3
+"""
+Headless daemon and IPC control API for YouTube Stopper
+
+The daemon owns one long-lived YouTubeBlocker: the rule set, the blocklist
+store and the blocked state stay in memory, so a status query is a dict
+lookup instead of a fresh interpreter that re-checks admin rights and
+re-parses every file. Only the daemon needs admin rights; the CLI and the
+GUI talk to it as thin clients.
+
+Transport is a Unix domain socket (POSIX) or a named pipe (Windows), via
+multiprocessing.connection. The socket lives in /var/run/youtube_stopper,
+which only root can write to, and clients refuse a socket that another
+user could have put in place. Every message is one JSON object:
+
+    request   {"cmd": "add", "domains": ["example.com"]}
+    response  {"ok": true, "result": 1}
+              {"ok": false, "error": "Unknown command 'foo'"}
+
+Commands: ping, status, block, unblock, add, remove, has, list, count, profiles,
+set_profile, schedule, set_schedule, subscriptions, subscribe, unsubscribe,
+refresh_subscriptions, stats, history, history_summary, history_weekly,
+record_pomodoro, end_session, timings, shutdown
+
+The daemon also runs the focus schedule (focus_schedule.py), blocking and
+unblocking at the start and end of every window.
+"""
+
+import os
+import sys
+import json
+import time
+import stat
+import signal
+import threading
+from contextlib import contextmanager
+
+import instrumentation
+from blocklist_formats import normalize_rule, normalize_rules
+
+DAEMON_ADDRESS_ENV_VAR = "YOUTUBE_STOPPER_SOCKET"
+
+# Directory of the default control socket. It belongs to root and only root
+# may write to it, so no other user can put a socket of their own there
+# for clients to connect to.
+SOCKET_DIR = "/var/run/youtube_stopper"
+
+# Seconds a client waits for the daemon to answer
+REQUEST_TIMEOUT = 30
+
+# Domains sent per request when importing a large blocklist
+IMPORT_CHUNK_SIZE = 50_000
+# Seconds a RemoteHistory reuses the open session and today's total
+HISTORY_STATE_MAX_AGE = 5
+
+
+class DaemonError(Exception):
+    """The daemon could not be reached or rejected a request"""
+
+
+def default_address():
+    """
+    Control socket shared by the daemon (usually root/admin) and its clients
+    (a normal user), so it must not depend on the user's home directory
+    """
+    address = os.environ.get(DAEMON_ADDRESS_ENV_VAR)
+    if address:
+        return address
+    if sys.platform == "win32":
+        return r"\\.\pipe\youtube_stopper"
+    # Not /tmp: anyone could create the socket there first and pose as the daemon
+    return os.path.join(SOCKET_DIR, "daemon.sock")
+
+
+def trusted_address(address):
+    """
+    True if only root or the current user can have created the socket: it
+    and its directory belong to one of them and the directory is not
+    writable by anyone else
+    """
+    if sys.platform == "win32":
+        return True
+    owners = (0, os.getuid())
+    try:
+        sock = os.lstat(address)
+        directory = os.stat(os.path.dirname(os.path.abspath(address)))
+    except OSError:
+        # Nothing there yet; connecting simply fails
+        return True
+    return (directory.st_uid in owners and not directory.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+            and sock.st_uid in owners)
+
+
+def daemon_may_be_running(address):
+    """Cheap pre-check so clients skip the connection machinery when no daemon exists"""
+    return sys.platform == "win32" or os.path.exists(address)
+
+
+def _connect(address):
+    # multiprocessing is imported on first use; the CLI without a daemon never needs it
+    from multiprocessing.connection import Client as connect
+    return connect(address)
+
+
+def encode_message(message):
+    return json.dumps(message, separators=(',', ':')).encode('utf-8')
+
+
+def decode_message(data):
+    message = json.loads(data.decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    return message
+
+
+class BlockerDaemon:
+    """
+    Serves a YouTubeBlocker over the control socket, one thread per client
+    """
+
+    def __init__(self, blocker, address=None):
+        self.blocker = blocker
+        self.address = address or default_address()
+        self.started_at = None
+        self.request_count = 0
+        self._listener = None
+        self._thread = None
+        self.scheduler = None
+        self._stopping = threading.Event()
+        # Mutations run one at a time; status queries never wait for them
+        self._write_lock = threading.Lock()
+        self._handlers = {
+            "ping": self._ping,
+            "status": self._status,
+            "block": self._block,
+            "unblock": self._unblock,
+            "add": self._add,
+            "remove": self._remove,
+            "has": self._has,
+            "list": self._list,
+            "count": self._count,
+            "profiles": self._profiles,
+            "set_profile": self._set_profile,
+            "subscriptions": self._subscriptions,
+            "subscribe": self._subscribe,
+            "unsubscribe": self._unsubscribe,
+            "refresh_subscriptions": self._refresh_subscriptions,
+            "schedule": self._schedule,
+            "set_schedule": self._set_schedule,
+            "stats": self._stats,
+            "history": self._history_state,
+            "history_summary": self._history_summary,
+            "history_weekly": self._history_weekly,
+            "record_pomodoro": self._record_pomodoro,
+            "end_session": self._end_session,
+            "timings": self._timings,
+            "shutdown": self._shutdown,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+
+    def start(self):
+        """Open the control socket and warm the caches"""
+        from multiprocessing.connection import Listener
+
+        self._prepare_socket_dir()
+        self._remove_stale_socket()
+        if sys.platform == "win32":
+            self._listener = Listener(self.address, family='AF_PIPE', backlog=16)
+        else:
+            # Only the owner may connect; see _hand_socket_to_sudo_user()
+            old_umask = os.umask(0o177)
+            try:
+                self._listener = Listener(self.address, family='AF_UNIX', backlog=16)
+            finally:
+                os.umask(old_umask)
+            self._hand_socket_to_sudo_user()
+
+        self.blocker.start_watching()
+        # Put the hosts section back if something else edits it
+        self.blocker.start_watchdog()
+        # Load the store, compile the profiles and cache the state up front
+        # so the first client request is as fast as the rest
+        self.blocker.get_blocklist()
+        self.blocker.is_blocked()
+        self.started_at = time.monotonic()
+
+        from focus_schedule import FocusScheduler
+        self.scheduler = FocusScheduler(self.blocker.get_schedule(), self._apply_schedule)
+        self.scheduler.start()
+
+    def serve_forever(self):
+        """Accept clients until stop() or a shutdown request"""
+        if self._listener is None:
+            self.start()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn = self._listener.accept()
+                except OSError as e:
+                    if self._stopping.is_set():
+                        break
+                    print(f"⚠️ Failed to accept a client: {e}")
+                    continue
+                if self._stopping.is_set():
+                    conn.close()
+                    break
+                threading.Thread(target=self._serve_connection, args=(conn,),
+                                 name="BlockerDaemonClient", daemon=True).start()
+        finally:
+            self.close()
+
+    def start_in_thread(self):
+        """Serve from a background thread (for tests and benchmarks)"""
+        self.start()
+        self._thread = threading.Thread(target=self.serve_forever, name="BlockerDaemon",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        # Wake the accept() call with a throwaway connection
+        try:
+            _connect(self.address).close()
+        except OSError:
+            pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        """Stop the schedule and close the control socket"""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler = None
+        if self._listener is not None:
+            # Also unlinks the Unix socket file
+            self._listener.close()
+            self._listener = None
+
+    def _apply_schedule(self, active):
+        """FocusScheduler callback, runs on the scheduler thread"""
+        with self._write_lock:
+            if active:
+                print("⏰ Focus window started")
+                self.blocker.block_youtube()
+            else:
+                print("⏰ Focus window ended")
+                self.blocker.unblock_youtube()
+
+    def _prepare_socket_dir(self):
+        """Create the socket directory and refuse one that others could write to"""
+        if sys.platform == "win32":
+            return
+        directory = os.path.dirname(os.path.abspath(self.address))
+        try:
+            os.makedirs(directory, mode=0o755, exist_ok=True)
+        except OSError as e:
+            raise DaemonError(f"Cannot create {directory} ({e}); run the daemon as root or set "
+                              f"{DAEMON_ADDRESS_ENV_VAR} to a socket in a private directory")
+        info = os.stat(directory)
+        if info.st_uid not in (0, os.getuid()) or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise DaemonError(f"{directory} can be written by other users; "
+                              f"use a directory only root or you can write to")
+
+    def _remove_stale_socket(self):
+        if sys.platform == "win32" or not os.path.lexists(self.address):
+            return
+        if not stat.S_ISSOCK(os.lstat(self.address).st_mode):
+            raise DaemonError(f"{self.address} exists and is not a socket; not removing it")
+        try:
+            _connect(self.address).close()
+        except OSError:
+            # Left behind by a daemon that crashed
+            os.remove(self.address)
+        else:
+            raise DaemonError(f"A daemon is already listening on {self.address}")
+
+    def _hand_socket_to_sudo_user(self):
+        """Started with sudo: let the invoking user, not just root, connect"""
+        uid, gid = os.environ.get("SUDO_UID"), os.environ.get("SUDO_GID")
+        if uid and gid and os.getuid() == 0:
+            os.chown(self.address, int(uid), int(gid))
+
+    # ------------------------------------------------------------------
+    # Requests
+
+    def _serve_connection(self, conn):
+        try:
+            while not self._stopping.is_set():
+                try:
+                    data = conn.recv_bytes()
+                except (EOFError, OSError):
+                    break
+                conn.send_bytes(encode_message(self.handle(data)))
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def handle(self, data):
+        """Answer one encoded request with a response dict"""
+        self.request_count += 1
+        try:
+            request = decode_message(data)
+        except ValueError as e:
+            return {"ok": False, "error": f"Malformed request: {e}"}
+        handler = self._handlers.get(request.get("cmd"))
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command '{request.get('cmd')}'"}
+        try:
+            return {"ok": True, "result": handler(request)}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    def _ping(self, request):
+        return os.getpid()
+
+    def _status(self, request):
+        return self.blocker.is_blocked()
+
+    def _block(self, request):
+        with self._write_lock:
+            return bool(self.blocker.block_youtube())
+
+    def _unblock(self, request):
+        with self._write_lock:
+            return bool(self.blocker.unblock_youtube())
+
+    def _add(self, request):
+        with self._write_lock:
+            return self.blocker.add_custom_domains(_domain_list(request))
+
+    def _remove(self, request):
+        with self._write_lock:
+            return self.blocker.remove_custom_domains(_domain_list(request))
+
+    def _has(self, request):
+        domain = normalize_rule(request.get("domain"))
+        return domain is not None and self.blocker.has_custom_domain(domain)
+
+    def _list(self, request):
+        return self.blocker.get_custom_domains()
+
+    def _count(self, request):
+        return self.blocker.count_blocked_domains()
+
+    def _profiles(self, request):
+        return [[name, active] for name, active in self.blocker.get_profiles()]
+
+    def _set_profile(self, request):
+        name, active = request.get("name"), request.get("active")
+        if not isinstance(name, str) or not isinstance(active, bool):
+            raise ValueError("'name' must be a string and 'active' a boolean")
+        with self._write_lock:
+            return self.blocker.set_profile_active(name, active)
+
+    def _subscriptions(self, request):
+        return self.blocker.get_subscriptions()
+
+    def _subscribe(self, request):
+        url, name = request.get("url"), request.get("name")
+        if not isinstance(url, str) or not isinstance(name, (str, type(None))):
+            raise ValueError("'url' must be a string and 'name' a string or null")
+        with self._write_lock:
+            return self.blocker.add_subscription(url, name).as_dict()
+
+    def _unsubscribe(self, request):
+        name = request.get("name")
+        if not isinstance(name, str):
+            raise ValueError("'name' must be a string")
+        with self._write_lock:
+            return self.blocker.remove_subscription(name)
+
+    def _refresh_subscriptions(self, request):
+        with self._write_lock:
+            return [result.as_dict() for result in self.blocker.refresh_subscriptions()]
+
+    def _schedule(self, request):
+        from focus_schedule import describe_transition
+        scheduler = self.scheduler
+        return {
+            "rules": scheduler.schedule.lines(),
+            "next": describe_transition(scheduler.next_transition()),
+        }
+
+    def _set_schedule(self, request):
+        rules = request.get("rules")
+        if not isinstance(rules, list) or not all(isinstance(r, str) for r in rules):
+            raise ValueError("'rules' must be a list of strings")
+        with self._write_lock:
+            schedule = self.blocker.set_schedule(rules)
+        # Outside the lock: entering or leaving a window blocks or unblocks
+        self.scheduler.set_schedule(schedule)
+        return schedule.lines()
+
+    def _stats(self, request):
+        return {
+            "pid": os.getpid(),
+            "backend": self.blocker.backend.name,
+            "uptime": time.monotonic() - self.started_at,
+            "requests": self.request_count,
+            "cache_hits": self.blocker.cache_hits,
+            "flushes": self.blocker.flush_scheduler.flush_count,
+            "schedule_wakeups": self.scheduler.wakeups,
+            "watchdog": self.blocker.watchdog.stats() if self.blocker.watchdog else None,
+            "timings": instrumentation.enabled(),
+        }
+
+    def _history_state(self, request):
+        history = self.blocker.get_history()
+        start = history.reload()
+        rows = history.daily_totals(1)
+        return {"open_session": start, "closed_today": rows[0][1] if rows else 0}
+
+    def _history_summary(self, request):
+        history = self.blocker.get_history()
+        history.reload()
+        return history.summary()
+
+    def _history_weekly(self, request):
+        weeks = request.get("weeks", 52)
+        if not isinstance(weeks, int) or weeks < 1:
+            raise ValueError("'weeks' must be a positive integer")
+        return [list(row) for row in self.blocker.get_history().weekly_totals(weeks)]
+
+    def _record_pomodoro(self, request):
+        self.blocker.get_history().record_pomodoro()
+        return True
+
+    def _end_session(self, request):
+        ts = request.get("ts")
+        if ts is not None and not isinstance(ts, (int, float)):
+            raise ValueError("'ts' must be a timestamp")
+        return self.blocker.get_history().end_session(ts)
+
+    def _timings(self, request):
+        limit = request.get("limit", 10)
+        if not isinstance(limit, int) or limit < 1:
+            raise ValueError("'limit' must be a positive integer")
+        return self.blocker.get_timings(limit)
+
+    def _shutdown(self, request):
+        # Reply first, then stop accepting
+        threading.Thread(target=self.stop, name="BlockerDaemonStop", daemon=True).start()
+        return True
+
+
+def _domain_list(request):
+    """The request's domains, normalized; any invalid entry rejects the whole request"""
+    domains = request.get("domains")
+    if not isinstance(domains, list) or not all(isinstance(d, str) for d in domains):
+        raise ValueError("'domains' must be a list of strings")
+    # Entries end up in the hosts file root owns: no spaces, newlines or addresses
+    return normalize_rules(domains)
+
+
+class DaemonClient:
+    """
+    Persistent connection to the daemon. Safe to share between threads.
+    """
+
+    def __init__(self, address=None, timeout=REQUEST_TIMEOUT):
+        self.address = address or default_address()
+        self.timeout = timeout
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        if self._conn is None:
+            if not trusted_address(self.address):
+                raise DaemonError(f"Not connecting to {self.address}: the socket or its directory "
+                                  f"could have been created by another user")
+            try:
+                self._conn = _connect(self.address)
+            except OSError as e:
+                raise DaemonError(f"Daemon not reachable at {self.address}: {e}") from e
+        return self
+
+    def request(self, cmd, **params):
+        """Send one command and return its result, raising DaemonError on failure"""
+        params["cmd"] = cmd
+        with self._lock:
+            self.connect()
+            try:
+                self._conn.send_bytes(encode_message(params))
+                if not self._conn.poll(self.timeout):
+                    raise DaemonError(f"Daemon did not answer '{cmd}' within {self.timeout}s")
+                response = decode_message(self._conn.recv_bytes())
+            except (EOFError, OSError) as e:
+                self._disconnect()
+                raise DaemonError(f"Lost connection to the daemon: {e}") from e
+            except DaemonError:
+                # The reply may still arrive; never pair it with the next request
+                self._disconnect()
+                raise
+        if not response.get("ok"):
+            raise DaemonError(response.get("error", "Request failed"))
+        return response.get("result")
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def _disconnect(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class RemoteBlocker:
+    """
+    Drop-in stand-in for YouTubeBlocker that forwards to the daemon,
+    covering the methods the CLI and the GUI use
+    """
+
+    # Requests go to the daemon, which also enforces the focus schedule
+    remote = True
+
+    def __init__(self, client):
+        self.client = client
+        self.flush_callback = None
+
+    @property
+    def cache_hits(self):
+        try:
+            return self.client.request("stats")["cache_hits"]
+        except DaemonError:
+            return 0
+
+    def is_blocked(self):
+        try:
+            return self.client.request("status")
+        except DaemonError as e:
+            print(f"❌ Error checking block status: {e}")
+            return False
+
+    def block_youtube(self):
+        return self._toggle("block", "🔒 YouTube blocked successfully!", "blocking")
+
+    def unblock_youtube(self):
+        return self._toggle("unblock", "🔓 YouTube unblocked successfully!", "unblocking")
+
+    def _toggle(self, cmd, success_message, action):
+        try:
+            ok = self.client.request(cmd)
+        except DaemonError as e:
+            print(f"❌ Error {action} YouTube: {e}")
+            return False
+        if ok:
+            print(success_message)
+        else:
+            print(f"❌ The daemon failed {action} YouTube - check its output")
+        return ok
+
+    def get_custom_domains(self):
+        return self.client.request("list")
+
+    def has_custom_domain(self, domain):
+        return self.client.request("has", domain=domain)
+
+    def add_custom_domain(self, domain):
+        return self.add_custom_domains([domain]) > 0
+
+    def remove_custom_domain(self, domain):
+        return self.remove_custom_domains([domain]) > 0
+
+    def add_custom_domains(self, new_domains):
+        return self.client.request("add", domains=list(new_domains))
+
+    def remove_custom_domains(self, old_domains):
+        return self.client.request("remove", domains=list(old_domains))
+
+    def import_blocklist(self, lines):
+        """Parse locally and send the domains in chunks"""
+        from blocklist_formats import iter_domains
+        added, chunk = 0, []
+        for domain in iter_domains(lines):
+            chunk.append(domain)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                added += self.add_custom_domains(chunk)
+                chunk = []
+        if chunk:
+            added += self.add_custom_domains(chunk)
+        return added
+
+    def export_blocklist(self, out):
+        domains = self.get_custom_domains()
+        for domain in domains:
+            out.write(domain + '\n')
+        return len(domains)
+
+    def count_blocked_domains(self):
+        return self.client.request("count")
+
+    def get_profiles(self):
+        return [(name, active) for name, active in self.client.request("profiles")]
+
+    def set_profile_active(self, name, enabled):
+        return self.client.request("set_profile", name=name, active=enabled)
+
+    def get_timings(self, limit=10):
+        return self.client.request("timings", limit=limit)
+
+    def get_subscriptions(self):
+        return self.client.request("subscriptions")
+
+    def add_subscription(self, url, name=None):
+        from blocklist_subscriptions import FetchResult
+        return FetchResult(**self.client.request("subscribe", url=url, name=name))
+
+    def remove_subscription(self, name):
+        return self.client.request("unsubscribe", name=name)
+
+    def refresh_subscriptions(self):
+        from blocklist_subscriptions import FetchResult
+        return [FetchResult(**result) for result in self.client.request("refresh_subscriptions")]
+
+    def get_schedule(self):
+        from focus_schedule import Schedule
+        return Schedule.parse(self.client.request("schedule")["rules"])
+
+    def set_schedule(self, lines):
+        from focus_schedule import Schedule
+        return Schedule.parse(self.client.request("set_schedule", rules=list(lines)))
+
+    @contextmanager
+    def batch(self):
+        """The daemon applies each request as it arrives; nothing to group here"""
+        yield self
+
+    def set_flush_callback(self, callback):
+        # The daemon flushes the DNS cache itself and reports it in its own output
+        self.flush_callback = callback
+
+    def start_watching(self, poll_interval=1.0):
+        """The daemon watches the files; nothing to do on the client side"""
+
+    def stop_watching(self):
+        pass
+
+    def needs_admin(self):
+        """The daemon holds the admin rights"""
+        return False
+
+    def start_watchdog(self):
+        """The daemon runs the watchdog itself"""
+        return False
+
+    def open_history(self):
+        """The daemon records the sessions, so its history is the one to show"""
+        return RemoteHistory(self.client)
+
+    def close(self):
+        self.client.close()
+
+
+class RemoteHistory:
+    """
+    Stand-in for SessionHistory that reads the daemon's history, covering
+    the methods the GUI, the tray and `stats` use
+    """
+
+    def __init__(self, client):
+        self.client = client
+        # (time fetched, closed seconds today, open session start)
+        self._state = None
+
+    @property
+    def open_session(self):
+        if self._state is None:
+            self.reload()
+        return self._state[2]
+
+    def reload(self):
+        """Fetch the open session (and today's closed total); returns its start"""
+        state = self.client.request("history")
+        self._state = (time.time(), state["closed_today"], state["open_session"])
+        return state["open_session"]
+
+    def today_seconds(self, now=None):
+        """Focus time so far today; the daemon is asked at most every few seconds"""
+        from datetime import date, datetime
+        now = time.time() if now is None else now
+        if (self._state is None or now - self._state[0] > HISTORY_STATE_MAX_AGE
+                or date.fromtimestamp(self._state[0]) != date.fromtimestamp(now)):
+            self.reload()
+        _, closed, start = self._state
+        if start is None:
+            return closed
+        midnight = datetime.combine(date.fromtimestamp(now), datetime.min.time()).timestamp()
+        return closed + max(0, now - max(start, midnight))
+
+    def summary(self):
+        return self.client.request("history_summary")
+
+    def weekly_totals(self, weeks=52):
+        return [tuple(row) for row in self.client.request("history_weekly", weeks=weeks)]
+
+    def record_pomodoro(self):
+        self.client.request("record_pomodoro")
+
+    def end_session(self, ts=None):
+        length = self.client.request("end_session", ts=ts)
+        self._state = None
+        return length
+
+    def close(self):
+        """The connection belongs to the RemoteBlocker"""
+
+
+def connect_blocker(address=None):
+    """Return a RemoteBlocker if a daemon is running, otherwise None"""
+    client = DaemonClient(address)
+    if not daemon_may_be_running(client.address):
+        return None
+    try:
+        client.connect()
+    except DaemonError:
+        return None
+    return RemoteBlocker(client)
+
+
+def daemon_available(address=None):
+    """True if a daemon accepts connections"""
+    blocker = connect_blocker(address)
+    if blocker is None:
+        return False
+    blocker.close()
+    return True
+
+
+def run_daemon(address=None):
+    """Entry point for `youtube_stopper.py daemon`"""
+    from youtube_stopper import YouTubeBlocker
+
+    blocker = YouTubeBlocker()
+    if blocker.needs_admin():
+        print("❌ The daemon needs administrator/root rights to change the hosts file.")
+        print("   Start it with sudo (or from an administrator prompt), or use the DNS")
+        print("   engine on an unprivileged port: YOUTUBE_STOPPER_BACKEND=dns")
+        print("   YOUTUBE_STOPPER_DNS_LISTEN=127.0.0.1:5353")
+        blocker.close()
+        return 1
+
+    daemon = BlockerDaemon(blocker, address)
+    try:
+        daemon.start()
+    except (DaemonError, OSError) as e:
+        print(f"❌ Could not start the daemon: {e}")
+        blocker.close()
+        return 1
+
+    def on_terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, on_terminate)
+    metrics = instrumentation.serve_metrics_from_env()
+    print(f"🛡️ YouTube Stopper daemon listening on {daemon.address} "
+          f"(backend: {blocker.backend.name}, pid {os.getpid()})")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        blocker.close()
+        if metrics is not None:
+            metrics.shutdown()
+    print(f"👋 Daemon stopped after {daemon.request_count} request(s)")
+    return 0
+
+
+def stop_daemon(address=None):
+    """Ask a running daemon to shut down, return True if one answered"""
+    client = DaemonClient(address)
+    try:
+        client.request("shutdown")
+    except DaemonError:
+        return False
+    finally:
+        client.close()
+    return True
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Background worker for YouTube Stopper's Tkinter app
+
+Blocker operations (hosts file rewrites, store updates, subprocess calls)
+run on a single worker thread so the Tk main loop never freezes. Jobs run
+strictly in submission order. Their results are handed back to the Tk
+thread by polling a queue with root.after, which only happens while jobs
+are outstanding, so an idle app does not wake up at all.
+
+Jobs submitted with the same batch context (e.g. blocker.batch) that are
+queued back to back run together inside one `with batch():`, so a burst
+of domain edits costs one hosts file write.
+"""
+
+import queue
+import threading
+import itertools
+
+# Poll interval while jobs are outstanding (about one frame at 60 fps)
+POLL_INTERVAL_MS = 16
+# How long closing the app waits for queued jobs to finish
+SHUTDOWN_TIMEOUT = 30
+
+
+class Job:
+    """A unit of work submitted to the BlockerWorker"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, func, args, on_done, on_error, batch=None):
+        self.id = next(self._ids)
+        self.func = func
+        self.args = args
+        self.batch = batch
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+        self.started = False
+
+    def cancel(self):
+        """
+        Cancel the job. A job that has not started is skipped; for a job that
+        is already running, its callbacks are simply not called.
+        """
+        self.cancelled = True
+
+
+class BlockerWorker:
+    """
+    Runs jobs on one background thread and delivers results on the Tk thread
+    """
+
+    def __init__(self, root, on_busy_changed=None, poll_interval_ms=POLL_INTERVAL_MS):
+        self.root = root
+        self.on_busy_changed = on_busy_changed
+        self.poll_interval_ms = poll_interval_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._outstanding = 0
+        self._polling = False
+        self._thread = threading.Thread(target=self._run, name="BlockerWorker", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self):
+        return self._outstanding > 0
+
+    def submit(self, func, *args, on_done=None, on_error=None, batch=None):
+        """
+        Queue func(*args). on_done(result) or on_error(exception) is called on
+        the Tk thread once it finishes. With batch (a context manager factory),
+        it runs inside batch() together with the jobs queued right after it
+        that have the same batch. Returns the Job, which can be cancelled.
+        """
+        job = Job(func, args, on_done, on_error, batch)
+        self._outstanding += 1
+        if self._outstanding == 1 and self.on_busy_changed is not None:
+            self.on_busy_changed(True)
+        self._jobs.put(job)
+        self._schedule_poll()
+        return job
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """
+        Finish the queued jobs and stop the thread. Their callbacks are not
+        called any more (the window is going away), errors are printed.
+        Jobs that have not started when the timeout runs out are dropped
+        with a warning.
+        """
+        pending = self._jobs.qsize()
+        if pending:
+            print(f"⏳ Finishing {pending} queued operation(s) before closing...")
+        self._jobs.put(None)
+        self._thread.join(timeout)
+        self._report_undelivered()
+        if not self._thread.is_alive():
+            return
+        dropped = 0
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.cancel()
+                dropped += 1
+        # The drain above may have taken the stop marker too
+        self._jobs.put(None)
+        if dropped:
+            print(f"⚠️ Dropped {dropped} queued operation(s) that did not start within {timeout} s")
+
+    def _report_undelivered(self):
+        """Print the errors of finished jobs whose results will never be polled"""
+        while True:
+            try:
+                job, _, error = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if error is not None and not job.cancelled:
+                print(f"❌ Background job failed: {error}")
+
+    def _run(self):
+        carried = None
+        while True:
+            job = carried if carried is not None else self._jobs.get()
+            carried = None
+            if job is None:
+                return
+            if job.batch is None:
+                self._results.put(self._execute(job))
+                continue
+            # Take the jobs queued right behind it that share its batch
+            group = [job]
+            stopping = False
+            while True:
+                try:
+                    following = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if following is None:
+                    stopping = True
+                    break
+                if following.batch == job.batch:
+                    group.append(following)
+                else:
+                    carried = following
+                    break
+            results = []
+            try:
+                with job.batch():
+                    for member in group:
+                        results.append(self._execute(member))
+            except Exception as e:
+                # Leaving the batch applies the deferred update
+                print(f"❌ Background batch failed: {e}")
+            # Delivered once the batch, and so the hosts file, is done
+            for result in results:
+                self._results.put(result)
+            if stopping:
+                return
+
+    def _execute(self, job):
+        """Run one job, return its (job, result, error)"""
+        if job.cancelled:
+            return job, None, None
+        job.started = True
+        try:
+            return job, job.func(*job.args), None
+        except SystemExit as e:
+            # The app relaunches elevated before submitting (see
+            # relaunch_if_needed), so this is a bug, not a relaunch
+            return job, None, RuntimeError(f"Job tried to exit the app (code {e.code})")
+        except Exception as e:
+            return job, None, e
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                job, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if not job.cancelled:
+                try:
+                    if error is not None:
+                        if job.on_error is not None:
+                            job.on_error(error)
+                        else:
+                            print(f"❌ Background job failed: {error}")
+                    elif job.on_done is not None:
+                        job.on_done(result)
+                except Exception as e:
+                    print(f"❌ Error handling job result: {e}")
+        if self._outstanding > 0:
+            self._schedule_poll()
+        elif self.on_busy_changed is not None:
+            self.on_busy_changed(False)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Blocking backends for YouTube Stopper
+
+YouTubeBlocker decides *what* to block (a DomainTrie of rules, or the
+compiled profiles, which offer the same methods); a backend decides *how*. Every backend offers the same small interface:
+
+    apply(trie)   make the rule set the active block list
+    diff(trie)    (added, removed) entries compared with what is active
+    clear()       remove all blocking
+    status()      True while blocking is active
+    flush()       make the change visible to running programs
+
+Engines:
+    windows-hosts  C:\\Windows\\System32\\drivers\\etc\\hosts + ipconfig /flushdns
+    posix-hosts    /etc/hosts + resolvectl flush-caches or nscd invalidation
+    dns            local DNS sinkhole (see dns_sinkhole.py)
+    dry-run        in memory only, for tests, benchmarks and CI
+
+The engine is picked once at startup by select_backend(), either from the
+YOUTUBE_STOPPER_BACKEND environment variable or from the platform. The dns
+engine reads its addresses from the environment too:
+
+    YOUTUBE_STOPPER_DNS_LISTEN      127.0.0.1:53 (a port below 1024 needs admin/root)
+    YOUTUBE_STOPPER_DNS_UPSTREAM    1.1.1.1:53
+    YOUTUBE_STOPPER_DNS_BLOCK_MODE  zero or nxdomain
+"""
+
+import os
+import sys
+from abc import ABC, abstractmethod
+
+from hosts_file import HostsFile, diff_entries, apply_diff
+from instrumentation import span
+
+BACKEND_ENV_VAR = "YOUTUBE_STOPPER_BACKEND"
+DNS_LISTEN_ENV_VAR = "YOUTUBE_STOPPER_DNS_LISTEN"
+DNS_UPSTREAM_ENV_VAR = "YOUTUBE_STOPPER_DNS_UPSTREAM"
+DNS_BLOCK_MODE_ENV_VAR = "YOUTUBE_STOPPER_DNS_BLOCK_MODE"
+
+DNS_BLOCK_MODES = ("zero", "nxdomain")
+
+SECTION_HEADER = "# Blocking domains for productivity"
+
+
+class BlockingBackend(ABC):
+    """
+    Base class for the ways YouTube Stopper can block domains
+    """
+
+    name = "base"
+    # Whether changing the block list needs administrator/root rights
+    requires_admin = False
+    # File that holds the block list, for backends that have one
+    path = None
+
+    @abstractmethod
+    def apply(self, trie):
+        """Make the rule set in trie the active block list, return the (added, removed) entries"""
+
+    @abstractmethod
+    def diff(self, trie):
+        """Return (added, removed) entries between the active list and trie"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove all blocking"""
+
+    @abstractmethod
+    def status(self):
+        """Return True while blocking is active"""
+
+    def flush(self):
+        """Make the change visible to running programs, return True on success"""
+        return True
+
+    def close(self):
+        """Release any resources (threads, sockets) held by the backend"""
+
+    def recover(self):
+        """Finish or undo a write interrupted by a crash; returns [(action, path)]"""
+        return []
+
+
+class HostsFileBackend(BlockingBackend):
+    """
+    Blocks by writing a managed section into a hosts file
+    """
+
+    name = "hosts"
+    requires_admin = True
+    # Commands tried in order to flush the OS resolver cache
+    flush_commands = []
+
+    def __init__(self, path, index_path=None, address="127.0.0.1"):
+        self.path = str(path)
+        self.address = address
+        self.hosts = HostsFile(self.path, index_path=index_path)
+
+    def entries(self, trie):
+        return trie.hosts_entries(self.address)
+
+    def diff(self, trie):
+        current = self.hosts.read_section() if self.hosts.exists() else None
+        with span("diff"):
+            return diff_entries(current or [], self.entries(trie))
+
+    def apply(self, trie):
+        """
+        Write the section, changing only added/removed entries if one exists.
+        Nothing is written when the section is already up to date.
+        """
+        entries = self.entries(trie)
+        target = [SECTION_HEADER] + entries
+        current = self.hosts.read_section() if self.hosts.exists() else None
+        if current is None:
+            added, removed = entries, []
+        else:
+            with span("diff"):
+                added, removed = diff_entries(current, target)
+                if not added and not removed:
+                    return added, removed
+                target = apply_diff(current, added, removed)
+        self.hosts.rewrite(target)
+        return added, removed
+
+    def restore(self, trie):
+        """Write a fresh section even if the current one only differs in comments"""
+        return self.hosts.rewrite([SECTION_HEADER] + self.entries(trie))
+
+    def clear(self):
+        return self.hosts.rewrite(None)
+
+    def status(self):
+        return self.hosts.exists() and self.hosts.has_section()
+
+    def recover(self):
+        return self.hosts.recover()
+
+    def flush(self):
+        # Imported here so reading the status never pays for them
+        import shutil
+        import subprocess
+        for command in self.flush_commands:
+            if shutil.which(command[0]) is None:
+                continue
+            try:
+                subprocess.run(command, capture_output=True, check=True)
+                return True
+            except (subprocess.CalledProcessError, OSError):
+                continue
+        return False
+
+
+class WindowsHostsBackend(HostsFileBackend):
+    name = "windows-hosts"
+    default_path = r"C:\Windows\System32\drivers\etc\hosts"
+    flush_commands = [['ipconfig', '/flushdns']]
+
+
+class PosixHostsBackend(HostsFileBackend):
+    name = "posix-hosts"
+    default_path = "/etc/hosts"
+    flush_commands = [
+        ['resolvectl', 'flush-caches'],
+        ['systemd-resolve', '--flush-caches'],
+        ['nscd', '-i', 'hosts'],
+        ['dscacheutil', '-flushcache'],
+    ]
+
+
+class DnsStubBackend(BlockingBackend):
+    """
+    Blocks through the local DNS sinkhole. Applying or clearing only swaps
+    the matcher or flips a flag; no file is touched and nothing is flushed.
+    """
+
+    name = "dns"
+
+    def __init__(self, listen=("127.0.0.1", 53), upstream=("1.1.1.1", 53), block_mode="zero"):
+        from dns_sinkhole import DnsSinkhole
+        if block_mode not in DNS_BLOCK_MODES:
+            raise ValueError(f"Unknown DNS block mode '{block_mode}'. Choose from: {', '.join(DNS_BLOCK_MODES)}")
+        # Binding a privileged port fails with PermissionError for normal users
+        self.requires_admin = listen[1] < 1024
+        self._trie = None
+        self.sinkhole = DnsSinkhole(self._match, upstream=upstream, listen=listen,
+                                    block_mode=block_mode)
+        self.sinkhole.blocking_enabled = False
+        self._running = False
+
+    def _match(self, hostname):
+        trie = self._trie
+        return trie is not None and trie.match(hostname)
+
+    def _ensure_running(self):
+        if not self._running:
+            self.sinkhole.start_in_thread()
+            self._running = True
+
+    def apply(self, trie):
+        changes = self.diff(trie)
+        self._ensure_running()
+        self._trie = trie
+        self.sinkhole.blocking_enabled = True
+        return changes
+
+    def diff(self, trie):
+        current = set(self._trie.rules) if self._trie is not None else set()
+        target = set(trie.rules)
+        return [rule for rule in trie.rules if rule not in current], current - target
+
+    def clear(self):
+        self.sinkhole.blocking_enabled = False
+        return 0
+
+    def status(self):
+        return self.sinkhole.blocking_enabled
+
+    def close(self):
+        if self._running:
+            self.sinkhole.stop_thread()
+            self._running = False
+
+
+class DryRunBackend(BlockingBackend):
+    """
+    Keeps the block list in memory and records every operation.
+    Needs no admin rights, so the whole app can run on CI.
+    """
+
+    name = "dry-run"
+
+    def __init__(self, address="127.0.0.1"):
+        self.address = address
+        self.entries = None
+        self.operations = []
+
+    def _entries(self, trie):
+        return trie.hosts_entries(self.address)
+
+    def apply(self, trie):
+        changes = self.diff(trie)
+        self.entries = self._entries(trie)
+        self.operations.append(("apply", len(self.entries)))
+        return changes
+
+    def diff(self, trie):
+        return diff_entries(self.entries or [], self._entries(trie))
+
+    def clear(self):
+        self.entries = None
+        self.operations.append(("clear", 0))
+        return 0
+
+    def status(self):
+        return self.entries is not None
+
+    def flush(self):
+        self.operations.append(("flush", 0))
+        return True
+
+
+BACKENDS = {
+    WindowsHostsBackend.name: WindowsHostsBackend,
+    PosixHostsBackend.name: PosixHostsBackend,
+    DnsStubBackend.name: DnsStubBackend,
+    DryRunBackend.name: DryRunBackend,
+}
+
+
+def parse_address(value, default_port=53):
+    """'1.1.1.1', '1.1.1.1:5353', '::1' or '[::1]:5353' -> (host, port)"""
+    value = value.strip()
+    if value.startswith('['):
+        host, _, rest = value[1:].partition(']')
+        port = rest[1:] if rest.startswith(':') else ""
+    elif value.count(':') == 1:
+        host, port = value.split(':')
+    else:
+        host, port = value, ""
+    try:
+        port = int(port) if port else default_port
+    except ValueError:
+        raise ValueError(f"Invalid port in address '{value}'")
+    if not host or not 0 < port < 65536:
+        raise ValueError(f"Invalid address '{value}'")
+    return host, port
+
+
+def dns_options_from_env():
+    """Keyword arguments for DnsStubBackend from the YOUTUBE_STOPPER_DNS_* variables"""
+    options = {}
+    if os.environ.get(DNS_LISTEN_ENV_VAR):
+        options["listen"] = parse_address(os.environ[DNS_LISTEN_ENV_VAR])
+    if os.environ.get(DNS_UPSTREAM_ENV_VAR):
+        options["upstream"] = parse_address(os.environ[DNS_UPSTREAM_ENV_VAR])
+    if os.environ.get(DNS_BLOCK_MODE_ENV_VAR):
+        options["block_mode"] = os.environ[DNS_BLOCK_MODE_ENV_VAR].strip().lower()
+    return options
+
+
+def select_backend(name=None, hosts_file=None, index_path=None):
+    """
+    Pick the blocking engine: an explicit name, then $YOUTUBE_STOPPER_BACKEND,
+    then the hosts file backend for this platform
+    """
+    name = name or os.environ.get(BACKEND_ENV_VAR)
+    if not name:
+        name = WindowsHostsBackend.name if sys.platform == "win32" else PosixHostsBackend.name
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown blocking backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    if issubclass(backend_class, HostsFileBackend):
+        return backend_class(hosts_file or backend_class.default_path, index_path=index_path)
+    if backend_class is DnsStubBackend:
+        return backend_class(**dns_options_from_env())
+    return backend_class()
@@ -30,7 +30,8 @@ def explain_blocking_mechanism():
     
     print("📁 FILE LOCATIONS:")
     print("• Hosts file: C:\\Windows\\System32\\drivers\\etc\\hosts")
-    print("• Custom domains: %USERPROFILE%\\youtube_stopper_custom_blocklist.txt")
+    print("• Custom domains: %USERPROFILE%\\youtube_stopper_blocklist.db")
+    print("  (export as text with: python youtube_stopper.py export <file>)")
     print("• Backup: %USERPROFILE%\\youtube_stopper_hosts_backup.txt")
     print()
     
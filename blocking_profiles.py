@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Blocking profiles for YouTube Stopper
+
+A profile is a named list of rules that can be switched on and off on its
+own: "video" (YouTube), "social", "news", and "custom" (the domains added
+in the app, kept in the BlocklistStore). The built-in lists are written to
+~/youtube_stopper_profiles/<name>.txt on first use and can be edited there.
+Any other <name>.txt in that folder becomes a profile as well.
+
+Each profile is compiled once into a ready-made hosts fragment
+(<name>.hosts): the rules expanded into concrete hostnames and formatted as
+hosts entries. The first lines of a fragment record the SHA-256 of its
+source, and the fragment is rebuilt only when that hash changes. Switching
+profiles then just concatenates fragments. Nothing is expanded again.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+from hosts_watcher import stat_fingerprint
+
+# Sites that also get an m. entry for their mobile version
+SOCIAL_SITES = ['facebook', 'instagram', 'twitter', 'tiktok']
+
+CUSTOM_PROFILE = "custom"
+
+BUILTIN_PROFILES = {
+    "video": [
+        'youtube.com',
+        'www.youtube.com',
+        'm.youtube.com',
+        'music.youtube.com',
+        'youtu.be',
+        'gaming.youtube.com',
+    ],
+    # Wildcards: each site is written as site, www.site and m.site
+    "social": [
+        '*.facebook.com',
+        '*.instagram.com',
+        '*.twitter.com',
+        '*.x.com',
+        '*.tiktok.com',
+        '*.reddit.com',
+    ],
+    "news": [
+        'news.google.com',
+        '*.cnn.com',
+        '*.bbc.com',
+        '*.nytimes.com',
+        '*.theguardian.com',
+        'news.ycombinator.com',
+    ],
+}
+
+# Active until the user changes it: the behaviour before profiles existed
+DEFAULT_ACTIVE = ("video", CUSTOM_PROFILE)
+
+# Profile names become file names in the profiles folder
+PROFILE_NAME_PATTERN = re.compile(r"[a-z0-9-]+")
+
+# Bump when the expansion rules change so every fragment is rebuilt
+FRAGMENT_VERSION = 2
+FRAGMENT_MAGIC = "# youtube-stopper fragment"
+
+
+def expand_rules(rules):
+    """
+    Yield each rule, plus the usual www./m. variants of plain domains.
+    Only applied to the custom profile, where users type bare domains;
+    the other lists name their hostnames exactly.
+    """
+    for rule in rules:
+        yield rule
+        if rule.startswith(('!', '*.')):
+            continue
+        if not rule.startswith(('www.', 'm.')):
+            yield f'www.{rule}'
+        if any(social in rule for social in SOCIAL_SITES):
+            yield f'm.{rule}'
+
+
+class CompiledBlocklist:
+    """
+    The active profiles, ready to hand to a blocking backend.
+
+    Offers the same interface backends use on a DomainTrie:
+    hosts_entries(), concrete_hosts(), match() and rules. The hosts entries
+    come straight from the compiled fragments; the merged trie is only
+    built if a backend asks for match() or rules, or if some profile has
+    exception rules.
+    """
+
+    def __init__(self, fragment_paths, address, exceptions, trie_factory):
+        self.fragment_paths = fragment_paths
+        self.address = address
+        self.exceptions = exceptions
+        self._trie_factory = trie_factory
+        self._entries = None
+        self._trie = None
+
+    def hosts_entries(self, address):
+        if address != self.address:
+            return [f"{address} {hostname}" for hostname in self.concrete_hosts()]
+        if self._entries is None:
+            entries = {}
+            for path in self.fragment_paths:
+                for entry in _read_fragment_entries(path):
+                    entries[entry] = None
+            if self.exceptions:
+                # Across profiles, the most specific rule wins, exactly as
+                # match() decides for the DNS backend
+                trie = self._get_trie()
+                entries = [entry for entry in entries if trie.match(entry.split(None, 1)[1])]
+            self._entries = list(entries)
+        return self._entries
+
+    def concrete_hosts(self):
+        return [entry.split(None, 1)[1] for entry in self.hosts_entries(self.address)]
+
+    def _get_trie(self):
+        if self._trie is None:
+            self._trie = self._trie_factory()
+        return self._trie
+
+    def match(self, hostname):
+        return self._get_trie().match(hostname)
+
+    @property
+    def rules(self):
+        return self._get_trie().rules
+
+
+def check_profile_name(name):
+    """Raise ValueError unless name is lowercase letters, digits and dashes"""
+    if not isinstance(name, str) or not PROFILE_NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"Invalid profile name {name!r}: use a-z, 0-9 and '-'")
+    return name
+
+
+def _read_fragment_entries(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if not line.startswith('#') and line.strip()]
+
+
+class ProfileManager:
+    """
+    Knows every profile, which ones are active, and keeps their compiled
+    hosts fragments up to date
+    """
+
+    def __init__(self, directory, store):
+        self.directory = str(directory)
+        self.store = store
+        self.state_file = os.path.join(self.directory, "active.json")
+        # name -> (fingerprint, sha256) for the text sources
+        self._source_hashes = {}
+        # (folder and state file fingerprints, active names)
+        self._active = (None, None)
+        # (name, address) -> (sha256, fragment path, exception rules)
+        self._compiled = {}
+        self._trie = None
+        self._trie_key = None
+
+    # ------------------------------------------------------------------
+    # Profiles and the active set
+
+    def names(self):
+        self._ensure_sources()
+        names = {name[:-4] for name in os.listdir(self.directory) if name.endswith(".txt")}
+        return sorted(names | {CUSTOM_PROFILE})
+
+    def active(self):
+        """Names of the active profiles, re-read only when the files change"""
+        self._ensure_sources()
+        key = (stat_fingerprint(self.directory), stat_fingerprint(self.state_file))
+        if self._active[0] != key:
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    active = json.load(f).get("active", [])
+            except FileNotFoundError:
+                active = DEFAULT_ACTIVE
+            known = set(self.names())
+            self._active = (key, [name for name in active if name in known])
+        return list(self._active[1])
+
+    def set_active(self, name, enabled):
+        """Switch a profile on or off, return True if that changed anything"""
+        if name not in self.names():
+            raise ValueError(f"Unknown profile '{name}'. Choose from: {', '.join(self.names())}")
+        active = self.active()
+        if (name in active) == enabled:
+            return False
+        active = active + [name] if enabled else [n for n in active if n != name]
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump({"active": active}, f, indent=2)
+        return True
+
+    def rules(self, name):
+        """The source rules of a profile"""
+        if name == CUSTOM_PROFILE:
+            return list(self.store)
+        with open(self._source_path(name), 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    # ------------------------------------------------------------------
+    # Compilation
+
+    def compile(self, address):
+        """Return a CompiledBlocklist of the active profiles for this address"""
+        paths, exceptions = [], []
+        for name in self.active():
+            _, path, profile_exceptions = self._fragment(name, address)
+            paths.append(path)
+            exceptions.extend(profile_exceptions)
+        return CompiledBlocklist(paths, address, exceptions, self.rule_trie)
+
+    def rule_trie(self):
+        """DomainTrie of every rule in the active profiles, rebuilt on change"""
+        active = self.active()
+        key = tuple((name, self.source_hash(name)) for name in active)
+        if self._trie is None or self._trie_key != key:
+            from youtube_stopper import DomainTrie
+            trie = DomainTrie()
+            for name in active:
+                for rule in self._expanded_rules(name):
+                    trie.add_rule(rule)
+            self._trie, self._trie_key = trie, key
+        return self._trie
+
+    def _expanded_rules(self, name):
+        rules = self.rules(name)
+        return list(expand_rules(rules)) if name == CUSTOM_PROFILE else rules
+
+    def source_hash(self, name):
+        """SHA-256 of a profile's source list"""
+        if name == CUSTOM_PROFILE:
+            return self.store.content_hash()
+        path = self._source_path(name)
+        fingerprint = stat_fingerprint(path)
+        cached = self._source_hashes.get(name)
+        if cached is None or cached[0] != fingerprint:
+            with open(path, 'rb') as f:
+                cached = (fingerprint, hashlib.sha256(f.read()).hexdigest())
+            self._source_hashes[name] = cached
+        return cached[1]
+
+    def _fragment(self, name, address):
+        """(hash, path, exceptions) of an up-to-date fragment, compiling if needed"""
+        source_hash = hashlib.sha256(
+            f"{FRAGMENT_VERSION}\n{address}\n{self.source_hash(name)}".encode('utf-8')).hexdigest()
+        cached = self._compiled.get((name, address))
+        if cached is not None and cached[0] == source_hash and os.path.exists(cached[1]):
+            return cached
+
+        path = os.path.join(self.directory, f"{name}.hosts")
+        header = self._read_header(path)
+        if header is not None and header.get("sha256") == source_hash:
+            compiled = (source_hash, path, header.get("exceptions", []))
+        else:
+            compiled = (source_hash, path, self._write_fragment(name, address, source_hash, path))
+        self._compiled[(name, address)] = compiled
+        return compiled
+
+    def _write_fragment(self, name, address, source_hash, path):
+        from youtube_stopper import DomainTrie
+        import tempfile
+
+        rules = self._expanded_rules(name)
+        hostnames = DomainTrie(rules).concrete_hosts()
+        exceptions = sorted({rule[1:] for rule in rules if rule.startswith('!')})
+        header = {"profile": name, "sha256": source_hash, "exceptions": exceptions}
+
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}-", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as out:
+                out.write(f"{FRAGMENT_MAGIC} {json.dumps(header)}\n")
+                out.writelines(f"{address} {hostname}\n" for hostname in hostnames)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        print(f"🧩 Compiled profile '{name}': {len(hostnames)} hostname(s)")
+        return exceptions
+
+    @staticmethod
+    def _read_header(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                first = f.readline()
+        except FileNotFoundError:
+            return None
+        if not first.startswith(FRAGMENT_MAGIC):
+            return None
+        try:
+            return json.loads(first[len(FRAGMENT_MAGIC):])
+        except ValueError:
+            return None
+
+    # ------------------------------------------------------------------
+    # Source files
+
+    def write_source(self, name, rules, comment=None):
+        """Replace a profile's source list atomically (used by subscriptions)"""
+        import tempfile
+
+        check_profile_name(name)
+        self._ensure_sources()
+        path = os.path.join(self.directory, f"{name}.txt")
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}-", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as out:
+                if comment:
+                    out.write(f"# {comment}\n")
+                out.writelines(rule + '\n' for rule in rules)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def remove_source(self, name):
+        """Delete a profile's source list and compiled fragment"""
+        check_profile_name(name)
+        for suffix in (".txt", ".hosts"):
+            try:
+                os.remove(os.path.join(self.directory, f"{name}{suffix}"))
+            except FileNotFoundError:
+                pass
+        self._source_hashes.pop(name, None)
+        for key in [key for key in self._compiled if key[0] == name]:
+            del self._compiled[key]
+
+    def _source_path(self, name):
+        self._ensure_sources()
+        path = os.path.join(self.directory, f"{name}.txt")
+        if not os.path.exists(path):
+            raise ValueError(f"Unknown profile '{name}'")
+        return path
+
+    def _ensure_sources(self):
+        """Write the built-in lists out on first use so they can be edited"""
+        if os.path.isdir(self.directory):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for name, rules in BUILTIN_PROFILES.items():
+            with open(os.path.join(self.directory, f"{name}.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"# YouTube Stopper profile '{name}': one rule per line\n")
+                f.write("# (example.com, *.example.com, !allowed.example.com)\n")
+                f.writelines(rule + '\n' for rule in rules)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Blocklist file formats for YouTube Stopper
+
+Streams domains out of the three common blocklist formats:
+- hosts files:      0.0.0.0 ads.example.com tracker.example.com
+- plain lists:      ads.example.com
+- AdBlock filters:  ||ads.example.com^$third-party
+
+Lines are parsed one at a time, so lists with hundreds of thousands of
+entries can be imported straight from a file or stdin.
+"""
+
+import re
+
+DOMAIN_PATTERN = re.compile(
+    r'^[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?)*$'
+)
+
+# Hostnames that appear in every hosts file and must never be imported
+IGNORED_HOSTS = {
+    'localhost', 'localhost.localdomain', 'local', 'broadcasthost',
+    'ip6-localhost', 'ip6-loopback', 'ip6-localnet', 'ip6-mcastprefix',
+    'ip6-allnodes', 'ip6-allrouters', 'ip6-allhosts', '0.0.0.0',
+}
+
+
+def is_valid_domain(domain):
+    """Basic domain validation"""
+    # fullmatch: with match(), "$" would also accept a trailing newline
+    return bool(DOMAIN_PATTERN.fullmatch(domain)) and len(domain) <= 253
+
+
+def is_valid_rule(rule):
+    """
+    Validate a blocklist rule: a domain, optionally written as *.domain
+    (domain and all subdomains) and/or prefixed with ! (exception)
+    """
+    if rule.startswith('!'):
+        rule = rule[1:]
+    if rule.startswith('*.'):
+        rule = rule[2:]
+    return is_valid_domain(rule)
+
+
+def normalize_domain(domain):
+    """Lowercase a domain and drop a trailing dot, or return None if invalid"""
+    domain = domain.strip().lower().rstrip('.')
+    if not domain or domain in IGNORED_HOSTS or _looks_like_address(domain):
+        return None
+    if not is_valid_domain(domain):
+        return None
+    return domain
+
+
+def normalize_rule(rule):
+    """
+    Lowercase a rule (domain, *.domain, !domain) and drop a trailing dot,
+    or return None if it is not a valid rule
+    """
+    if not isinstance(rule, str):
+        return None
+    rule = rule.strip()
+    prefix = ""
+    if rule.startswith('!'):
+        prefix, rule = '!', rule[1:]
+    if rule.startswith('*.'):
+        prefix, rule = prefix + '*.', rule[2:]
+    # Same checks as imported domains: no addresses, no localhost names
+    domain = normalize_domain(rule)
+    if domain is None or not is_valid_rule(prefix + domain):
+        return None
+    return prefix + domain
+
+
+def normalize_rules(rules):
+    """Normalize every rule; raises ValueError on the first invalid one"""
+    normalized = []
+    for rule in rules:
+        value = normalize_rule(rule)
+        if value is None:
+            raise ValueError(f"Invalid domain or rule: {rule!r}")
+        normalized.append(value)
+    return normalized
+
+
+def parse_line(line):
+    """Return the domains found on one blocklist line (hosts, plain or AdBlock)"""
+    line = line.strip()
+    if not line or line[0] in '#![':
+        return []
+
+    # AdBlock-style network rule: ||example.com^ or ||example.com^$options
+    if line.startswith('||'):
+        rule = line[2:].split('$', 1)[0]
+        rule = rule.rstrip('^|')
+        if '/' in rule or '*' in rule or '^' in rule:
+            return []
+        domain = normalize_domain(rule)
+        return [domain] if domain else []
+
+    # Exception rules and cosmetic filters do not block anything
+    if line.startswith('@@') or '##' in line or '#@#' in line:
+        return []
+
+    # Strip trailing comments
+    line = line.split('#', 1)[0]
+    fields = line.split()
+    if not fields:
+        return []
+
+    # hosts format: address followed by one or more hostnames
+    if len(fields) > 1 and _looks_like_address(fields[0]):
+        candidates = fields[1:]
+    else:
+        candidates = fields[:1]
+
+    domains = []
+    for candidate in candidates:
+        domain = normalize_domain(candidate)
+        if domain:
+            domains.append(domain)
+    return domains
+
+
+def _looks_like_address(field):
+    return ':' in field or field.replace('.', '').isdigit()
+
+
+def iter_domains(lines):
+    """Yield each valid domain once, in first-seen order"""
+    seen = set()
+    for line in lines:
+        for domain in parse_line(line):
+            if domain not in seen:
+                seen.add(domain)
+                yield domain
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Persistent custom blocklist store for YouTube Stopper
+
+Domains live in a compact sorted snapshot (one bytes blob plus an array of
+offsets) instead of a Python list of str, so a million entries take a
+fraction of the memory and membership is a binary search that finishes in
+microseconds. Inserts and deletes are appended to a small journal and
+folded back into a new snapshot by a background compaction thread.
+
+The plain-text blocklist is only used as an import/export format.
+"""
+
+import os
+import heapq
+import hashlib
+import struct
+import threading
+from array import array
+
+from hosts_watcher import stat_fingerprint
+from blocklist_formats import normalize_rule, normalize_rules
+
+SNAPSHOT_MAGIC = b"YSBL1\n"
+SNAPSHOT_HEADER = struct.Struct("<II")  # entry count, blob length
+
+# Compact once the journal holds this many operations (or a quarter of the snapshot)
+COMPACT_THRESHOLD = 10_000
+
+
+def _lookup_key(domain):
+    """
+    The normalized form of domain for lookups and removal. Strings that are
+    not valid rules are used as they are: they cannot have been added, but
+    older stores may still hold one.
+    """
+    return normalize_rule(domain) or domain
+
+
+class BlocklistStore:
+    """
+    Sorted set of domains backed by a snapshot file and an append-only journal
+    """
+
+    def __init__(self, snapshot_path, legacy_text_path=None, compact_threshold=COMPACT_THRESHOLD):
+        self.snapshot_path = str(snapshot_path)
+        self.journal_path = self.snapshot_path + ".journal"
+        self.legacy_text_path = str(legacy_text_path) if legacy_text_path else None
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._compactor = None
+        # Bumped on every change so callers can cheaply tell if they are stale
+        self.generation = 0
+        self._content_hash = (None, None)
+
+    # ------------------------------------------------------------------
+    # Public set-like API
+
+    def __contains__(self, domain):
+        """Membership under the same normalization as add()"""
+        key = _lookup_key(domain)
+        with self._lock:
+            self._ensure_loaded()
+            return self._contains(key)
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return self._count
+
+    def __iter__(self):
+        """Iterate over all domains in sorted order"""
+        with self._lock:
+            self._ensure_loaded()
+            # The snapshot arrays are never modified in place, so only the
+            # small overlays need copying to iterate without the lock.
+            view = (self._data, self._blob_start, self._offsets, self._base_count,
+                    set(self._frozen_added), set(self._frozen_removed),
+                    set(self._added), set(self._removed))
+        return self._iter_view(*view)
+
+    def add(self, domains):
+        """
+        Add domains, return how many were new. Every entry is normalized
+        first; if any is not a valid rule, nothing is added and ValueError
+        is raised, since the entries end up in the hosts file.
+        """
+        return self._apply(b"+", normalize_rules(domains))
+
+    def remove(self, domains):
+        """Remove domains (normalized like add()), return how many were present"""
+        return self._apply(b"-", [_lookup_key(domain) for domain in domains])
+
+    def refresh(self):
+        """
+        Pick up changes made by another process: replay new journal entries,
+        or reload everything when the snapshot was replaced or compacted.
+        """
+        with self._lock:
+            if self._loaded:
+                self._catch_up()
+
+    def compact(self, wait=True):
+        """Fold the journal into a new snapshot"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._compactor is None:
+                self._rotate_journal()
+                self._compactor = threading.Thread(target=self._compact_frozen,
+                                                   name="BlocklistCompactor", daemon=True)
+                self._compactor.start()
+            compactor = self._compactor
+        if wait:
+            compactor.join()
+
+    def content_hash(self):
+        """
+        SHA-256 that changes whenever the set of domains does. It covers the
+        snapshot blob and the overlays, so the same set can hash differently
+        before and after a compaction; callers only use it to detect change.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._content_hash[0] != self.generation:
+                digest = hashlib.sha256()
+                blob_end = self._blob_start + self._offsets[self._base_count]
+                digest.update(memoryview(self._data)[self._blob_start:blob_end])
+                for overlay in (self._frozen_added, self._frozen_removed, self._added, self._removed):
+                    digest.update(b"\0" + "\n".join(sorted(overlay)).encode('utf-8'))
+                self._content_hash = (self.generation, digest.hexdigest())
+            return self._content_hash[1]
+
+    def export_text(self, out):
+        """Write every domain, one per line, to a text stream"""
+        count = 0
+        for domain in self:
+            out.write(domain + '\n')
+            count += 1
+        return count
+
+    # ------------------------------------------------------------------
+    # Loading
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._load()
+            self._migrate_legacy_text()
+
+    def _load(self):
+        self._load_base()
+        self.generation += 1
+
+        # Overlays on top of the snapshot: the frozen one is being compacted,
+        # the live one collects new operations.
+        self._frozen_added, self._frozen_removed = set(), set()
+        self._added, self._removed = set(), set()
+        self._count = self._base_count
+        self._journal_ops = 0
+        self._journal_pos = 0
+        self._loaded = True
+
+        compacting = self.journal_path + ".compacting"
+        if os.path.exists(compacting):
+            # A compaction was interrupted; its operations are idempotent
+            self._replay(compacting, 0)
+        if os.path.exists(self.journal_path):
+            self._journal_pos = self._replay(self.journal_path, 0)
+
+    def _migrate_legacy_text(self):
+        """Import the old plain-text blocklist the first time the store is used"""
+        if (self.legacy_text_path and os.path.exists(self.legacy_text_path)
+                and not os.path.exists(self.snapshot_path)
+                and not os.path.exists(self.journal_path)):
+            with open(self.legacy_text_path, 'r', encoding='utf-8') as f:
+                rules = (normalize_rule(line) for line in f if not line.startswith('#'))
+                # Lines that were never valid are dropped rather than failing the migration
+                domains = [rule for rule in rules if rule]
+            if domains:
+                self.add(domains)
+
+    def _catch_up(self):
+        """Apply what other processes wrote since we last looked (lock held)"""
+        if stat_fingerprint(self.snapshot_path) != self._snapshot_fingerprint:
+            self._load()
+            return
+        size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        if size < self._journal_pos:
+            self._load()
+        elif size > self._journal_pos:
+            self._journal_pos += self._replay(self.journal_path, self._journal_pos)
+
+    def _replay(self, path, position):
+        """Apply journal entries from position onwards, return bytes consumed"""
+        consumed = 0
+        with open(path, 'rb') as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partially written last entry, pick it up on the next refresh
+                    break
+                consumed += len(line)
+                op, domain = line[:1], line[1:-1].decode('utf-8')
+                if op == b"+":
+                    self._add_one(domain)
+                elif op == b"-":
+                    self._remove_one(domain)
+                self._journal_ops += 1
+        return consumed
+
+    # ------------------------------------------------------------------
+    # Mutation
+
+    def _apply(self, op, domains):
+        with self._lock:
+            self._ensure_loaded()
+            # Another process (GUI, CLI, daemon) may have appended first
+            self._catch_up()
+            changed = []
+            apply_one = self._add_one if op == b"+" else self._remove_one
+            for domain in domains:
+                if apply_one(domain):
+                    changed.append(domain)
+            if changed:
+                record = b"".join(op + d.encode('utf-8') + b"\n" for d in changed)
+                with open(self.journal_path, 'ab') as f:
+                    f.write(record)
+                    f.flush()
+                    # In append mode the offset ends up right after our record
+                    end = os.lseek(f.fileno(), 0, os.SEEK_CUR)
+                self._journal_ops += len(changed)
+                if end - len(record) == self._journal_pos:
+                    self._journal_pos = end
+                else:
+                    # Someone appended in between: replay from where we were,
+                    # in file order and our own entries included, so the
+                    # last operation on each domain wins as it would on reload
+                    self._journal_pos += self._replay(self.journal_path, self._journal_pos)
+                self._maybe_compact()
+            return len(changed)
+
+    def _add_one(self, domain):
+        if self._contains(domain):
+            return False
+        self.generation += 1
+        if domain in self._removed:
+            # Still present in the layers below, just stop hiding it
+            self._removed.discard(domain)
+        else:
+            self._added.add(domain)
+        self._count += 1
+        return True
+
+    def _remove_one(self, domain):
+        if not self._contains(domain):
+            return False
+        self.generation += 1
+        if domain in self._added:
+            self._added.discard(domain)
+        else:
+            self._removed.add(domain)
+        self._count -= 1
+        return True
+
+    def _contains(self, domain):
+        if domain in self._removed:
+            return False
+        if domain in self._added:
+            return True
+        if domain in self._frozen_removed:
+            return False
+        if domain in self._frozen_added:
+            return True
+        return self._base_contains(domain.encode('utf-8'))
+
+    def _base_contains(self, key):
+        offsets, data, base = self._offsets, self._data, self._blob_start
+        lo, hi = 0, self._base_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = data[base + offsets[mid]:base + offsets[mid + 1]]
+            if entry < key:
+                lo = mid + 1
+            elif entry > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Iteration and compaction
+
+    @staticmethod
+    def _iter_view(data, blob_start, offsets, base_count,
+                   frozen_added, frozen_removed, added, removed):
+        """Merge the snapshot with both overlays, in sorted order"""
+        base = (data[blob_start + offsets[i]:blob_start + offsets[i + 1]].decode('utf-8')
+                for i in range(base_count))
+        frozen = heapq.merge((d for d in base if d not in frozen_removed), sorted(frozen_added))
+        return heapq.merge((d for d in frozen if d not in removed), sorted(added))
+
+    def _iter_frozen(self):
+        """Snapshot plus the overlay that is being compacted, in sorted order"""
+        return self._iter_view(self._data, self._blob_start, self._offsets, self._base_count,
+                               self._frozen_added, self._frozen_removed, (), ())
+
+    def _maybe_compact(self):
+        threshold = max(self.compact_threshold, self._base_count // 4)
+        if self._journal_ops >= threshold and self._compactor is None:
+            self.compact(wait=False)
+
+    def _rotate_journal(self):
+        """Freeze the live overlay and start a fresh journal (lock held)"""
+        compacting = self.journal_path + ".compacting"
+        if os.path.exists(self.journal_path):
+            if os.path.exists(compacting):
+                # Left over from an interrupted compaction: fold both together
+                import shutil
+                with open(self.journal_path, 'rb') as src, open(compacting, 'ab') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, compacting)
+        for domain in self._added:
+            if domain in self._frozen_removed:
+                self._frozen_removed.discard(domain)
+            else:
+                self._frozen_added.add(domain)
+        for domain in self._removed:
+            if domain in self._frozen_added:
+                self._frozen_added.discard(domain)
+            else:
+                self._frozen_removed.add(domain)
+        self._added, self._removed = set(), set()
+        self._journal_pos = 0
+        self._journal_ops = 0
+
+    def _compact_frozen(self):
+        try:
+            # The snapshot and frozen overlay are not modified while we run,
+            # so they can be read without holding the lock.
+            self._write_snapshot(self._iter_frozen())
+            with self._lock:
+                live_added, live_removed = self._added, self._removed
+                live_pos, live_ops = self._journal_pos, self._journal_ops
+                count = self._count
+                self._load_snapshot_only()
+                self._added, self._removed = live_added, live_removed
+                self._journal_pos, self._journal_ops = live_pos, live_ops
+                self._count = count
+                try:
+                    os.remove(self.journal_path + ".compacting")
+                except FileNotFoundError:
+                    pass
+        except Exception as e:
+            print(f"⚠️ Blocklist compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compactor = None
+
+    def _load_snapshot_only(self):
+        """Reload the snapshot and drop the frozen overlay (lock held)"""
+        self._load_base()
+        self._frozen_added, self._frozen_removed = set(), set()
+
+    def _load_base(self):
+        self._data = b""
+        self._blob_start = 0
+        self._offsets = array('I', [0])
+        self._base_count = 0
+        self._snapshot_fingerprint = stat_fingerprint(self.snapshot_path)
+        if not os.path.exists(self.snapshot_path):
+            return
+        with open(self.snapshot_path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(SNAPSHOT_MAGIC):
+            raise ValueError(f"Not a blocklist snapshot: {self.snapshot_path}")
+        count, blob_length = SNAPSHOT_HEADER.unpack_from(data, len(SNAPSHOT_MAGIC))
+        self._blob_start = len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER.size
+        offsets_start = self._blob_start + blob_length
+        self._offsets = array('I')
+        self._offsets.frombytes(data[offsets_start:offsets_start + 4 * (count + 1)])
+        self._data = data
+        self._base_count = count
+
+    def _write_snapshot(self, domains):
+        import tempfile
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        fd, temp_path = tempfile.mkstemp(prefix=".blocklist-", suffix=".tmp", dir=directory)
+        try:
+            offsets = array('I', [0])
+            with os.fdopen(fd, 'wb') as out:
+                out.write(SNAPSHOT_MAGIC)
+                out.write(SNAPSHOT_HEADER.pack(0, 0))
+                position = 0
+                for domain in domains:
+                    encoded = domain.encode('utf-8')
+                    out.write(encoded)
+                    position += len(encoded)
+                    offsets.append(position)
+                out.write(offsets.tobytes())
+                out.seek(len(SNAPSHOT_MAGIC))
+                out.write(SNAPSHOT_HEADER.pack(len(offsets) - 1, position))
+            os.replace(temp_path, self.snapshot_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
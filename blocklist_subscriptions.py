@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Remote blocklist subscriptions for YouTube Stopper
+
+A subscription is a URL of a hosts file, plain domain list or AdBlock
+filter list. Each one becomes a blocking profile named "sub-<host>": its
+domains are the profile's source list in ~/youtube_stopper_profiles, so
+it can be switched on and off like any other profile and is compiled into
+a cached hosts fragment.
+
+Refreshing is cheap when nothing changed:
+- requests are conditional (If-None-Match / If-Modified-Since), so an
+  unchanged list costs one 304 response
+- the body is streamed and parsed line by line, never held in memory
+- the SHA-256 of the body is kept; a list served again with new headers
+  but the same content stops there
+- otherwise the domains are compared with the last snapshot and only the
+  added/removed ones are reported; the hosts section then changes by
+  exactly that delta through the usual update path
+
+Subscription state (URL, ETag, Last-Modified, content hash, counts) is
+kept in ~/youtube_stopper_subscriptions.json.
+"""
+
+import re
+import json
+import time
+import hashlib
+from urllib.parse import urlparse
+
+from blocklist_formats import iter_domains
+from blocking_profiles import check_profile_name
+
+SUBSCRIPTION_PREFIX = "sub-"
+FETCH_TIMEOUT = 30
+CHUNK_SIZE = 64 * 1024
+USER_AGENT = "YouTubeStopper/1.0 (+blocklist subscription)"
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def subscription_name(url):
+    """Profile name for a URL, e.g. sub-raw-githubusercontent-com"""
+    return SUBSCRIPTION_PREFIX + (_slug(urlparse(url).hostname or "") or "list")
+
+
+class FetchResult:
+    """What one refresh of a subscription did"""
+
+    def __init__(self, name, status, added=0, removed=0, count=0, received=0, elapsed=0.0):
+        # status: "unchanged" (304), "same-content" or "updated"
+        self.name = name
+        self.status = status
+        self.added = added
+        self.removed = removed
+        self.count = count
+        self.received = received
+        self.elapsed = elapsed
+
+    @property
+    def changed(self):
+        return self.added > 0 or self.removed > 0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+    def __str__(self):
+        if self.status == "updated":
+            detail = f"+{self.added} / -{self.removed}, {self.count} domain(s)"
+        else:
+            detail = self.status
+        return f"{self.name}: {detail} ({self.received / 1024:.0f} KiB in {self.elapsed * 1000:.0f} ms)"
+
+
+class SubscriptionManager:
+    """
+    Keeps subscription profiles in step with their remote lists
+    """
+
+    def __init__(self, profiles, state_path, session=None):
+        self.profiles = profiles
+        self.state_path = str(state_path)
+        self._session = session
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+
+    def subscriptions(self):
+        """{name: state} for every subscription"""
+        return self._load_state()
+
+    def add(self, url, name=None):
+        """Subscribe to url, fetch it and switch its profile on"""
+        if urlparse(url).scheme not in ("http", "https"):
+            raise ValueError(f"Not an http(s) URL: '{url}'")
+        if name is None:
+            name = subscription_name(url)
+        elif _slug(name) != name:
+            # The name becomes a file name, possibly written as root by the daemon
+            raise ValueError(f"Invalid subscription name {name!r}: use a-z, 0-9 and '-'")
+        if not name.startswith(SUBSCRIPTION_PREFIX):
+            name = SUBSCRIPTION_PREFIX + name
+        check_profile_name(name)
+        state = self._load_state()
+        if name in state:
+            raise ValueError(f"Subscription '{name}' already exists")
+        state[name] = {"url": url}
+        self._save_state(state)
+        try:
+            result = self.fetch(name)
+        except Exception:
+            # Nothing half-made is left behind
+            self.remove(name)
+            raise
+        self.profiles.set_active(name, True)
+        return result
+
+    def remove(self, name):
+        """Unsubscribe and delete the profile; returns False if there was no such subscription"""
+        state = self._load_state()
+        if state.pop(name, None) is None:
+            return False
+        self._save_state(state)
+        if name in self.profiles.names():
+            self.profiles.set_active(name, False)
+        self.profiles.remove_source(name)
+        return True
+
+    def refresh(self, names=None):
+        """Fetch every subscription (or the given ones); returns [FetchResult]"""
+        results = []
+        for name in names or list(self._load_state()):
+            try:
+                results.append(self.fetch(name))
+            except Exception as e:
+                print(f"⚠️ Could not refresh '{name}': {e}")
+        return results
+
+    # ------------------------------------------------------------------
+    # Fetching
+
+    def fetch(self, name):
+        """Conditionally fetch one subscription and store a new snapshot if it changed"""
+        state = self._load_state()
+        entry = state[name]
+        headers = {"User-Agent": USER_AGENT}
+        has_snapshot = name in self.profiles.names()
+        if has_snapshot and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if has_snapshot and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        started = time.perf_counter()
+        with self._get_session().get(entry["url"], headers=headers, stream=True,
+                                     timeout=FETCH_TIMEOUT) as response:
+            if response.status_code == 304:
+                entry["checked"] = time.time()
+                self._save_state(state)
+                return FetchResult(name, "unchanged", count=entry.get("count", 0),
+                                   elapsed=time.perf_counter() - started)
+            response.raise_for_status()
+            hasher = hashlib.sha256()
+            received = 0
+
+            def lines():
+                nonlocal received
+                for raw in response.iter_lines(chunk_size=CHUNK_SIZE):
+                    hasher.update(raw + b"\n")
+                    received += len(raw) + 1
+                    yield raw.decode("utf-8", "replace")
+
+            # Only the set of domains is kept, not the body
+            domains = set(iter_domains(lines()))
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+        digest = hasher.hexdigest()
+        entry.update(etag=etag, last_modified=last_modified, checked=time.time())
+        if has_snapshot and digest == entry.get("sha256"):
+            self._save_state(state)
+            return FetchResult(name, "same-content", count=len(domains), received=received,
+                               elapsed=time.perf_counter() - started)
+
+        previous = set(self.profiles.rules(name)) if has_snapshot else set()
+        added = len(domains - previous)
+        removed = len(previous - domains)
+        if added or removed or not has_snapshot:
+            self.profiles.write_source(name, sorted(domains),
+                                       comment=f"Subscription to {entry['url']}")
+        entry.update(sha256=digest, count=len(domains), updated=time.time())
+        self._save_state(state)
+        return FetchResult(name, "updated", added=added, removed=removed, count=len(domains),
+                           received=received, elapsed=time.perf_counter() - started)
+
+    def _get_session(self):
+        if self._session is None:
+            # Imported here: only subscriptions need an HTTP client
+            try:
+                import requests
+            except ImportError:
+                raise RuntimeError("Subscriptions need the 'requests' package: pip install requests")
+            self._session = requests.Session()
+        return self._session
+
+    # ------------------------------------------------------------------
+    # State file
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("subscriptions", {})
+        except FileNotFoundError:
+            return {}
+
+    def _save_state(self, state):
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({"subscriptions": state}, f, indent=2)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Virtualized, filterable list of custom blocked domains
+
+A Tk Listbox holds one Tcl string per row and has to be refilled after
+every edit, which takes seconds and a lot of memory with tens of
+thousands of domains. VirtualListView keeps the domains in one sorted
+Python list and draws them on a Canvas with a fixed pool of text items,
+one per visible row. Scrolling only changes which slice of the list those
+items show.
+
+Edits are incremental: insert() and delete() bisect into the sorted list
+(and into the filtered view, if a filter is active), then redraw the
+visible rows. The search box filters as you type. Domains that start
+with the query come first, found by bisecting the sorted list; the rest
+of the matches are a substring search. While the query only grows, each
+keystroke searches the previous matches instead of the whole list.
+"""
+
+import bisect
+import tkinter as tk
+import tkinter.font as tkfont
+
+# Sorts after any character that appears in a domain
+PREFIX_END = "\uffff"
+
+
+def prefix_range(items, prefix):
+    """(lo, hi) slice of the sorted items that start with prefix"""
+    lo = bisect.bisect_left(items, prefix)
+    return lo, bisect.bisect_left(items, prefix + PREFIX_END, lo)
+
+
+class VirtualListView(tk.Frame):
+    """
+    Canvas-backed list that only draws its visible rows
+    """
+
+    def __init__(self, master, height=3, font=("Segoe UI", 10), bg="#2c3454", fg="#fffffe",
+                 selectbackground="#eebbc3", selectforeground="#232946", **kwargs):
+        super().__init__(master, bg=bg, **kwargs)
+        self.visible_rows = height
+        self.font = tkfont.Font(root=self, font=font)
+        self.row_height = self.font.metrics("linespace") + 4
+        self.colors = (bg, fg, selectbackground, selectforeground)
+
+        # All domains, sorted; and the filtered view (None while unfiltered)
+        self.items = []
+        self.query = ""
+        self._prefix_part = None
+        self._rest_part = None
+        self.top = 0
+        self.selection = None
+
+        self.canvas = tk.Canvas(self, bg=bg, height=height * self.row_height, bd=0,
+                                highlightthickness=0, yscrollincrement=1)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self._rows = []
+        self._highlight = self.canvas.create_rectangle(0, 0, 0, 0, fill=selectbackground,
+                                                       width=0, state="hidden")
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Button-1>", self._on_click)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind(sequence, self._on_wheel)
+
+    # ------------------------------------------------------------------
+    # Content
+
+    def set_items(self, domains):
+        """Replace everything (initial load)"""
+        self.items = sorted(domains)
+        self._refilter(self.query, narrow=False)
+        self.top = 0
+        self.redraw()
+
+    def insert(self, domain):
+        """Add one domain without rebuilding anything"""
+        index = bisect.bisect_left(self.items, domain)
+        if index < len(self.items) and self.items[index] == domain:
+            return
+        self.items.insert(index, domain)
+        if self._prefix_part is not None:
+            part = self._part_for(domain)
+            if part is not None:
+                bisect.insort(part, domain)
+        self.redraw()
+
+    def delete(self, domain):
+        """Remove one domain without rebuilding anything"""
+        if not _remove_sorted(self.items, domain):
+            return
+        if self._prefix_part is not None:
+            _remove_sorted(self._prefix_part, domain) or _remove_sorted(self._rest_part, domain)
+        if self.selection == domain:
+            self.selection = None
+        self.redraw()
+
+    def selected(self):
+        return self.selection
+
+    def __len__(self):
+        return len(self.items)
+
+    # ------------------------------------------------------------------
+    # Filtering
+
+    def set_filter(self, query):
+        query = query.strip()
+        if query == self.query:
+            return
+        # A longer query can only match a subset of the current matches
+        narrow = bool(self.query) and query.startswith(self.query)
+        self._refilter(query, narrow)
+        self.top = 0
+        self.redraw()
+
+    def match_count(self):
+        if self._prefix_part is None:
+            return len(self.items)
+        return len(self._prefix_part) + len(self._rest_part)
+
+    def _refilter(self, query, narrow):
+        self.query = query
+        if not query:
+            self._prefix_part = self._rest_part = None
+            return
+        lo, hi = prefix_range(self.items, query)
+        prefix_part = self.items[lo:hi]
+        if narrow:
+            candidates = self._prefix_part + self._rest_part
+        else:
+            candidates = self.items
+        rest = [domain for domain in candidates if query in domain and not domain.startswith(query)]
+        self._prefix_part = prefix_part
+        # Narrowing concatenates two sorted lists; sorted() merges those runs cheaply
+        self._rest_part = sorted(rest) if narrow else rest
+
+    def _part_for(self, domain):
+        """The filtered-view list a new domain belongs in, or None if it does not match"""
+        if domain.startswith(self.query):
+            return self._prefix_part
+        if self.query in domain:
+            return self._rest_part
+        return None
+
+    def _row(self, index):
+        if self._prefix_part is None:
+            return self.items[index]
+        if index < len(self._prefix_part):
+            return self._prefix_part[index]
+        return self._rest_part[index - len(self._prefix_part)]
+
+    # ------------------------------------------------------------------
+    # Drawing and scrolling
+
+    def redraw(self):
+        """Point the row items at the slice of the list now in view"""
+        count = self.match_count()
+        self.top = max(0, min(self.top, count - self.visible_rows))
+        bg, fg, select_bg, select_fg = self.colors
+        width = self.canvas.winfo_width()
+        highlight_row = None
+        for slot, text_id in enumerate(self._rows):
+            index = self.top + slot
+            if index < count:
+                domain = self._row(index)
+                selected = domain == self.selection
+                self.canvas.itemconfigure(text_id, text=domain, fill=select_fg if selected else fg,
+                                          state="normal")
+                if selected:
+                    y = slot * self.row_height
+                    self.canvas.coords(self._highlight, 0, y, width, y + self.row_height)
+                    highlight_row = slot
+            else:
+                self.canvas.itemconfigure(text_id, state="hidden")
+        self.canvas.itemconfigure(self._highlight,
+                                  state="hidden" if highlight_row is None else "normal")
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + self.visible_rows) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"|"pages")"""
+        count = self.match_count()
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * count)
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.redraw()
+
+    def _on_configure(self, event):
+        # Keep one text item per row that fits, created once and reused
+        self.visible_rows = max(1, event.height // self.row_height)
+        while len(self._rows) < self.visible_rows:
+            y = len(self._rows) * self.row_height + 2
+            self._rows.append(self.canvas.create_text(6, y, anchor="nw", font=self.font,
+                                                      fill=self.colors[1], state="hidden"))
+        while len(self._rows) > self.visible_rows:
+            self.canvas.delete(self._rows.pop())
+        self.canvas.tag_raise("all")
+        self.canvas.tag_lower(self._highlight)
+        self.redraw()
+
+    def _on_click(self, event):
+        index = self.top + event.y // self.row_height
+        if index < self.match_count():
+            self.selection = self._row(index)
+            self.redraw()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.yview("scroll", -1, "units")
+        else:
+            self.yview("scroll", 1, "units")
+
+
+def _remove_sorted(items, value):
+    """Remove value from a sorted list, return True if it was there"""
+    index = bisect.bisect_left(items, value)
+    if index < len(items) and items[index] == value:
+        del items[index]
+        return True
+    return False
@@ -142,6 +142,96 @@ exe = EXE(
     
     print("✅ Created youtube_stopper.spec")
 
+def create_cli_spec_file():
+    """Create a slim spec for the command-line tool, without any GUI packages"""
+    print_step("Creating CLI Spec File")
+
+    spec_content = '''# -*- mode: python ; coding: utf-8 -*-
+
+block_cipher = None
+
+a = Analysis(
+    ['stopper_cli.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    # youtube_stopper, blocker_daemon and the subscription client (requests)
+    # are imported lazily per subcommand
+    hiddenimports=[
+        'youtube_stopper',
+        'blocker_daemon',
+        'blocklist_subscriptions',
+        'requests'
+    ],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[
+        'tkinter',
+        'pystray',
+        'PIL',
+        'psutil',
+        'motivation_widget',
+        'pomodoro_widget',
+        'matplotlib',
+        'numpy',
+        'unittest',
+        'pydoc'
+    ],
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    [],
+    name='youtube-stopper-cli',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    uac_admin=False,  # status and daemon clients need no admin rights
+)
+'''
+
+    with open('youtube_stopper_cli.spec', 'w') as f:
+        f.write(spec_content)
+
+    print("✅ Created youtube_stopper_cli.spec")
+
+def build_cli_executable():
+    """Build the command-line executable"""
+    print_step("Building CLI Executable with PyInstaller")
+
+    if not run_command("pyinstaller --clean youtube_stopper_cli.spec", "Building CLI executable"):
+        return False
+
+    exe_path = Path("dist/youtube-stopper-cli.exe")
+    if not exe_path.exists():
+        exe_path = Path("dist/youtube-stopper-cli")
+    if exe_path.exists():
+        size_mb = exe_path.stat().st_size / (1024 * 1024)
+        print(f"✅ CLI executable created: {exe_path.absolute()} ({size_mb:.1f} MB)")
+        return True
+    print("❌ CLI executable was not created")
+    return False
+
 def build_executable():
     """Build the executable using PyInstaller"""
     print_step("Building Executable with PyInstaller")
@@ -288,6 +378,7 @@ def create_distribution_package():
     # Copy files to package
     files_to_copy = [
         ("dist/YouTubeStopper.exe", "YouTubeStopper.exe"),
+        ("dist/youtube-stopper-cli.exe", "youtube-stopper-cli.exe"),
         ("dist/launcher.bat", "launcher.bat"),
         ("dist/README_DIST.md", "README.md"),
         ("LICENSE", "LICENSE.txt")
@@ -327,6 +418,8 @@ def main():
         (check_dependencies, "Check dependencies"),
         (create_spec_file, "Create PyInstaller spec file"),
         (build_executable, "Build executable"),
+        (create_cli_spec_file, "Create CLI spec file"),
+        (build_cli_executable, "Build CLI executable"),
         (create_launcher_batch, "Create launcher batch file"),
         (create_readme_for_distribution, "Create distribution README"),
         (create_distribution_package, "Create distribution package")
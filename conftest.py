@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures for YouTube Stopper's tests
+
+Every test gets its own home directory, so nothing it does (history,
+schedules, the blocklist store) ever lands in the real one.
+"""
+
+import threading
+
+import pytest
+
+from fakes import make_blocker, serve_blocklist
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true",
+                     help="also run the wall-clock tests marked benchmark")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock test, only run with --benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="wall-clock benchmark, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("USERPROFILE", str(home))
+    return home
+
+
+@pytest.fixture
+def blocker(tmp_path):
+    """A blocker on a hosts file in tmp_path, with YouTube blocked"""
+    blocker = make_blocker(tmp_path)
+    blocker.block_youtube()
+    yield blocker
+    blocker.close()
+
+
+@pytest.fixture
+def blocklist_server(monkeypatch):
+    """A running local server for a 100-domain hosts list, at .url"""
+    # The local server must not be reached through a proxy from the environment
+    for name in ("HTTP_PROXY", "http_proxy", "ALL_PROXY", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    server = serve_blocklist([f"ads{i}.example" for i in range(100)], 1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_port}/hosts"
+    yield server
+    server.shutdown()
+    server.server_close()
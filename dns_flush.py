@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Asynchronous DNS cache flushing for YouTube Stopper
+
+Flushing the resolver cache (ipconfig /flushdns, resolvectl flush-caches,
+...) starts a process and can take hundreds of milliseconds. FlushScheduler
+runs it on a background thread so the caller (often the Tk main loop) never
+waits, and merges a burst of requests arriving within a short window into
+a single flush.
+"""
+
+import time
+import threading
+
+from instrumentation import operation
+
+# How long to wait for more requests before flushing
+DEFAULT_WINDOW = 0.3
+
+
+class FlushResult:
+    """Outcome of one (possibly merged) flush"""
+
+    def __init__(self, ok, latency, merged, error=None):
+        self.ok = ok
+        self.latency = latency
+        self.merged = merged
+        self.error = error
+
+    def __repr__(self):
+        return (f"FlushResult(ok={self.ok}, latency={self.latency * 1000:.1f}ms, "
+                f"merged={self.merged}, error={self.error!r})")
+
+
+class FlushScheduler:
+    """
+    Runs flush_func off the calling thread, coalescing bursts of requests.
+    on_complete(FlushResult) is called from the worker thread after each flush.
+    """
+
+    def __init__(self, flush_func, on_complete=None, window=DEFAULT_WINDOW):
+        self.flush_func = flush_func
+        self.on_complete = on_complete
+        self.window = window
+        self.flush_count = 0
+        self.request_count = 0
+        self.last_result = None
+        self._condition = threading.Condition()
+        self._pending = 0
+        self._running = False
+        self._thread = None
+        self._closed = False
+
+    def request(self):
+        """Ask for a flush; returns immediately"""
+        with self._condition:
+            if self._closed:
+                return
+            self._pending += 1
+            self.request_count += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="FlushScheduler",
+                                                daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until every requested flush has run; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout=5):
+        """Run any pending flush, then stop the worker thread"""
+        self.wait(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+            # Give the rest of the burst a chance to arrive
+            time.sleep(self.window)
+            with self._condition:
+                merged, self._pending = self._pending, 0
+                self._running = True
+            result = self._flush(merged)
+            with self._condition:
+                self._running = False
+                self.flush_count += 1
+                self.last_result = result
+                self._condition.notify_all()
+            if self.on_complete is not None:
+                try:
+                    self.on_complete(result)
+                except Exception as e:
+                    print(f"⚠️ Flush callback failed: {e}")
+
+    def _flush(self, merged):
+        start = time.perf_counter()
+        try:
+            with operation("flush") as timing:
+                ok = bool(self.flush_func())
+                if not ok:
+                    timing.fail()
+            error = None if ok else "flush command failed or is not available"
+        except Exception as e:
+            ok, error = False, str(e)
+        return FlushResult(ok, time.perf_counter() - start, merged, error)
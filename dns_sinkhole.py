@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Local DNS sinkhole for YouTube Stopper
+
+An alternative to hosts file blocking: a small asyncio DNS stub that
+listens on localhost (UDP and TCP). Names matched by the blocker's rule set
+are answered locally with 0.0.0.0 / :: or NXDOMAIN, everything else is
+forwarded to an upstream resolver and its replies are cached until their
+TTL runs out. Turning blocking on or off is just a flag flip - no file is
+rewritten and no DNS cache needs flushing.
+
+Point the system resolver at 127.0.0.1 to use it.
+
+Usage: python dns_sinkhole.py [listen_port] [upstream_ip]
+"""
+
+import sys
+import time
+import heapq
+import random
+import struct
+import asyncio
+import threading
+from collections import OrderedDict
+
+QTYPE_A = 1
+QTYPE_AAAA = 28
+QCLASS_IN = 1
+
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+
+FLAG_QR = 0x8000
+FLAG_TC = 0x0200
+FLAG_RD = 0x0100
+FLAG_RA = 0x0080
+
+HEADER = struct.Struct("!HHHHHH")
+
+# TTL for our own blocked answers and for negative replies without an SOA
+BLOCKED_TTL = 60
+NEGATIVE_TTL = 30
+
+
+class DnsFormatError(ValueError):
+    """Raised for packets that are not valid DNS queries"""
+
+
+def skip_name(packet, offset):
+    """Return the offset just past a (possibly compressed) domain name"""
+    while True:
+        if offset >= len(packet):
+            raise DnsFormatError("name runs past end of packet")
+        length = packet[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += 1 + length
+
+
+def parse_question(packet):
+    """Return (qname, qtype, qclass, end offset of the question)"""
+    if len(packet) < HEADER.size:
+        raise DnsFormatError("packet too short")
+    qdcount = HEADER.unpack_from(packet)[2]
+    if qdcount != 1:
+        raise DnsFormatError("expected exactly one question")
+    labels = []
+    offset = HEADER.size
+    while True:
+        if offset >= len(packet):
+            raise DnsFormatError("question runs past end of packet")
+        length = packet[offset]
+        offset += 1
+        if length == 0:
+            break
+        if length & 0xC0:
+            raise DnsFormatError("compressed question name")
+        labels.append(packet[offset:offset + length].decode('ascii', 'replace'))
+        offset += length
+    if offset + 4 > len(packet):
+        raise DnsFormatError("truncated question")
+    qtype, qclass = struct.unpack_from("!HH", packet, offset)
+    return ".".join(labels).lower(), qtype, qclass, offset + 4
+
+
+def build_response(query, question_end, rcode=0, answers=()):
+    """Build a reply that echoes the question; answers are (qtype, ttl, rdata)"""
+    qid, flags = struct.unpack_from("!HH", query)
+    flags = FLAG_QR | FLAG_RA | (flags & FLAG_RD) | rcode
+    parts = [HEADER.pack(qid, flags, 1, len(answers), 0, 0), query[HEADER.size:question_end]]
+    for qtype, ttl, rdata in answers:
+        # 0xC00C points back at the name in the question
+        parts.append(struct.pack("!HHHIH", 0xC00C, qtype, QCLASS_IN, ttl, len(rdata)))
+        parts.append(rdata)
+    return b"".join(parts)
+
+
+def response_ttls(response):
+    """
+    Return (minimum TTL, offsets of every TTL field) for the records in a
+    response, so cached replies can be served with their remaining TTL
+    """
+    _, flags, qdcount, ancount, nscount, arcount = HEADER.unpack_from(response)
+    offset = HEADER.size
+    for _ in range(qdcount):
+        offset = skip_name(response, offset) + 4
+    ttl_offsets = []
+    min_ttl = None
+    for index in range(ancount + nscount + arcount):
+        offset = skip_name(response, offset)
+        rtype, _, ttl, rdlength = struct.unpack_from("!HHIH", response, offset)
+        if rtype != 41:  # the EDNS OPT pseudo-record has no real TTL
+            ttl_offsets.append(offset + 4)
+            if index < ancount + nscount:
+                min_ttl = ttl if min_ttl is None else min(min_ttl, ttl)
+        offset += 10 + rdlength
+    return min_ttl, ttl_offsets
+
+
+class TTLCache:
+    """
+    LRU cache of upstream replies that expire with their DNS TTL.
+    Expired entries are evicted first (via a heap on expiry time), then
+    the least recently used ones.
+    """
+
+    def __init__(self, max_entries=10_000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._expiry_heap = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, qid):
+        """Return the cached reply with id and TTLs rewritten, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, response, ttl_offsets = entry
+        remaining = int(expires - self.clock())
+        if remaining <= 0:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        patched = bytearray(response)
+        struct.pack_into("!H", patched, 0, qid)
+        for offset in ttl_offsets:
+            ttl = struct.unpack_from("!I", patched, offset)[0]
+            struct.pack_into("!I", patched, offset, min(ttl, remaining))
+        return bytes(patched)
+
+    def put(self, key, response):
+        flags = struct.unpack_from("!H", response, 2)[0]
+        rcode = flags & 0x000F
+        if flags & FLAG_TC or rcode not in (0, RCODE_NXDOMAIN):
+            return
+        try:
+            ttl, ttl_offsets = response_ttls(response)
+        except (DnsFormatError, struct.error):
+            return
+        if ttl is None:
+            ttl = NEGATIVE_TTL
+        if ttl <= 0:
+            return
+        expires = self.clock() + ttl
+        self._entries[key] = (expires, response, ttl_offsets)
+        self._entries.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (expires, key))
+        self._evict()
+
+    def _evict(self):
+        now = self.clock()
+        while self._expiry_heap and (self._expiry_heap[0][0] <= now or
+                                     len(self._expiry_heap) > 2 * self.max_entries):
+            expires, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == expires and expires <= now:
+                del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class _UpstreamProtocol(asyncio.DatagramProtocol):
+    """Shared UDP socket to the upstream resolver, replies matched by query id"""
+
+    def __init__(self):
+        self.transport = None
+        self.pending = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 2:
+            return
+        future = self.pending.pop(struct.unpack_from("!H", data)[0], None)
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self.pending.clear()
+
+
+class _UdpServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, sinkhole):
+        self.sinkhole = sinkhole
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < HEADER.size:
+            # Not even a header to answer, so there is nobody to reply to
+            return
+        # Blocked and cached names are answered without creating a task
+        reply = self.sinkhole.answer_locally(data)
+        if reply is not None:
+            self.transport.sendto(reply, addr)
+        else:
+            asyncio.ensure_future(self._forward(data, addr))
+
+    async def _forward(self, data, addr):
+        reply = await self.sinkhole.forward(data)
+        if reply is not None:
+            self.transport.sendto(reply, addr)
+
+
+class DnsSinkhole:
+    """
+    Blocking DNS stub resolver
+
+    is_blocked is a callable taking a hostname, normally
+    YouTubeBlocker.is_domain_blocked. block_mode is "zero" (answer
+    0.0.0.0 / ::) or "nxdomain".
+    """
+
+    def __init__(self, is_blocked, upstream=("1.1.1.1", 53), listen=("127.0.0.1", 53),
+                 block_mode="zero", cache_size=10_000, timeout=2.0):
+        self.is_blocked = is_blocked
+        self.upstream = upstream
+        self.listen = listen
+        self.block_mode = block_mode
+        self.timeout = timeout
+        self.cache = TTLCache(cache_size)
+        self.blocking_enabled = True
+        self.stats = {"queries": 0, "blocked": 0, "cache_hits": 0,
+                      "forwarded": 0, "upstream_errors": 0}
+        self._udp_transport = None
+        self._tcp_server = None
+        self._tcp_handlers = set()
+        self._upstream = None
+        self._loop = None
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Query handling
+
+    def answer_locally(self, query):
+        """
+        Return a reply for blocked, cached or malformed queries, or None when
+        the query has to go to the upstream resolver
+        """
+        self.stats["queries"] += 1
+        try:
+            qname, qtype, qclass, question_end = parse_question(query)
+        except (DnsFormatError, struct.error):
+            if len(query) < HEADER.size:
+                return None
+            return build_response(query, HEADER.size, RCODE_SERVFAIL)
+
+        if self.blocking_enabled and self.is_blocked(qname):
+            self.stats["blocked"] += 1
+            return self._blocked_response(query, question_end, qtype)
+
+        reply = self.cache.get((qname, qtype, qclass), struct.unpack_from("!H", query)[0])
+        if reply is not None:
+            self.stats["cache_hits"] += 1
+        return reply
+
+    def _blocked_response(self, query, question_end, qtype):
+        if self.block_mode == "nxdomain":
+            return build_response(query, question_end, RCODE_NXDOMAIN)
+        if qtype == QTYPE_A:
+            return build_response(query, question_end, answers=[(QTYPE_A, BLOCKED_TTL, bytes(4))])
+        if qtype == QTYPE_AAAA:
+            return build_response(query, question_end, answers=[(QTYPE_AAAA, BLOCKED_TTL, bytes(16))])
+        return build_response(query, question_end)
+
+    async def forward(self, query):
+        """Send a query upstream and cache the reply"""
+        self.stats["forwarded"] += 1
+        protocol = self._upstream
+        qid = struct.unpack_from("!H", query)[0]
+        upstream_id = random.randrange(65536)
+        while upstream_id in protocol.pending:
+            upstream_id = random.randrange(65536)
+        future = asyncio.get_running_loop().create_future()
+        protocol.pending[upstream_id] = future
+        protocol.transport.sendto(struct.pack("!H", upstream_id) + query[2:])
+        try:
+            reply = await asyncio.wait_for(future, self.timeout)
+        except (asyncio.TimeoutError, OSError):
+            protocol.pending.pop(upstream_id, None)
+            self.stats["upstream_errors"] += 1
+            try:
+                question_end = parse_question(query)[3]
+            except (DnsFormatError, struct.error):
+                question_end = HEADER.size
+            return build_response(query, question_end, RCODE_SERVFAIL)
+
+        reply = struct.pack("!H", qid) + reply[2:]
+        try:
+            qname, qtype, qclass, _ = parse_question(query)
+            self.cache.put((qname, qtype, qclass), reply)
+        except (DnsFormatError, struct.error):
+            pass
+        return reply
+
+    async def resolve(self, query):
+        """Answer one query, locally if possible"""
+        reply = self.answer_locally(query)
+        if reply is None:
+            reply = await self.forward(query)
+        return reply
+
+    # ------------------------------------------------------------------
+    # Server lifecycle
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        _, self._upstream = await loop.create_datagram_endpoint(
+            _UpstreamProtocol, remote_addr=self.upstream)
+        self._udp_transport, _ = await loop.create_datagram_endpoint(
+            lambda: _UdpServerProtocol(self), local_addr=self.listen)
+        # With port 0 the OS picks a free port; TCP listens on the same one
+        self.listen = self._udp_transport.get_extra_info("sockname")[:2]
+        self._tcp_server = await asyncio.start_server(self._handle_tcp, *self.listen)
+
+    async def close(self):
+        if self._tcp_server is not None:
+            self._tcp_server.close()
+            # Let open TCP connections finish instead of being cancelled
+            for writer in list(self._tcp_handlers):
+                writer.close()
+            while self._tcp_handlers:
+                await asyncio.sleep(0)
+            await self._tcp_server.wait_closed()
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+        if self._upstream is not None and self._upstream.transport is not None:
+            self._upstream.transport.close()
+
+    async def _handle_tcp(self, reader, writer):
+        self._tcp_handlers.add(writer)
+        try:
+            while True:
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+                query = await reader.readexactly(length)
+                if len(query) < HEADER.size:
+                    break
+                reply = await self.resolve(query)
+                writer.write(struct.pack("!H", len(reply)) + reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._tcp_handlers.discard(writer)
+            writer.close()
+
+    def start_in_thread(self):
+        """Run the sinkhole on its own event loop thread (for the GUI/daemon)"""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                loop.close()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="DnsSinkhole", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            self._thread = None
+            raise errors[0]
+
+    def stop_thread(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+async def _serve(sinkhole):
+    await sinkhole.start()
+    print(f"🕳️ DNS sinkhole listening on {sinkhole.listen[0]}:{sinkhole.listen[1]} "
+          f"(upstream {sinkhole.upstream[0]}:{sinkhole.upstream[1]})")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    from youtube_stopper import YouTubeBlocker
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 53
+    upstream_ip = sys.argv[2] if len(sys.argv) > 2 else "1.1.1.1"
+    blocker = YouTubeBlocker()
+    sinkhole = DnsSinkhole(blocker.is_domain_blocked, upstream=(upstream_ip, 53),
+                           listen=("127.0.0.1", port))
+    try:
+        asyncio.run(_serve(sinkhole))
+    except KeyboardInterrupt:
+        print(f"\n📊 {sinkhole.stats}")
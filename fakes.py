@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins shared by the tests and benchmark_hosts.py
+
+Nothing here touches the real hosts file, the network or the user's
+home directory.
+"""
+
+import struct
+import asyncio
+import http.server
+from pathlib import Path
+
+from youtube_stopper import YouTubeBlocker
+from blocklist_store import BlocklistStore
+from blocking_profiles import ProfileManager
+from blocking_backends import HostsFileBackend
+from dns_sinkhole import build_response, parse_question, QTYPE_A
+
+# What FakeUpstream answers for every A query (TEST-NET-1)
+UPSTREAM_ADDRESS = bytes([192, 0, 2, 1])
+
+
+class FakeUpstream(asyncio.DatagramProtocol):
+    """Local stand-in for a real resolver: answers every A query with 192.0.2.1"""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        question_end = parse_question(data)[3]
+        reply = build_response(data, question_end, answers=[(QTYPE_A, 300, UPSTREAM_ADDRESS)])
+        self.transport.sendto(reply, addr)
+
+
+def make_query(qid, name):
+    """A DNS query packet for the A record of name"""
+    question = b"".join(bytes([len(label)]) + label.encode() for label in name.split("."))
+    return struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 0) + question + b"\0" + struct.pack("!HH", QTYPE_A, 1)
+
+
+def make_blocker(directory):
+    """A blocker whose hosts file, store and state files all live in directory"""
+    backend = HostsFileBackend(Path(directory) / "hosts",
+                               index_path=Path(directory) / "hosts_index.json")
+    blocker = YouTubeBlocker(backend=backend)
+    blocker.backup_file = Path(directory) / "hosts_backup.txt"
+    blocker.custom_file = Path(directory) / "custom_blocklist.txt"
+    blocker.schedule_file = Path(directory) / "schedule.json"
+    blocker.subscriptions_file = Path(directory) / "subscriptions.json"
+    blocker.history_file = Path(directory) / "history.db"
+    blocker.store = BlocklistStore(Path(directory) / "blocklist.db")
+    blocker.profiles = ProfileManager(Path(directory) / "profiles", blocker.store)
+    blocker.is_admin = lambda: True
+    blocker.flush_dns = lambda *args: True
+    return blocker
+
+
+class BlocklistHandler(http.server.BaseHTTPRequestHandler):
+    """Serves server.body as a hosts list, honouring If-None-Match"""
+
+    def do_GET(self):
+        etag = f'"{self.server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_blocklist(domains, version):
+    """An HTTP server (not started) for a hosts list; change .body and .version to publish a new one"""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), BlocklistHandler)
+    server.body = "".join(f"0.0.0.0 {domain}\n" for domain in domains).encode()
+    server.version = version
+    return server
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Scheduled focus windows for YouTube Stopper
+
+Rules are plain text, one window each:
+
+    weekdays 09:00-17:00
+    mon,wed,fri 13:30-15:00
+    sat-sun 10:00-12:00
+    daily 22:00-06:00        (crosses midnight)
+
+During a window everything on the block list (YouTube plus the custom
+domains) is blocked. FocusScheduler keeps a heap with the next transition
+of every rule and sleeps until the earliest one, so the daemon does no work
+between transitions. Window edges are wall-clock times converted to
+absolute timestamps one at a time, which keeps them right across DST
+changes. Sleep/resume and clock jumps are caught by comparing the wall
+clock with the monotonic clock on every wake-up.
+"""
+
+import re
+import json
+import time
+import heapq
+import threading
+from datetime import date, datetime, timedelta
+
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+FULL_DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+DAY_GROUPS = {
+    "daily": range(7),
+    "everyday": range(7),
+    "weekdays": range(5),
+    "weekends": range(5, 7),
+}
+
+RULE_PATTERN = re.compile(
+    r"^\s*(?P<days>[a-z,\-]+)\s+(?P<start>\d{1,2}:\d{2})\s*[-–]\s*(?P<end>\d{1,2}:\d{2})\s*$",
+    re.IGNORECASE)
+
+# Longest the scheduler sleeps without checking the clock. A monotonic
+# timeout does not advance while the machine is suspended, so this bounds
+# how late a transition missed during sleep is applied after resume.
+GUARD_INTERVAL = 900
+
+# Wall clock vs monotonic difference treated as a suspend or clock change
+DRIFT_TOLERANCE = 2.0
+
+
+def _parse_minutes(text, allow_24=False):
+    hours, minutes = (int(part) for part in text.split(":"))
+    total = hours * 60 + minutes
+    if minutes > 59 or total > 24 * 60 or (total == 24 * 60 and not allow_24):
+        raise ValueError(f"Invalid time '{text}'")
+    return total
+
+
+def _parse_days(text):
+    days = set()
+    for part in text.lower().split(","):
+        if part in DAY_GROUPS:
+            days.update(DAY_GROUPS[part])
+        elif "-" in part:
+            first, _, last = part.partition("-")
+            if first not in DAY_NAMES or last not in DAY_NAMES:
+                raise ValueError(f"Invalid day range '{part}'")
+            start, end = DAY_NAMES.index(first), DAY_NAMES.index(last)
+            # mon-fri, or wrapping around the week like fri-mon
+            days.update((start + i) % 7 for i in range((end - start) % 7 + 1))
+        elif part[:3] in DAY_NAMES and FULL_DAY_NAMES[DAY_NAMES.index(part[:3])].startswith(part):
+            days.add(DAY_NAMES.index(part[:3]))
+        else:
+            raise ValueError(f"Invalid day '{part}'")
+    return frozenset(days)
+
+
+class ScheduleRule:
+    """
+    A recurring window: on the given weekdays (0 = Monday) from start to
+    end, in minutes after local midnight. A window whose end is not after
+    its start runs past midnight into the next day.
+    """
+
+    def __init__(self, days, start, end):
+        self.days = frozenset(days)
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def parse(cls, text):
+        match = RULE_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"Invalid schedule rule '{text}' (expected e.g. 'weekdays 09:00-17:00')")
+        return cls(_parse_days(match.group("days")),
+                   _parse_minutes(match.group("start")),
+                   _parse_minutes(match.group("end"), allow_24=True))
+
+    def __str__(self):
+        days = sorted(self.days)
+        for name, group in DAY_GROUPS.items():
+            if days == list(group) and name != "everyday":
+                label = name
+                break
+        else:
+            label = ",".join(DAY_NAMES[day] for day in days)
+        return f"{label} {self.start // 60:02d}:{self.start % 60:02d}-{self.end // 60:02d}:{self.end % 60:02d}"
+
+    def window(self, day):
+        """(start, end) timestamps of the window that opens on day, or None"""
+        if day.weekday() not in self.days:
+            return None
+        midnight = datetime.combine(day, datetime.min.time())
+        end_day = midnight if self.end > self.start else midnight + timedelta(days=1)
+        # Naive local times: .timestamp() applies the UTC offset in force on
+        # that date, so DST is handled per window. A start inside the
+        # spring-forward gap moves forward; a repeated hour uses its first pass.
+        return ((midnight + timedelta(minutes=self.start)).timestamp(),
+                (end_day + timedelta(minutes=self.end)).timestamp())
+
+    def windows_around(self, timestamp):
+        """Windows opening from the day before timestamp to a week after it"""
+        today = date.fromtimestamp(timestamp)
+        for offset in range(-1, 8):
+            window = self.window(today + timedelta(days=offset))
+            if window is not None:
+                yield window
+
+    def is_active(self, timestamp):
+        return any(start <= timestamp < end for start, end in self.windows_around(timestamp))
+
+    def next_boundary(self, timestamp):
+        """Earliest window start or end strictly after timestamp, or None"""
+        edges = [edge for window in self.windows_around(timestamp)
+                 for edge in window if edge > timestamp]
+        return min(edges) if edges else None
+
+
+class Schedule:
+    """An ordered set of ScheduleRules; blocking is on while any rule is active"""
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+
+    @classmethod
+    def parse(cls, lines):
+        return cls(ScheduleRule.parse(line) for line in lines if line.strip())
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        return cls.parse(data.get("rules", []))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"rules": self.lines()}, f, indent=2)
+
+    def lines(self):
+        return [str(rule) for rule in self.rules]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def is_active(self, timestamp):
+        return any(rule.is_active(timestamp) for rule in self.rules)
+
+    def next_transition(self, timestamp):
+        """
+        (timestamp, active) of the next time blocking switches on or off,
+        or None if it never changes. Edges where overlapping rules keep the
+        state the same are skipped.
+        """
+        current = self.is_active(timestamp)
+        at = timestamp
+        # Bounded: every rule has at most two edges per day over the week ahead
+        for _ in range(16 * len(self.rules) + 1):
+            edges = [edge for edge in (rule.next_boundary(at) for rule in self.rules)
+                     if edge is not None]
+            if not edges:
+                return None
+            at = min(edges)
+            if self.is_active(at) != current:
+                return at, not current
+        return None
+
+
+class FocusScheduler:
+    """
+    Calls on_transition(active) when a focus window starts or ends.
+
+    One background thread sleeps until the earliest entry in a heap of
+    (next boundary, rule) pairs. Blocking is only switched at boundaries, so
+    a manual unblock in the middle of a window lasts until the next one.
+    """
+
+    def __init__(self, schedule, on_transition, clock=time.time, monotonic=time.monotonic,
+                 guard_interval=GUARD_INTERVAL):
+        self.schedule = schedule
+        self.on_transition = on_transition
+        self.clock = clock
+        self.monotonic = monotonic
+        self.guard_interval = guard_interval
+        self.active = None
+        self.wakeups = 0
+        self.transitions = 0
+        self._heap = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._rebuild(self.clock())
+
+    # ------------------------------------------------------------------
+    # Public API
+
+    def start(self):
+        """Enter a window that is already open, then follow the schedule"""
+        with self._condition:
+            now = self.clock()
+            self.active = self.schedule.is_active(now)
+            start_active = self.active
+        if start_active:
+            self._fire(True)
+        self._thread = threading.Thread(target=self._run, name="FocusScheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def set_schedule(self, schedule):
+        """Replace the rules and switch blocking if the current state changed"""
+        with self._condition:
+            self.schedule = schedule
+            now = self.clock()
+            self._rebuild(now)
+            change = self._pending_change(now)
+            self._condition.notify_all()
+        if change is not None:
+            self._fire(change)
+
+    def next_transition(self):
+        with self._condition:
+            return self.schedule.next_transition(self.clock())
+
+    # ------------------------------------------------------------------
+    # Worker
+
+    def _rebuild(self, now):
+        """Fill the heap with the next boundary of every rule (lock held)"""
+        self._heap = []
+        for index, rule in enumerate(self.schedule.rules):
+            boundary = rule.next_boundary(now)
+            if boundary is not None:
+                self._heap.append((boundary, index))
+        heapq.heapify(self._heap)
+
+    def _pending_change(self, now):
+        """The state to switch to if it differs from the last one (lock held)"""
+        desired = self.schedule.is_active(now)
+        if desired == self.active:
+            return None
+        self.active = desired
+        return desired
+
+    def _run(self):
+        last_wall, last_mono = self.clock(), self.monotonic()
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                if self._heap:
+                    timeout = min(max(self._heap[0][0] - self.clock(), 0), self.guard_interval)
+                else:
+                    # Nothing scheduled: sleep until set_schedule() or stop()
+                    timeout = None
+                self._condition.wait(timeout)
+                if self._stopping:
+                    return
+                self.wakeups += 1
+
+                now, mono = self.clock(), self.monotonic()
+                drift = (now - last_wall) - (mono - last_mono)
+                last_wall, last_mono = now, mono
+                if abs(drift) > DRIFT_TOLERANCE:
+                    # Resumed from sleep or the clock was changed: start over
+                    # from the current time, applying any missed transition
+                    self._rebuild(now)
+                    change = self._pending_change(now)
+                else:
+                    change = self._pop_due(now)
+            if change is not None:
+                self._fire(change)
+
+    def _pop_due(self, now):
+        """Advance every rule whose boundary has passed (lock held)"""
+        if not self._heap or self._heap[0][0] > now:
+            return None
+        while self._heap and self._heap[0][0] <= now:
+            _, index = heapq.heappop(self._heap)
+            boundary = self.schedule.rules[index].next_boundary(now)
+            if boundary is not None:
+                heapq.heappush(self._heap, (boundary, index))
+        return self._pending_change(now)
+
+    def _fire(self, active):
+        self.transitions += 1
+        try:
+            self.on_transition(active)
+        except Exception as e:
+            print(f"⚠️ Scheduled {'block' if active else 'unblock'} failed: {e}")
+
+
+def describe_transition(transition):
+    """Human-readable form of Schedule.next_transition()"""
+    if transition is None:
+        return "no upcoming changes"
+    at, active = transition
+    when = datetime.fromtimestamp(at).strftime("%a %H:%M")
+    return f"{'blocks' if active else 'unblocks'} at {when}"
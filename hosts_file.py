@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Hosts file engine for YouTube Stopper
+
+Reads the hosts file line by line and swaps the "# YouTube Stopper" section
+in a single pass. The result is written to a temporary file next to the
+hosts file and renamed into place, so large hosts files (corporate ad and
+malware lists with hundreds of thousands of lines) are never held in memory
+and a half-written hosts file is never visible.
+
+Writes are durable: the temporary file is fsynced before the rename and
+the directory after it, so a power cut cannot leave an empty hosts file
+behind a completed rename. Just before the rename, a small journal next
+to the hosts file records the commit. recover() reads leftover journals
+on the next start: a complete temporary file is renamed into place (roll
+forward) unless the hosts file changed in the meantime, and anything
+else is deleted (roll back).
+
+The byte offsets of the managed section are remembered in a small sidecar
+index together with the hosts file's mtime, size and inode. As long as that
+fingerprint matches, status checks cost a single stat call and rewrites seek
+straight past the section instead of scanning for the markers again. The
+index also keeps the SHA-256 of the section as it was last written, so a
+changed section can be told apart from changes elsewhere in the file.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from hosts_watcher import stat_fingerprint
+from instrumentation import span
+
+START_MARKER = "# YouTube Stopper - START"
+END_MARKER = "# YouTube Stopper - END"
+
+# Size of the buffer used when copying unchanged parts of the file
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Temporary files and their commit journals, next to the hosts file
+TEMP_PREFIX = ".hosts-"
+TEMP_SUFFIX = ".tmp"
+JOURNAL_SUFFIX = ".journal"
+# Leftovers younger than this may belong to a write still running in another process
+RECOVERY_GRACE = 10.0
+
+
+def is_entry(line):
+    """True for address/hostname lines, False for comments and blank lines"""
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith('#')
+
+
+def diff_entries(current_lines, target_lines):
+    """
+    Compare the entries of the current managed section with the target.
+    Comment lines are ignored. Returns (added, removed) where added keeps
+    the order of target_lines.
+    """
+    current = {line.strip() for line in current_lines if is_entry(line)}
+    target = {line.strip() for line in target_lines if is_entry(line)}
+    added = []
+    seen = set()
+    for line in target_lines:
+        entry = line.strip()
+        if is_entry(line) and entry not in current and entry not in seen:
+            added.append(entry)
+            seen.add(entry)
+    removed = current - target
+    return added, removed
+
+
+def apply_diff(current_lines, added, removed):
+    """Return the section lines with removed entries dropped and added appended"""
+    kept = [line for line in current_lines if line.strip() not in removed]
+    return kept + list(added)
+
+
+def fsync_directory(path):
+    """
+    Make new names and renames in a directory durable. Returns False where
+    a directory cannot be opened (Windows), which flushes them on its own.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        return False
+    try:
+        os.fsync(fd)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+class HostsFile:
+    """
+    Streaming reader/rewriter for the managed section of a hosts file
+    """
+
+    def __init__(self, path, start_marker=START_MARKER, end_marker=END_MARKER, index_path=None,
+                 durable=True):
+        self.path = str(path)
+        # fsync and journal every write (off only to measure what that costs)
+        self.durable = durable
+        self.start_marker = start_marker.encode('utf-8')
+        self.end_marker = end_marker.encode('utf-8')
+        self.index_path = str(index_path) if index_path else None
+        self._index = None
+        # Fingerprint of the index file when it was loaded or saved
+        self._index_stat = None
+        # Status checks and the watchdog may use the index from different threads
+        self._index_lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def fingerprint(self):
+        """Return (mtime_ns, size, inode) of the hosts file, or None if missing"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+    def detect_newline(self):
+        """Return the line ending used by the hosts file (CRLF on Windows)"""
+        try:
+            with open(self.path, 'rb') as f:
+                first_line = f.readline()
+        except FileNotFoundError:
+            first_line = b""
+        if first_line.endswith(b"\r\n"):
+            return b"\r\n"
+        if first_line.endswith(b"\n"):
+            return b"\n"
+        return os.linesep.encode('ascii')
+
+    def locate_section(self):
+        """
+        Return (start, end) byte offsets of the managed section, or None.
+
+        start includes the blank spacer line we put before the START marker,
+        end points just past the END marker line. The answer comes from the
+        sidecar index when its fingerprint still matches the hosts file.
+        """
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            return None
+        index = self._load_index()
+        if index and index.get("path") == self.path and index.get("fingerprint") == fingerprint:
+            return tuple(index["section"]) if index["section"] else None
+        section = self._scan_section()
+        self._save_index(fingerprint, section, self.expected_digest())
+        return section
+
+    def expected_digest(self):
+        """SHA-256 of the section as we last wrote it, or None if we removed it"""
+        index = self._load_index()
+        if not index or index.get("path") != self.path:
+            return None
+        return index.get("digest")
+
+    def section_intact(self):
+        """
+        True if the managed section still matches what we last wrote.
+
+        The remembered offsets are tried first: when another program only
+        changed the rest of the file, the section is still where we left it
+        and only its own bytes are read. The file is scanned for the markers
+        only when those bytes no longer match.
+        """
+        expected = self.expected_digest()
+        fingerprint = self.fingerprint()
+        if expected is None or fingerprint is None:
+            return False
+        index = self._load_index()
+        remembered = index.get("section")
+        if remembered and self._digest_range(*remembered) == expected:
+            if index.get("fingerprint") != fingerprint:
+                self._save_index(fingerprint, remembered, expected)
+            return True
+        section = self._scan_section()
+        self._save_index(fingerprint, section, expected)
+        return section is not None and self._digest_range(*section) == expected
+
+    def _digest_range(self, start, end):
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return hashlib.sha256(f.read(end - start)).hexdigest()
+
+    def has_section(self):
+        """Check whether the managed section is present"""
+        return self.locate_section() is not None
+
+    def read_section(self):
+        """
+        Return the lines inside the managed section (without markers),
+        or None if there is no managed section
+        """
+        section = self.locate_section()
+        if section is None:
+            return None
+        start, end = section
+        with span("read") as timing:
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                raw = f.read(end - start)
+            timing.add_bytes(len(raw))
+        lines = []
+        inside = False
+        with span("parse"):
+            for line in raw.splitlines():
+                if not inside:
+                    inside = self.start_marker in line
+                elif self.end_marker in line:
+                    break
+                else:
+                    lines.append(line.decode('utf-8', 'replace'))
+        return lines
+
+    def rewrite(self, section_lines=None):
+        """
+        Rewrite the hosts file in one pass.
+
+        Everything outside the managed section is copied unchanged. Any old
+        managed section is dropped and, if section_lines is given, a fresh
+        section is appended at the end. The new file is renamed over the old
+        one only after it has been written completely.
+
+        Returns the number of bytes written.
+        """
+        # Only needed for writing; keeps read-only callers (status) quick to start
+        import shutil
+        import tempfile
+
+        newline = self.detect_newline()
+        section = self.locate_section() if self.exists() else None
+        base = self.fingerprint()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX, dir=directory)
+        journal_path = None
+        previous_index = self._load_index()
+        index_saved = False
+        written = 0
+        new_section = None
+        digest = None
+        try:
+            if base is not None:
+                shutil.copymode(self.path, temp_path)
+            with span("write") as timing, os.fdopen(fd, 'wb') as out:
+                last_byte = b""
+                if self.exists():
+                    with open(self.path, 'rb') as src:
+                        written, last_byte = self._copy_unmanaged(src, out, section)
+                if section_lines is not None:
+                    block = self._render_section(section_lines, newline)
+                    if last_byte and last_byte != b"\n":
+                        out.write(newline)
+                        written += len(newline)
+                    out.write(block)
+                    new_section = (written, written + len(block))
+                    digest = hashlib.sha256(block).hexdigest()
+                    written += len(block)
+                timing.add_bytes(written)
+                if self.durable:
+                    out.flush()
+                    with span("fsync"):
+                        os.fsync(out.fileno())
+            if self.durable:
+                journal_path = self._write_journal(temp_path, written, base, new_section, digest)
+            # A rename keeps mtime, size and inode, so the index can be saved
+            # first: whoever reacts to the new file already sees its index
+            with span("index"):
+                self._save_index(list(stat_fingerprint(temp_path)), new_section, digest)
+            index_saved = True
+            with span("rename"):
+                os.replace(temp_path, self.path)
+        except BaseException:
+            # Not committed: the hosts file is untouched, so its index must be too
+            if index_saved:
+                self._put_index(previous_index)
+            for path in (temp_path, journal_path):
+                try:
+                    if path:
+                        os.remove(path)
+                except OSError:
+                    pass
+            raise
+        if self.durable:
+            with span("fsync"):
+                fsync_directory(directory)
+            # Committed; a journal that outlives a crash here is cleared by recover()
+            with span("journal"):
+                try:
+                    os.remove(journal_path)
+                except OSError:
+                    pass
+        return written
+
+    def _write_journal(self, temp_path, size, base, section, digest):
+        """
+        Record the commit that is about to happen. Written after the
+        temporary file is on disk, so a journal always points at a
+        complete file.
+        """
+        journal_path = temp_path[:-len(TEMP_SUFFIX)] + JOURNAL_SUFFIX
+        record = {
+            "target": self.path,
+            "temp": temp_path,
+            "size": size,
+            "base": base,
+            "section": list(section) if section else None,
+            "digest": digest,
+            "previous_digest": self.expected_digest(),
+        }
+        with span("journal"):
+            with open(journal_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+                f.flush()
+                os.fsync(f.fileno())
+            # The names of both files must survive a crash too
+            fsync_directory(os.path.dirname(journal_path))
+        return journal_path
+
+    def recover(self, grace=RECOVERY_GRACE):
+        """
+        Finish or undo writes cut short by a crash. Returns a list of
+        (action, temporary file) with action "rolled forward" or
+        "rolled back"; empty when there was nothing to do.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            names = [name for name in os.listdir(directory) if name.startswith(TEMP_PREFIX)]
+        except OSError:
+            return []
+        cutoff = time.time() - grace
+        actions = []
+        journaled = set()
+        for name in sorted(names):
+            if not name.endswith(JOURNAL_SUFFIX):
+                continue
+            journal_path = os.path.join(directory, name)
+            try:
+                if os.stat(journal_path).st_mtime > cutoff:
+                    continue
+                with open(journal_path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+            except ValueError:
+                # Cut off while being written: the commit never started
+                record = {"target": self.path,
+                          "temp": journal_path[:-len(JOURNAL_SUFFIX)] + TEMP_SUFFIX}
+            except OSError:
+                continue
+            if record.get("target") != self.path:
+                continue
+            temp_path = record["temp"]
+            journaled.add(os.path.basename(temp_path))
+            actions.extend(self._recover_commit(record, temp_path, directory))
+            os.remove(journal_path)
+        # Temporary files without a journal never reached the commit point
+        for name in names:
+            temp_path = os.path.join(directory, name)
+            if not name.endswith(TEMP_SUFFIX) or name in journaled:
+                continue
+            try:
+                if os.stat(temp_path).st_mtime <= cutoff:
+                    os.remove(temp_path)
+                    actions.append(("rolled back", temp_path))
+            except OSError:
+                continue
+        if actions:
+            fsync_directory(directory)
+        return actions
+
+    def _recover_commit(self, record, temp_path, directory):
+        try:
+            size = os.path.getsize(temp_path)
+        except FileNotFoundError:
+            # The rename happened; only the journal was left
+            return []
+        # Roll forward only onto the file the write started from, never over
+        # a hosts file someone changed or restored since
+        if size == record.get("size") and self.fingerprint() == record.get("base"):
+            os.replace(temp_path, self.path)
+            fsync_directory(directory)
+            self._save_index(list(stat_fingerprint(self.path)), record.get("section"),
+                             record.get("digest"))
+            return [("rolled forward", temp_path)]
+        os.remove(temp_path)
+        # The index was already saved for the write that never landed
+        section = self._scan_section() if self.exists() else None
+        self._save_index(self.fingerprint(), section, record.get("previous_digest"))
+        return [("rolled back", temp_path)]
+
+    def _copy_unmanaged(self, src, out, section):
+        """
+        Copy the bytes before and after the managed section.
+        Returns (bytes copied, last byte copied).
+        """
+        if section is None:
+            return self._copy_range(src, out, None)
+        start, end = section
+        written, last_byte = self._copy_range(src, out, start)
+        src.seek(end)
+        copied, tail = self._copy_range(src, out, None)
+        return written + copied, tail or last_byte
+
+    def _copy_range(self, src, out, length):
+        """Copy up to length bytes (or everything when length is None)"""
+        copied = 0
+        last_byte = b""
+        while length is None or copied < length:
+            size = COPY_BUFFER_SIZE if length is None else min(COPY_BUFFER_SIZE, length - copied)
+            chunk = src.read(size)
+            if not chunk:
+                break
+            out.write(chunk)
+            copied += len(chunk)
+            last_byte = chunk[-1:]
+        return copied, last_byte
+
+    def _scan_section(self):
+        """Find the managed section by reading the file line by line"""
+        offset = 0
+        previous_blank = None
+        start = None
+        with span("scan") as timing, open(self.path, 'rb') as f:
+            for line in f:
+                if start is None:
+                    if self.start_marker in line:
+                        start = previous_blank if previous_blank is not None else offset
+                    previous_blank = offset if not line.strip() else None
+                elif self.end_marker in line:
+                    timing.add_bytes(offset + len(line))
+                    return (start, offset + len(line))
+                offset += len(line)
+            timing.add_bytes(offset)
+        if start is not None:
+            # START without END: treat the rest of the file as our section
+            return (start, offset)
+        return None
+
+    def _load_index(self):
+        if not self.index_path:
+            return self._index
+        with self._index_lock:
+            # Reload when another process (CLI, daemon) has saved it since
+            index_stat = stat_fingerprint(self.index_path)
+            if self._index is None or index_stat != self._index_stat:
+                try:
+                    with open(self.index_path, 'r', encoding='utf-8') as f:
+                        self._index = json.load(f)
+                except (OSError, ValueError):
+                    self._index = None
+                self._index_stat = index_stat
+            return self._index
+
+    def _save_index(self, fingerprint, section, digest=None):
+        """digest stays set after the section disappears, so a removal can be noticed"""
+        self._put_index({
+            "path": self.path,
+            "fingerprint": fingerprint,
+            "section": list(section) if section else None,
+            "digest": digest,
+        })
+
+    def _put_index(self, index):
+        """Replace the index (None forgets it)"""
+        with self._index_lock:
+            self._index = index
+            if not self.index_path:
+                return
+            try:
+                if index is None:
+                    os.remove(self.index_path)
+                else:
+                    with open(self.index_path, 'w', encoding='utf-8') as f:
+                        json.dump(index, f)
+                self._index_stat = stat_fingerprint(self.index_path)
+            except OSError:
+                # The index is only an optimisation, a stale one is rebuilt
+                pass
+
+    def _render_section(self, section_lines, newline):
+        lines = [b"", self.start_marker]
+        lines.extend(line.encode('utf-8') for line in section_lines)
+        lines.append(self.end_marker)
+        return newline.join(lines) + newline
+
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Enforcement watchdog for YouTube Stopper
+
+While blocking is on, another program (or a determined user) can edit
+the "# YouTube Stopper" section out of the hosts file. HostsWatchdog
+follows the hosts file with a FileWatcher (inotify, or stat polling) and,
+on every change, compares the section with the SHA-256 recorded when it
+was last written. Only the section's own bytes are read, at the offsets
+remembered in the sidecar index; the file is scanned again only when
+those no longer match. A changed or missing section is written back; the
+rest of the file is left as the other program made it.
+
+Repairs are rate limited, so a tool that keeps rewriting the file cannot
+pull the watchdog into a rewrite loop. Once the limit frees up, one more
+check runs. Repairs, suppressed repairs and failures are counted.
+"""
+
+import time
+import threading
+import collections
+
+from hosts_watcher import FileWatcher
+
+# At most MAX_REPAIRS repairs in any REPAIR_WINDOW seconds
+MAX_REPAIRS = 5
+REPAIR_WINDOW = 60.0
+
+
+class HostsWatchdog:
+    """
+    Restores the managed hosts section after outside edits
+    """
+
+    def __init__(self, blocker, max_repairs=MAX_REPAIRS, repair_window=REPAIR_WINDOW,
+                 poll_interval=1.0):
+        self.blocker = blocker
+        self.hosts = blocker.backend.hosts
+        self.max_repairs = max_repairs
+        self.repair_window = repair_window
+        self.checks = 0
+        self.repairs = 0
+        self.suppressed = 0
+        self.failures = 0
+        self._recent = collections.deque()
+        self._retry = None
+        self._stopped = False
+        self._watcher = FileWatcher([self.hosts.path], self._on_change, poll_interval)
+
+    def start(self):
+        """Repair anything changed while we were not running, then follow the file"""
+        self._stopped = False
+        self.check()
+        self._watcher.start()
+
+    def stop(self):
+        self._stopped = True
+        self._watcher.stop()
+        if self._retry is not None:
+            self._retry.cancel()
+            self._retry = None
+
+    def stats(self):
+        return {
+            "checks": self.checks,
+            "repairs": self.repairs,
+            "suppressed": self.suppressed,
+            "failures": self.failures,
+        }
+
+    def _on_change(self, path):
+        self.check()
+
+    def check(self):
+        """Repair the section if it differs from what we wrote; True if repaired"""
+        if self._stopped:
+            return False
+        # The blocker's lock keeps a repair from undoing an unblock in progress
+        with self.blocker.write_lock:
+            self.checks += 1
+            if self.hosts.expected_digest() is None or self.hosts.section_intact():
+                return False
+            now = time.monotonic()
+            while self._recent and self._recent[0] <= now - self.repair_window:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_repairs:
+                self.suppressed += 1
+                self._retry_after(self._recent[0] + self.repair_window - now)
+                return False
+            self._recent.append(now)
+            try:
+                self.blocker.repair_block()
+            except Exception as e:
+                self.failures += 1
+                print(f"❌ Could not restore the hosts file section: {e}")
+                return False
+            self.repairs += 1
+        print(f"🛡️ Hosts file section was changed by another program - restored (repair #{self.repairs})")
+        return True
+
+    def _retry_after(self, delay):
+        if self._retry is not None and self._retry.is_alive():
+            return
+        print(f"⚠️ Hosts file keeps changing; next repair in {delay:.0f}s")
+        self._retry = threading.Timer(delay, self.check)
+        self._retry.daemon = True
+        self._retry.start()
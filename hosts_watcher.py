@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+File change watcher for YouTube Stopper
+
+Calls back whenever one of the watched files changes on disk. On Linux it
+uses inotify (through ctypes, no extra packages) on the parent directories,
+so atomic renames over the file are seen as well. Everywhere else it falls
+back to polling os.stat() for changes in mtime, size and inode.
+"""
+
+import os
+import sys
+import struct
+import select
+import threading
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM |
+              IN_MOVED_TO | IN_CREATE | IN_DELETE)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def stat_fingerprint(path):
+    """Return (mtime_ns, size, inode) for path, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class FileWatcher:
+    """
+    Background thread that reports changes to a set of files
+    """
+
+    def __init__(self, paths, callback, poll_interval=1.0):
+        self.paths = [os.path.abspath(str(p)) for p in paths]
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.mode = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        inotify_fd = self._open_inotify()
+        if inotify_fd is not None:
+            self.mode = "inotify"
+            target, args = self._run_inotify, (inotify_fd,)
+        else:
+            self.mode = "polling"
+            target, args = self._run_polling, ()
+        self._thread = threading.Thread(target=target, args=args,
+                                        name="FileWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _notify(self, path):
+        try:
+            self.callback(path)
+        except Exception as e:
+            print(f"⚠️ File watcher callback failed: {e}")
+
+    def _run_polling(self):
+        fingerprints = {path: stat_fingerprint(path) for path in self.paths}
+        while not self._stop.wait(self.poll_interval):
+            for path in self.paths:
+                current = stat_fingerprint(path)
+                if current != fingerprints[path]:
+                    fingerprints[path] = current
+                    self._notify(path)
+
+    def _open_inotify(self):
+        """Set up inotify watches on the parent directories, or return None"""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+            self._watches = {}
+            for directory in {os.path.dirname(p) for p in self.paths}:
+                wd = libc.inotify_add_watch(fd, directory.encode(sys.getfilesystemencoding()),
+                                            WATCH_MASK)
+                if wd < 0:
+                    os.close(fd)
+                    return None
+                self._watches[wd] = directory
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _run_inotify(self, fd):
+        watched = set(self.paths)
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], self.poll_interval)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                changed = []
+                offset = 0
+                while offset + EVENT_HEADER.size <= len(data):
+                    wd, _mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                    offset += EVENT_HEADER.size
+                    name = data[offset:offset + length].rstrip(b"\0")
+                    offset += length
+                    directory = self._watches.get(wd)
+                    if directory is None or not name:
+                        continue
+                    path = os.path.join(directory, os.fsdecode(name))
+                    if path in watched and path not in changed:
+                        changed.append(path)
+                for path in changed:
+                    self._notify(path)
+        finally:
+            os.close(fd)
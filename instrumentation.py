@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Operation timing for YouTube Stopper
+
+Blocker operations (block, unblock, update, add, remove, repair) and the
+stages inside them (store, compile, scan, read, parse, diff, write,
+fsync, journal, index, rename, flush) are wrapped in spans. A span
+records its duration, the bytes it read or wrote and the spans nested
+inside it. When the outermost span of a thread ends, the finished tree
+is one operation record:
+
+    {"op": "update", "ms": 41.2, "ok": true, "time": 1760000000.0,
+     "spans": [{"name": "compile", "ms": 3.1}, {"name": "read", "ms": 0.4, "bytes": 5210}, ...]}
+
+Stages only count inside an operation; a status check that happens to
+scan the hosts file records nothing. Timing is off by default. span()
+then returns one shared no-op object, so an instrumented call costs a
+global lookup and nothing more. It is switched on with
+YOUTUBE_STOPPER_TRACE (a JSONL path, or "1" for
+~/youtube_stopper_timings.jsonl). Records go to that file, which is
+rotated by size, and the last few are kept in memory for the daemon and
+the GUI. With YOUTUBE_STOPPER_METRICS_PORT set, long-running processes
+(the daemon, the app) also serve per-stage totals in the Prometheus text
+format on http://127.0.0.1:<port>/metrics.
+"""
+
+import os
+import time
+import functools
+import threading
+import collections
+from pathlib import Path
+
+TRACE_ENV_VAR = "YOUTUBE_STOPPER_TRACE"
+METRICS_PORT_ENV_VAR = "YOUTUBE_STOPPER_METRICS_PORT"
+
+DEFAULT_TRACE_FILE = "youtube_stopper_timings.jsonl"
+# The trace file is rotated to .1, .2, ... once it grows past this size
+MAX_TRACE_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+# Operation records kept in memory for `timings`
+RECENT_OPERATIONS = 50
+
+_recorder = None
+
+
+class _NullSpan:
+    """Stands in for every span while timing is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def add_bytes(self, count):
+        pass
+
+    def fail(self):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed stage; nested spans become its children"""
+
+    __slots__ = ("recorder", "name", "bytes", "started", "duration", "children", "parent", "ok")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+        self.bytes = 0
+        self.started = 0.0
+        self.duration = 0.0
+        self.children = []
+        self.parent = None
+        self.ok = True
+
+    def __enter__(self):
+        stack = self.recorder.stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.started
+        self.recorder.stack().pop()
+        if exc_type is not None:
+            self.ok = False
+        if self.parent is not None:
+            self.parent.children.append(self)
+        else:
+            self.recorder.finish(self)
+        return False
+
+    def add_bytes(self, count):
+        self.bytes += count
+
+    def fail(self):
+        """Mark the span as failed without raising (for methods that return False)"""
+        self.ok = False
+
+    def as_dict(self):
+        record = {"name": self.name, "ms": round(self.duration * 1000, 3)}
+        if self.bytes:
+            record["bytes"] = self.bytes
+        if not self.ok:
+            record["ok"] = False
+        if self.children:
+            record["spans"] = [child.as_dict() for child in self.children]
+        return record
+
+
+class TimingRecorder:
+    """
+    Collects finished operations: in memory, in a rotating JSONL file and
+    as running totals for the metrics endpoint
+    """
+
+    def __init__(self, path=None, max_bytes=MAX_TRACE_BYTES, backups=TRACE_BACKUPS,
+                 keep=RECENT_OPERATIONS):
+        self.path = str(path) if path else None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.recent = collections.deque(maxlen=keep)
+        # {span name: [count, seconds, bytes]} and {(operation, ok): count}
+        self.totals = {}
+        self.operations = collections.Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def finish(self, root):
+        record = root.as_dict()
+        record["op"] = record.pop("name")
+        record["ok"] = root.ok
+        record["time"] = round(time.time(), 3)
+        with self._lock:
+            self.recent.append(record)
+            self.operations[(root.name, root.ok)] += 1
+            self._add_totals(root)
+            if self.path:
+                self._write(record)
+
+    def _add_totals(self, span):
+        totals = self.totals.setdefault(span.name, [0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += span.duration
+        totals[2] += span.bytes
+        for child in span.children:
+            self._add_totals(child)
+
+    def _write(self, record):
+        import json
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError as e:
+            # Timing must never break blocking; give up on the file instead
+            print(f"⚠️ Could not write timings to {self.path}: {e}")
+            self.path = None
+
+    def _rotate(self):
+        for number in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{number}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{number + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def recent_operations(self, limit=10):
+        with self._lock:
+            return list(self.recent)[-limit:]
+
+    def prometheus_text(self):
+        """Per-stage totals in the Prometheus text exposition format"""
+        with self._lock:
+            totals = sorted(self.totals.items())
+            operations = sorted(self.operations.items())
+        lines = [
+            "# HELP youtube_stopper_span_seconds Time spent in each stage of blocker operations",
+            "# TYPE youtube_stopper_span_seconds summary",
+        ]
+        for name, (count, seconds, _) in totals:
+            lines.append(f'youtube_stopper_span_seconds_sum{{span="{name}"}} {seconds:.6f}')
+            lines.append(f'youtube_stopper_span_seconds_count{{span="{name}"}} {count}')
+        lines += [
+            "# HELP youtube_stopper_span_bytes_total Bytes read or written by each stage",
+            "# TYPE youtube_stopper_span_bytes_total counter",
+        ]
+        for name, (_, _, count) in totals:
+            lines.append(f'youtube_stopper_span_bytes_total{{span="{name}"}} {count}')
+        lines += [
+            "# HELP youtube_stopper_operations_total Blocker operations by outcome",
+            "# TYPE youtube_stopper_operations_total counter",
+        ]
+        for (name, ok), count in operations:
+            result = "ok" if ok else "failed"
+            lines.append(f'youtube_stopper_operations_total{{operation="{name}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def span(name):
+    """
+    A span for one stage of the running operation:
+    `with span("write") as s: ...; s.add_bytes(n)`
+    """
+    recorder = _recorder
+    if recorder is None or not recorder.stack():
+        return NULL_SPAN
+    return Span(recorder, name)
+
+
+def operation(name):
+    """A span that is recorded on its own when no other operation is running"""
+    recorder = _recorder
+    if recorder is None:
+        return NULL_SPAN
+    return Span(recorder, name)
+
+
+def traced(name):
+    """Decorator: time a method as an operation; a False return counts as failed"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            with Span(recorder, name) as current:
+                result = func(*args, **kwargs)
+                if result is False:
+                    current.fail()
+                return result
+        return wrapper
+    return decorator
+
+
+def enabled():
+    return _recorder is not None
+
+
+def enable(path=None, **options):
+    """Start recording; returns the TimingRecorder"""
+    global _recorder
+    _recorder = TimingRecorder(path, **options)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    _recorder = None
+
+
+def recorder():
+    return _recorder
+
+
+def default_trace_path():
+    return Path.home() / DEFAULT_TRACE_FILE
+
+
+def trace_path_from_env():
+    """The JSONL path YOUTUBE_STOPPER_TRACE asks for, or None when timing is off"""
+    value = os.environ.get(TRACE_ENV_VAR, "").strip()
+    if not value or value.lower() in ("0", "off", "false", "no"):
+        return None
+    if value.lower() in ("1", "on", "true", "yes"):
+        return default_trace_path()
+    return Path(value)
+
+
+def configure_from_env():
+    """Enable timing if the environment asks for it (once per process)"""
+    if _recorder is not None:
+        return _recorder
+    path = trace_path_from_env()
+    if path is None and not os.environ.get(METRICS_PORT_ENV_VAR):
+        return None
+    return enable(path)
+
+
+def recent_operations(limit=10):
+    """
+    The last operations of this process, or, when it has recorded none
+    (a one-shot CLI), the tail of the trace file
+    """
+    if _recorder is not None and _recorder.recent:
+        return _recorder.recent_operations(limit)
+    path = trace_path_from_env()
+    return read_trace(path, limit) if path else []
+
+
+def read_trace(path, limit=10):
+    """Last limit records of a JSONL trace file"""
+    import json
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            tail = collections.deque(f, maxlen=limit)
+    except OSError:
+        return []
+    records = []
+    for line in tail:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def _leaf_stages(spans, totals):
+    """{stage: [ms, bytes]} with each span's own time, nested spans not included"""
+    for stage in spans:
+        children = stage.get("spans", [])
+        entry = totals.setdefault(stage["name"], [0.0, 0])
+        entry[0] += stage["ms"] - sum(child["ms"] for child in children)
+        entry[1] += stage.get("bytes", 0)
+        _leaf_stages(children, totals)
+    return totals
+
+
+def format_operation(record):
+    """One line per operation: total, outcome and the time per stage"""
+    stages = ", ".join(
+        f"{name} {ms:.1f} ms" + (f" ({count / 1024:.0f} KiB)" if count else "")
+        for name, (ms, count) in _leaf_stages(record.get("spans", []), {}).items())
+    outcome = "" if record.get("ok", True) else " ❌"
+    return f"{record['op']:<8} {record['ms']:8.1f} ms{outcome}" + (f"  [{stages}]" if stages else "")
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serve /metrics from a background thread; returns the server (shutdown() to stop)"""
+    import http.server
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics" or _recorder is None:
+                self.send_error(404)
+                return
+            body = _recorder.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True).start()
+    return server
+
+
+def serve_metrics_from_env():
+    """Start the metrics endpoint if YOUTUBE_STOPPER_METRICS_PORT is set; returns the server or None"""
+    value = os.environ.get(METRICS_PORT_ENV_VAR)
+    if not value:
+        return None
+    configure_from_env()
+    try:
+        server = serve_metrics(int(value))
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Could not serve metrics on port {value}: {e}")
+        return None
+    print(f"📈 Timing metrics at http://127.0.0.1:{server.server_port}/metrics")
+    return server
@@ -3,7 +3,7 @@ from tkinter import messagebox
 import random
 
 class MotivationWidget(tk.Label):
-    def __init__(self, master, *args, **kwargs):
+    def __init__(self, master, *args, refresh=None, **kwargs):
         self.motivation_lines = [
             "Stay focused, your goals are within reach!",
             "Every minute counts. Make it productive!",
@@ -17,10 +17,19 @@ class MotivationWidget(tk.Label):
             "Focus on being productive instead of busy."
         ]
         super().__init__(master, text=random.choice(self.motivation_lines), *args, **kwargs)
-        self.update_motivation_line()
+        if refresh is not None:
+            # Only rotate while the window can be seen
+            refresh.every(self.next_interval, self.show_random_line)
+        else:
+            self.update_motivation_line()
 
-    def update_motivation_line(self):
-        self.config(text=random.choice(self.motivation_lines))
+    def next_interval(self):
         # Change message every 5-10 seconds randomly
-        interval = random.randint(5000, 10000)  # milliseconds
-        self.after(interval, self.update_motivation_line)
+        return random.randint(5000, 10000)  # milliseconds
+
+    def show_random_line(self):
+        self.config(text=random.choice(self.motivation_lines))
+
+    def update_motivation_line(self):
+        self.show_random_line()
+        self.after(self.next_interval(), self.update_motivation_line)
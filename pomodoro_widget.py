@@ -1,10 +1,19 @@
 import tkinter as tk
 from tkinter import messagebox
 import os
+import math
+from tick_service import TickService
+
+FOCUS_SECONDS = 25 * 60
+BREAK_SECONDS = 5 * 60
 
 class PomodoroWidget(tk.Frame):
-    def __init__(self, master, *args, **kwargs):
+    def __init__(self, master, *args, on_focus_complete=None, ticker=None, **kwargs):
         super().__init__(master, bg="#232946", *args, **kwargs)
+        # Called after each completed focus period, e.g. to record it
+        self.on_focus_complete = on_focus_complete
+        # Share the app's clock tick when there is one
+        self.ticker = ticker or TickService(self.winfo_toplevel())
         self.pomo_label = tk.Label(self, text="Pomodoro Timer", bg="#232946", fg="#eebbc3", font=("Segoe UI", 11, "bold"))
         self.pomo_label.grid(row=0, column=0, columnspan=2, pady=(0, 5))
         self.pomo_time_var = tk.StringVar(value="25:00")
@@ -15,49 +24,76 @@ class PomodoroWidget(tk.Frame):
         self.pomo_reset_btn = tk.Button(self, text="Reset", command=self.reset_pomodoro, bg="#eebbc3", fg="#232946", font=("Segoe UI", 10), width=10)
         self.pomo_reset_btn.grid(row=2, column=1, pady=5, padx=5)
         self.pomo_running = False
-        self.pomo_seconds_left = 25 * 60
+        self.pomo_seconds_left = FOCUS_SECONDS
         self.pomo_on_break = False
+        # Monotonic time the running period ends; remaining time is derived from it
+        self.pomo_deadline = None
+        self._tick_subscription = None
+        self._finish_after_id = None
 
     def start_pomodoro(self):
         if not self.pomo_running:
             self.pomo_running = True
             self.pomo_start_btn.config(text="Pause", command=self.pause_pomodoro)
-            self.run_pomodoro()
+            # Whole-second deadline so the display changes on the shared tick
+            self.pomo_deadline = round(self.ticker.clock() + self.pomo_seconds_left)
+            self._finish_after_id = self.ticker.call_at(self.pomo_deadline, self.finish_period)
+            self._tick_subscription = self.ticker.subscribe(self.run_pomodoro)
         else:
             self.pause_pomodoro()
 
     def pause_pomodoro(self):
-        self.pomo_running = False
+        if self.pomo_running:
+            self.pomo_seconds_left = self.seconds_left(self.ticker.clock())
+        self.stop_countdown()
         self.pomo_start_btn.config(text="Resume", command=self.start_pomodoro)
 
     def reset_pomodoro(self):
-        self.pomo_running = False
+        self.stop_countdown()
         self.pomo_on_break = False
-        self.pomo_seconds_left = 25 * 60
+        self.pomo_seconds_left = FOCUS_SECONDS
         self.pomo_time_var.set("25:00")
         self.pomo_start_btn.config(text="Start Focus", command=self.start_pomodoro)
 
-    def run_pomodoro(self):
+    def stop_countdown(self):
+        self.pomo_running = False
+        self.pomo_deadline = None
+        if self._tick_subscription is not None:
+            self._tick_subscription.cancel()
+            self._tick_subscription = None
+        if self._finish_after_id is not None:
+            self.after_cancel(self._finish_after_id)
+            self._finish_after_id = None
+
+    def seconds_left(self, now):
+        return max(0, math.ceil(self.pomo_deadline - now))
+
+    def run_pomodoro(self, now):
+        """Tick subscriber: show the time left; StringVar.set is skipped when unchanged"""
         if self.pomo_running:
-            if self.pomo_seconds_left > 0:
-                mins, secs = divmod(self.pomo_seconds_left, 60)
-                self.pomo_time_var.set(f"{mins:02d}:{secs:02d}")
-                self.pomo_seconds_left -= 1
-                self.after(1000, self.run_pomodoro)
-            else:
-                self.pomo_running = False
-                if not self.pomo_on_break:
-                    self.pomo_on_break = True
-                    self.pomo_seconds_left = 5 * 60
-                    self.pomo_time_var.set("05:00")
-                    self.pomo_start_btn.config(text="Start Break", command=self.start_pomodoro)
-                    self.show_pomodoro_alert("Focus session complete! Time for a break.")
-                else:
-                    self.pomo_on_break = False
-                    self.pomo_seconds_left = 25 * 60
-                    self.pomo_time_var.set("25:00")
-                    self.pomo_start_btn.config(text="Start Focus", command=self.start_pomodoro)
-                    self.show_pomodoro_alert("Break over! Back to focus.")
+            mins, secs = divmod(self.seconds_left(now), 60)
+            text = f"{mins:02d}:{secs:02d}"
+            if text != self.pomo_time_var.get():
+                self.pomo_time_var.set(text)
+
+    def finish_period(self):
+        """Called once at the deadline, even while the window is minimized"""
+        self._finish_after_id = None
+        self.stop_countdown()
+        if not self.pomo_on_break:
+            self.pomo_on_break = True
+            self.pomo_seconds_left = BREAK_SECONDS
+            self.pomo_time_var.set("05:00")
+            self.pomo_start_btn.config(text="Start Break", command=self.start_pomodoro)
+            if self.on_focus_complete is not None:
+                self.on_focus_complete()
+            self.show_pomodoro_alert("Focus session complete! Time for a break.")
+        else:
+            self.pomo_on_break = False
+            self.pomo_seconds_left = FOCUS_SECONDS
+            self.pomo_time_var.set("25:00")
+            self.pomo_start_btn.config(text="Start Focus", command=self.start_pomodoro)
+            self.show_pomodoro_alert("Break over! Back to focus.")
 
     def show_pomodoro_alert(self, message, sound_file=None):
         # Play custom sound if provided, else default beep
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Visibility-aware refresh for YouTube Stopper's Tkinter app
+
+Everything the window redraws purely for looks (the rotating motivation
+line, the timer labels) is scheduled through one RefreshManager. It
+follows the main window's <Map>, <Unmap> and <Visibility> events. While
+the window is minimized, withdrawn to the tray or fully covered, no
+cosmetic callback is scheduled at all. When the window shows again every
+job runs once straight away, so nothing on screen is stale, and then
+resumes its normal interval.
+
+Each timer wake-up is counted against the state the window was in. That
+gives wake-ups per minute while visible and while hidden, which should be
+close to zero for an idle hidden window.
+"""
+
+import time
+import collections
+
+# Window length for wakeups_per_minute()
+RATE_WINDOW = 60.0
+
+
+class RefreshJob:
+    """A repeating cosmetic callback; cancel() stops it for good"""
+
+    def __init__(self, manager, callback, interval_ms):
+        self.manager = manager
+        self.callback = callback
+        # A number, or a callable returning one (e.g. a random interval)
+        self.interval_ms = interval_ms
+        self.after_id = None
+        self.cancelled = False
+
+    def next_interval(self):
+        return self.interval_ms() if callable(self.interval_ms) else self.interval_ms
+
+    def cancel(self):
+        self.cancelled = True
+        self.manager._unschedule(self)
+        self.manager._jobs.discard(self)
+
+
+class RefreshManager:
+    """
+    Runs cosmetic callbacks only while the main window can be seen
+    """
+
+    def __init__(self, root, clock=time.monotonic):
+        self.root = root
+        self.clock = clock
+        self.visible = True
+        self._mapped = True
+        self._obscured = False
+        self._jobs = set()
+        self._listeners = []
+        self._recent = collections.deque()
+        # Wake-ups and seconds spent in each state
+        self._wakeups = {True: 0, False: 0}
+        self._seconds = {True: 0.0, False: 0.0}
+        self._since = clock()
+        root.bind("<Map>", self._on_map, add="+")
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<Visibility>", self._on_visibility, add="+")
+
+    # ------------------------------------------------------------------
+    # Jobs and listeners
+
+    def every(self, interval_ms, callback):
+        """
+        Call callback() every interval_ms while the window is visible.
+        interval_ms may be a callable that returns the next interval.
+        """
+        job = RefreshJob(self, callback, interval_ms)
+        self._jobs.add(job)
+        self._schedule(job)
+        return job
+
+    def add_listener(self, callback):
+        """Call callback(visible) whenever the window is shown or hidden"""
+        self._listeners.append(callback)
+
+    def record_wakeup(self):
+        """Count a timer wake-up made outside every(), e.g. by the tick service"""
+        now = self.clock()
+        self._wakeups[self.visible] += 1
+        self._recent.append(now)
+        while self._recent and self._recent[0] < now - RATE_WINDOW:
+            self._recent.popleft()
+
+    # ------------------------------------------------------------------
+    # Reporting
+
+    def wakeups_per_minute(self):
+        """Wake-ups during the last minute"""
+        cutoff = self.clock() - RATE_WINDOW
+        while self._recent and self._recent[0] < cutoff:
+            self._recent.popleft()
+        return len(self._recent)
+
+    def stats(self):
+        """Average wake-ups per minute while visible and while hidden"""
+        seconds = dict(self._seconds)
+        seconds[self.visible] += self.clock() - self._since
+
+        def rate(state):
+            return self._wakeups[state] * 60 / seconds[state] if seconds[state] > 0 else 0.0
+
+        return {
+            "visible_per_minute": rate(True),
+            "hidden_per_minute": rate(False),
+            "visible_seconds": seconds[True],
+            "hidden_seconds": seconds[False],
+            "last_minute": self.wakeups_per_minute(),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+
+    def _schedule(self, job):
+        if self.visible and not job.cancelled and job.after_id is None:
+            job.after_id = self.root.after(job.next_interval(), self._run, job)
+
+    def _unschedule(self, job):
+        if job.after_id is not None:
+            self.root.after_cancel(job.after_id)
+            job.after_id = None
+
+    def _run(self, job):
+        job.after_id = None
+        self.record_wakeup()
+        try:
+            job.callback()
+        except Exception as e:
+            print(f"❌ Refresh failed: {e}")
+        self._schedule(job)
+
+    def _set_visible(self, visible):
+        if visible == self.visible:
+            return
+        now = self.clock()
+        self._seconds[self.visible] += now - self._since
+        self._since = now
+        self.visible = visible
+        for job in list(self._jobs):
+            if visible:
+                # Catch up at once so nothing shown is stale, then carry on
+                self._run(job)
+            else:
+                self._unschedule(job)
+        for listener in self._listeners:
+            listener(visible)
+
+    def _update(self):
+        self._set_visible(self._mapped and not self._obscured)
+
+    # Child widgets share the toplevel's bindings; only the window itself counts
+    def _on_map(self, event):
+        if event.widget is self.root:
+            self._mapped = True
+            self._update()
+
+    def _on_unmap(self, event):
+        if event.widget is self.root:
+            self._mapped = False
+            self._update()
+
+    def _on_visibility(self, event):
+        if event.widget is self.root:
+            self._obscured = event.state == "VisibilityFullyObscured"
+            self._update()
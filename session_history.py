@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Persistent focus-session history for YouTube Stopper
+
+Every block, unblock and completed Pomodoro cycle is appended to an events
+table in a SQLite database (WAL mode, so the GUI can read while a write is
+in progress). When a session ends, its duration is added to daily and
+weekly rollup tables in the same transaction, split at local midnights. A
+"last 365 days" view then reads at most 365 rows, however many years of
+events there are.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from datetime import date, datetime, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    domain_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT PRIMARY KEY,
+    seconds REAL NOT NULL DEFAULT 0,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    pomodoros INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS weekly (
+    week TEXT PRIMARY KEY,
+    seconds REAL NOT NULL DEFAULT 0,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    pomodoros INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+BLOCK, UNBLOCK, POMODORO = "block", "unblock", "pomodoro"
+
+
+def default_history_path():
+    return Path.home() / "youtube_stopper_history.db"
+
+
+def week_key(day):
+    """ISO week of a date, e.g. '2025-W27'"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def split_by_day(start, end):
+    """
+    Yield (date, seconds) for the part of [start, end) that falls on each
+    local calendar day. Midnights are computed per date, so days that are
+    23 or 25 hours long because of DST come out right.
+    """
+    day = date.fromtimestamp(start)
+    while start < end:
+        next_midnight = datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+        piece_end = min(end, next_midnight)
+        yield day, piece_end - start
+        start = piece_end
+        day += timedelta(days=1)
+
+
+class SessionHistory:
+    """
+    Append-only log of focus sessions with precomputed daily/weekly totals.
+    Safe to use from the Tk thread and the background worker at once.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL plus NORMAL only risks the last commits on power loss, never corruption
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._open_session = self._find_open_session()
+        # (date, seconds) of closed sessions today, for the once-a-second timer
+        self._closed_today = None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # ------------------------------------------------------------------
+    # Recording
+
+    @property
+    def open_session(self):
+        """Start time of the session in progress, or None"""
+        return self._open_session
+
+    def reload(self):
+        """
+        Pick up sessions another connection (the blocker, the daemon) has
+        opened or closed since; returns the start of the open session
+        """
+        with self._lock:
+            self._open_session = self._find_open_session()
+            self._closed_today = None
+            return self._open_session
+
+    def start_session(self, domain_count=None, ts=None):
+        """Record a block; does nothing if a session is already open"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._open_session = self._find_open_session()
+            if self._open_session is not None:
+                return self._open_session
+            with self._db:
+                self._db.execute("INSERT INTO events (ts, kind, domain_count) VALUES (?, ?, ?)",
+                                 (ts, BLOCK, domain_count))
+                self._add_totals(date.fromtimestamp(ts), 0, sessions=1)
+            self._open_session = ts
+            return ts
+
+    def end_session(self, ts=None):
+        """Record an unblock and roll the session into the totals, return its length"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            start = self._open_session = self._find_open_session()
+            if start is None:
+                return 0
+            ts = max(ts, start)
+            with self._db:
+                self._db.execute("INSERT INTO events (ts, kind) VALUES (?, ?)", (ts, UNBLOCK))
+                for day, seconds in split_by_day(start, ts):
+                    self._add_totals(day, seconds)
+            self._open_session = None
+            self._closed_today = None
+            return ts - start
+
+    def record_pomodoro(self, ts=None):
+        """Record one completed Pomodoro focus period"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            with self._db:
+                self._db.execute("INSERT INTO events (ts, kind) VALUES (?, ?)", (ts, POMODORO))
+                self._add_totals(date.fromtimestamp(ts), 0, pomodoros=1)
+
+    def _add_totals(self, day, seconds, sessions=0, pomodoros=0):
+        """Upsert one day's and its week's totals (lock and transaction held)"""
+        for table, column, key in (("daily", "day", day.isoformat()),
+                                   ("weekly", "week", week_key(day))):
+            self._db.execute(
+                f"INSERT INTO {table} ({column}, seconds, sessions, pomodoros) VALUES (?, ?, ?, ?) "
+                f"ON CONFLICT({column}) DO UPDATE SET seconds = seconds + excluded.seconds, "
+                f"sessions = sessions + excluded.sessions, pomodoros = pomodoros + excluded.pomodoros",
+                (key, seconds, sessions, pomodoros))
+
+    def _find_open_session(self):
+        row = self._db.execute(
+            "SELECT ts, kind FROM events WHERE kind IN (?, ?) ORDER BY id DESC LIMIT 1",
+            (BLOCK, UNBLOCK)).fetchone()
+        return row[0] if row is not None and row[1] == BLOCK else None
+
+    # ------------------------------------------------------------------
+    # Queries
+
+    def daily_totals(self, days=365, today=None):
+        """[(date, seconds, sessions, pomodoros)] for the last `days` days with activity"""
+        today = today or date.today()
+        first = today - timedelta(days=days - 1)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT day, seconds, sessions, pomodoros FROM daily "
+                "WHERE day BETWEEN ? AND ? ORDER BY day",
+                (first.isoformat(), today.isoformat())).fetchall()
+        return [(date.fromisoformat(day), seconds, sessions, pomodoros)
+                for day, seconds, sessions, pomodoros in rows]
+
+    def weekly_totals(self, weeks=52, today=None):
+        """[(week, seconds, sessions, pomodoros)] for the last `weeks` ISO weeks"""
+        today = today or date.today()
+        first = week_key(today - timedelta(weeks=weeks - 1))
+        with self._lock:
+            return self._db.execute(
+                "SELECT week, seconds, sessions, pomodoros FROM weekly "
+                "WHERE week BETWEEN ? AND ? ORDER BY week",
+                (first, week_key(today))).fetchall()
+
+    def summary(self, days=365, now=None):
+        """Totals for today, the last 7 days and the last `days` days"""
+        now = time.time() if now is None else now
+        today = date.fromtimestamp(now)
+        rows = self.daily_totals(days, today)
+        # Count the session in progress too
+        live = dict(split_by_day(self._open_session, now)) if self._open_session else {}
+
+        def seconds_since(first):
+            return (sum(seconds for day, seconds, _, _ in rows if day >= first)
+                    + sum(seconds for day, seconds in live.items() if day >= first))
+
+        return {
+            "today": seconds_since(today),
+            "week": seconds_since(today - timedelta(days=6)),
+            "year": seconds_since(today - timedelta(days=days - 1)),
+            "sessions": sum(row[2] for row in rows),
+            "pomodoros": sum(row[3] for row in rows),
+            "active_days": len({row[0] for row in rows if row[1] > 0} | set(live)),
+        }
+
+    def today_seconds(self, now=None):
+        """
+        Focus time so far today, including the session in progress. Closed
+        sessions are read once per day (or after a session ends), the live
+        part is plain arithmetic.
+        """
+        now = time.time() if now is None else now
+        today = date.fromtimestamp(now)
+        cached = self._closed_today
+        if cached is None or cached[0] != today:
+            rows = self.daily_totals(1, today)
+            cached = self._closed_today = (today, rows[0][1] if rows else 0)
+        start = self._open_session
+        if start is None:
+            return cached[1]
+        midnight = datetime.combine(today, datetime.min.time()).timestamp()
+        return cached[1] + max(0, now - max(start, midnight))
+
+    def rebuild_rollups(self):
+        """Recompute the daily and weekly tables from the event log"""
+        with self._lock:
+            events = self._db.execute("SELECT ts, kind FROM events ORDER BY id").fetchall()
+            with self._db:
+                self._db.execute("DELETE FROM daily")
+                self._db.execute("DELETE FROM weekly")
+                start = None
+                for ts, kind in events:
+                    if kind == BLOCK and start is None:
+                        start = ts
+                        self._add_totals(date.fromtimestamp(ts), 0, sessions=1)
+                    elif kind == UNBLOCK and start is not None:
+                        for day, seconds in split_by_day(start, ts):
+                            self._add_totals(day, seconds)
+                        start = None
+                    elif kind == POMODORO:
+                        self._add_totals(date.fromtimestamp(ts), 0, pomodoros=1)
+            self._open_session = start
+            self._closed_today = None
+
+
+def block_and_record(blocker, history):
+    """
+    Block and bring history up to date; returns success. The session itself
+    is recorded by the YouTubeBlocker doing the blocking (this process or
+    the daemon).
+    """
+    success = blocker.block_youtube()
+    history.reload()
+    return success
+
+
+def unblock_and_record(blocker, history):
+    """Unblock and bring history up to date; returns (success, session length)"""
+    start = history.reload()
+    success = blocker.unblock_youtube()
+    history.reload()
+    return success, time.time() - start if success and start is not None else 0
+
+
+def format_duration(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
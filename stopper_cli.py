@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Command-line interface for YouTube Stopper
+
+Kept separate from youtube_stopper.py (which app.py imports) so a plain
+`status` starts fast: this module imports nothing heavy at load time and
+every subcommand loads only what it needs. With a daemon running, status
+never even imports the blocking engine.
+
+Check the start-up budget with: python benchmark_hosts.py startup --check
+"""
+
+import sys
+
+USAGE = ("Usage: python youtube_stopper.py "
+         "[block|unblock|status|import <file|->|export [file|-]|daemon [stop]|"
+         "profile [on|off <name>...]|schedule [add <days> <HH:MM-HH:MM>|remove <n>|clear]|stats|"
+         "subscribe <url> [name]|unsubscribe <name>|subscriptions [refresh]|timings [n]]")
+
+
+def open_cli_stream(path, mode):
+    """Open a file for the CLI, treating '-' as stdin/stdout"""
+    if path == '-':
+        return sys.stdin if 'r' in mode else sys.stdout
+    return open(path, mode, encoding='utf-8', errors='replace')
+
+
+def open_blocker():
+    """A client for the running daemon, or an in-process YouTubeBlocker"""
+    # The daemon already holds everything in memory
+    from blocker_daemon import connect_blocker
+    blocker = connect_blocker()
+    if blocker is None:
+        from youtube_stopper import YouTubeBlocker
+        blocker = YouTubeBlocker()
+    return blocker
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if args and args[0].lower() == "daemon":
+        sys.exit(run_daemon_command(args[1:]))
+    if args and args[0].lower() == "stats":
+        # Reads the history only, no blocking engine needed
+        run_stats_command()
+        return
+
+    blocker = open_blocker()
+    try:
+        run_command(blocker, args)
+    finally:
+        # Wait for the background DNS flush before the process exits
+        blocker.close()
+
+
+def run_daemon_command(args):
+    from blocker_daemon import run_daemon, stop_daemon
+    if args and args[0].lower() == "stop":
+        if stop_daemon():
+            print("👋 Daemon is shutting down")
+            return 0
+        print("ℹ️ No daemon is running")
+        return 1
+    return run_daemon()
+
+
+def run_command(blocker, args):
+    if len(args) > 0:
+        command = args[0].lower()
+        if command == "block":
+            blocker.block_youtube()
+        elif command == "unblock":
+            blocker.unblock_youtube()
+        elif command == "status":
+            if blocker.is_blocked():
+                print("🔒 YouTube is currently blocked.")
+            else:
+                print("🔓 YouTube is currently accessible.")
+        elif command == "import" and len(args) > 1:
+            stream = open_cli_stream(args[1], 'r')
+            try:
+                added = blocker.import_blocklist(stream)
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+            print(f"📥 Imported {added} new domain(s)")
+        elif command == "export":
+            path = args[1] if len(args) > 1 else '-'
+            stream = open_cli_stream(path, 'w')
+            try:
+                count = blocker.export_blocklist(stream)
+            finally:
+                if stream is not sys.stdout:
+                    stream.close()
+            if stream is not sys.stdout:
+                print(f"📤 Exported {count} domain(s) to {path}")
+        elif command == "profile":
+            run_profile_command(blocker, args[1:])
+        elif command == "schedule":
+            run_schedule_command(blocker, args[1:])
+        elif command in ("subscribe", "unsubscribe", "subscriptions"):
+            run_subscription_command(blocker, command, args[1:])
+        elif command == "timings":
+            run_timings_command(blocker, args[1:])
+        else:
+            print(f"Unknown command: {command}")
+            print(USAGE)
+    else:
+        print("🎯 YouTube Stopper")
+        print(USAGE)
+        if blocker.is_blocked():
+            print("Current status: 🔒 Blocked")
+        else:
+            print("Current status: 🔓 Accessible")
+
+
+
+def run_stats_command():
+    from session_history import SessionHistory, default_history_path, format_duration
+    from blocker_daemon import connect_blocker
+    # With a daemon running, it is the one recording the sessions
+    blocker = connect_blocker()
+    history = blocker.open_history() if blocker else SessionHistory(default_history_path())
+    try:
+        summary = history.summary()
+    finally:
+        history.close()
+        if blocker:
+            blocker.close()
+    print("📊 Focus time")
+    print(f"   Today          {format_duration(summary['today'])}")
+    print(f"   Last 7 days    {format_duration(summary['week'])}")
+    print(f"   Last 365 days  {format_duration(summary['year'])}")
+    print(f"   {summary['sessions']} session(s) on {summary['active_days']} day(s), "
+          f"{summary['pomodoros']} Pomodoro cycle(s)")
+
+
+def run_profile_command(blocker, args):
+    if len(args) > 1 and args[0].lower() in ("on", "off"):
+        enabled = args[0].lower() == "on"
+        try:
+            # Several profiles still mean one hosts file write
+            with blocker.batch():
+                for name in args[1:]:
+                    if not blocker.set_profile_active(name, enabled):
+                        print(f"ℹ️ Profile '{name}' is already {args[0].lower()}")
+        except Exception as e:
+            print(f"❌ {e}")
+            return
+    elif args:
+        print(USAGE)
+        return
+    print("🧩 Profiles:")
+    for name, active in blocker.get_profiles():
+        print(f"   {'✅' if active else '⬜'} {name}")
+
+
+def run_timings_command(blocker, args):
+    from instrumentation import format_operation, TRACE_ENV_VAR
+    limit = int(args[0]) if args and args[0].isdigit() else 10
+    timings = blocker.get_timings(limit)
+    if not timings:
+        print(f"⏱️ No timings recorded; set {TRACE_ENV_VAR}=1 (for the daemon too) to record them")
+        return
+    print(f"⏱️ Last {len(timings)} operation(s):")
+    for record in timings:
+        print(f"   {format_operation(record)}")
+
+
+def run_subscription_command(blocker, command, args):
+    try:
+        if command == "subscribe" and args:
+            result = blocker.add_subscription(args[0], args[1] if len(args) > 1 else None)
+            print(f"📡 Subscribed: {result}")
+            return
+        if command == "unsubscribe" and args:
+            if blocker.remove_subscription(args[0]):
+                print(f"🗑️ Unsubscribed from '{args[0]}'")
+            else:
+                print(f"ℹ️ No subscription named '{args[0]}'")
+            return
+        if command == "subscriptions" and args[:1] == ["refresh"]:
+            for result in blocker.refresh_subscriptions():
+                print(f"🔄 {result}")
+            return
+        if command != "subscriptions" or args:
+            print(USAGE)
+            return
+    except Exception as e:
+        print(f"❌ {e}")
+        return
+    subscriptions = blocker.get_subscriptions()
+    if not subscriptions:
+        print("📡 No subscriptions")
+        return
+    print("📡 Subscriptions:")
+    for name, state in sorted(subscriptions.items()):
+        print(f"   {name}: {state.get('count', 0)} domain(s) from {state['url']}")
+
+
+def run_schedule_command(blocker, args):
+    from focus_schedule import describe_transition
+    import time
+
+    action = args[0].lower() if args else "list"
+    lines = blocker.get_schedule().lines()
+    try:
+        if action == "add" and len(args) > 1:
+            lines = blocker.set_schedule(lines + [" ".join(args[1:])]).lines()
+        elif action == "remove" and len(args) > 1:
+            number = int(args[1])
+            if not 1 <= number <= len(lines):
+                raise IndexError(number)
+            del lines[number - 1]
+            lines = blocker.set_schedule(lines).lines()
+        elif action == "clear":
+            lines = blocker.set_schedule([]).lines()
+        elif action != "list":
+            print(USAGE)
+            return
+    except IndexError:
+        print("❌ No rule with that number")
+        return
+    except Exception as e:
+        # Invalid rule, from the parser or passed on by the daemon
+        print(f"❌ {e}")
+        return
+
+    if not lines:
+        print("⏰ No focus windows scheduled")
+        return
+    print("⏰ Focus windows:")
+    for number, line in enumerate(lines, 1):
+        print(f"   {number}. {line}")
+    schedule = blocker.get_schedule()
+    print(f"   Next change: {describe_transition(schedule.next_transition(time.time()))}")
+    if not getattr(blocker, "remote", False):
+        print("ℹ️ Start the daemon (youtube_stopper.py daemon) to apply the schedule automatically")
+
+
+if __name__ == "__main__":
+    main()
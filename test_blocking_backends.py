@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental hosts file updates of the blocking backends
+
+Run with: python -m pytest -q
+"""
+
+import pytest
+
+from blocking_backends import HostsFileBackend, SECTION_HEADER
+from hosts_file import diff_entries, apply_diff
+from youtube_stopper import DomainTrie
+
+SECTIONS = [
+    [],
+    ["# comment", "0.0.0.0 a.example"],
+    ["0.0.0.0 a.example", "0.0.0.0 b.example", "0.0.0.0 c.example"],
+    ["0.0.0.0 c.example", "", "0.0.0.0 d.example", "0.0.0.0 d.example"],
+    ["# only a comment"],
+]
+
+
+def _entries(lines):
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+
+@pytest.mark.parametrize("current", SECTIONS)
+@pytest.mark.parametrize("target", SECTIONS)
+def test_apply_diff_round_trips(current, target):
+    added, removed = diff_entries(current, target)
+    merged = apply_diff(current, added, removed)
+    assert set(_entries(merged)) == set(_entries(target))
+    # Applying the result again changes nothing
+    assert diff_entries(merged, target) == ([], set())
+
+
+def test_diff_keeps_the_target_order_and_drops_duplicates():
+    added, removed = diff_entries(["0.0.0.0 b.example"],
+                                  ["0.0.0.0 c.example", "0.0.0.0 a.example", "0.0.0.0 c.example"])
+    assert added == ["0.0.0.0 c.example", "0.0.0.0 a.example"]
+    assert removed == {"0.0.0.0 b.example"}
+
+
+def test_diff_ignores_comments_and_whitespace():
+    assert diff_entries(["# old header", "  0.0.0.0 a.example  "],
+                        ["# new header", "0.0.0.0 a.example"]) == ([], set())
+
+
+@pytest.fixture
+def backend(tmp_path):
+    hosts = tmp_path / "hosts"
+    hosts.write_text("127.0.0.1 localhost\n")
+    return HostsFileBackend(hosts, index_path=tmp_path / "hosts_index.json", address="0.0.0.0")
+
+
+def _count_rewrites(backend, monkeypatch):
+    rewrites = []
+    real_rewrite = backend.hosts.rewrite
+    monkeypatch.setattr(backend.hosts, "rewrite",
+                        lambda lines=None: rewrites.append(lines) or real_rewrite(lines))
+    return rewrites
+
+
+def test_apply_writes_only_when_something_changed(backend, monkeypatch):
+    rewrites = _count_rewrites(backend, monkeypatch)
+    added, removed = backend.apply(DomainTrie(["a.example", "b.example"]))
+    assert (added, removed) == (["0.0.0.0 a.example", "0.0.0.0 b.example"], [])
+    assert backend.apply(DomainTrie(["b.example", "a.example"])) == ([], set())
+    assert len(rewrites) == 1
+
+
+def test_apply_changes_only_the_difference(backend):
+    backend.apply(DomainTrie(["a.example", "b.example"]))
+    added, removed = backend.apply(DomainTrie(["b.example", "c.example"]))
+    assert added == ["0.0.0.0 c.example"]
+    assert removed == {"0.0.0.0 a.example"}
+    assert backend.hosts.read_section() == [SECTION_HEADER, "0.0.0.0 b.example", "0.0.0.0 c.example"]
+    assert backend.diff(DomainTrie(["b.example", "c.example"])) == ([], set())
+
+
+def test_restore_rewrites_a_section_that_only_differs_in_comments(backend):
+    trie = DomainTrie(["a.example"])
+    backend.hosts.rewrite(["# edited by hand", "0.0.0.0 a.example"])
+    assert backend.apply(trie) == ([], set())
+    backend.restore(trie)
+    assert backend.hosts.read_section() == [SECTION_HEADER, "0.0.0.0 a.example"]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the snapshot + journal blocklist store
+
+Run with: python -m pytest -q
+"""
+
+import os
+
+import pytest
+
+from blocklist_store import BlocklistStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "blocklist.db"
+
+
+def test_add_remove_and_normalized_lookups(path):
+    store = BlocklistStore(path)
+    assert store.add(["Example.com", "b.example", "b.example"]) == 2
+    assert "example.com" in store
+    assert "EXAMPLE.com." in store
+    assert store.remove(["Example.COM", "missing.example"]) == 1
+    assert list(store) == ["b.example"]
+    with pytest.raises(ValueError):
+        store.add(["not a domain"])
+    assert len(store) == 1
+
+
+def test_journal_is_replayed_on_load(path):
+    store = BlocklistStore(path)
+    store.add(["a.example", "b.example", "c.example"])
+    store.remove(["b.example"])
+    store.add(["b.example"])
+    store.remove(["c.example"])
+    assert not os.path.exists(path)
+    assert list(BlocklistStore(path)) == ["a.example", "b.example"]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(path):
+    store = BlocklistStore(path)
+    store.add([f"d{i}.example" for i in range(50)])
+    store.remove(["d7.example"])
+    store.compact()
+    assert os.path.exists(path)
+    assert not os.path.exists(store.journal_path + ".compacting")
+    # Changes after the compaction go to a fresh journal on top of the snapshot
+    store.add(["d7.example", "new.example"])
+    store.remove(["d8.example"])
+    expected = sorted({f"d{i}.example" for i in range(50)} - {"d8.example"} | {"new.example"})
+    assert list(store) == expected
+    reloaded = BlocklistStore(path)
+    assert list(reloaded) == expected
+    assert len(reloaded) == len(expected)
+    assert "d8.example" not in reloaded
+
+
+def test_compaction_starts_at_the_threshold(path):
+    store = BlocklistStore(path, compact_threshold=10)
+    store.add([f"d{i}.example" for i in range(9)])
+    assert store._compactor is None
+    store.add(["d9.example"])
+    compactor = store._compactor
+    if compactor is not None:
+        compactor.join()
+    assert os.path.exists(path)
+    assert len(BlocklistStore(path)) == 10
+
+
+def test_interrupted_compaction_is_replayed(path):
+    store = BlocklistStore(path)
+    store.add(["a.example", "b.example"])
+    # As if the process died after rotating the journal
+    os.replace(store.journal_path, store.journal_path + ".compacting")
+    reloaded = BlocklistStore(path)
+    reloaded.add(["c.example"])
+    assert list(reloaded) == ["a.example", "b.example", "c.example"]
+    reloaded.compact()
+    assert not os.path.exists(store.journal_path + ".compacting")
+    assert list(BlocklistStore(path)) == ["a.example", "b.example", "c.example"]
+
+
+def test_two_stores_on_the_same_files(path):
+    first, second = BlocklistStore(path), BlocklistStore(path)
+    first.add(["a.example"])
+    second.add(["b.example"])
+    first.add(["c.example"])
+    second.remove(["a.example"])
+    for store in (first, second):
+        store.refresh()
+        assert list(store) == ["b.example", "c.example"]
+        assert len(store) == 2
+
+
+def test_compaction_by_another_store_is_picked_up(path):
+    first, second = BlocklistStore(path), BlocklistStore(path)
+    first.add(["a.example", "b.example"])
+    assert len(second) == 2
+    first.compact()
+    first.add(["c.example"])
+    second.refresh()
+    assert list(second) == ["a.example", "b.example", "c.example"]
+    # Writing through the second store after the compaction loses nothing
+    second.remove(["b.example"])
+    first.refresh()
+    assert list(first) == ["a.example", "c.example"]
+    assert list(BlocklistStore(path)) == ["a.example", "c.example"]
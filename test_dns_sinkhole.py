@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for the DNS sinkhole against a local fake upstream resolver
+
+Run with: python -m pytest -q
+"""
+
+import asyncio
+import struct
+
+from fakes import FakeUpstream, make_query, UPSTREAM_ADDRESS
+from dns_sinkhole import DnsSinkhole, parse_question, response_ttls, RCODE_NXDOMAIN, RCODE_SERVFAIL
+from youtube_stopper import DomainTrie
+
+
+class _Client(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.replies = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.replies.put_nowait(data)
+
+
+async def _ask(sinkhole, name, qid=0x1234, query=None):
+    """Send one query over UDP and return the reply"""
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(
+        _Client, local_addr=("127.0.0.1", 0))
+    try:
+        transport.sendto(query or make_query(qid, name), sinkhole.listen)
+        return await asyncio.wait_for(client.replies.get(), 2)
+    finally:
+        transport.close()
+
+
+async def _ask_tcp(sinkhole, name, qid=0x4321):
+    reader, writer = await asyncio.open_connection(*sinkhole.listen)
+    try:
+        query = make_query(qid, name)
+        writer.write(struct.pack("!H", len(query)) + query)
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+        return await reader.readexactly(length)
+    finally:
+        writer.close()
+
+
+def _answer_address(reply):
+    """The rdata of the first answer of an A reply"""
+    question_end = parse_question(reply)[3]
+    # Name pointer, type, class, TTL and rdlength come before the address
+    rdlength = struct.unpack_from("!H", reply, question_end + 10)[0]
+    return reply[question_end + 12:question_end + 12 + rdlength]
+
+
+def _rcode(reply):
+    return struct.unpack_from("!H", reply, 2)[0] & 0x000F
+
+
+def _run(scenario, upstream=True, **options):
+    """Start a fake upstream and a sinkhole blocking *.youtube.com, then run scenario"""
+    async def main():
+        loop = asyncio.get_running_loop()
+        upstream_transport = None
+        address = ("127.0.0.1", 9)
+        if upstream:
+            upstream_transport, _ = await loop.create_datagram_endpoint(
+                FakeUpstream, local_addr=("127.0.0.1", 0))
+            address = upstream_transport.get_extra_info("sockname")[:2]
+        trie = DomainTrie(["*.youtube.com", "!music.youtube.com"])
+        sinkhole = DnsSinkhole(trie.match, upstream=address, listen=("127.0.0.1", 0), **options)
+        await sinkhole.start()
+        try:
+            return await scenario(sinkhole)
+        finally:
+            await sinkhole.close()
+            if upstream_transport is not None:
+                upstream_transport.close()
+    return asyncio.run(main())
+
+
+def test_blocked_name_is_answered_with_zero_address():
+    async def scenario(sinkhole):
+        reply = await _ask(sinkhole, "www.youtube.com")
+        assert struct.unpack_from("!H", reply)[0] == 0x1234
+        assert _answer_address(reply) == bytes(4)
+        assert sinkhole.stats["blocked"] == 1
+        assert sinkhole.stats["forwarded"] == 0
+    _run(scenario)
+
+
+def test_blocked_name_in_nxdomain_mode():
+    async def scenario(sinkhole):
+        assert _rcode(await _ask(sinkhole, "youtube.com")) == RCODE_NXDOMAIN
+    _run(scenario, block_mode="nxdomain")
+
+
+def test_other_names_are_forwarded_then_cached():
+    async def scenario(sinkhole):
+        first = await _ask(sinkhole, "example.org", qid=1)
+        second = await _ask(sinkhole, "example.org", qid=2)
+        assert _answer_address(first) == UPSTREAM_ADDRESS
+        assert struct.unpack_from("!H", second)[0] == 2
+        assert _answer_address(second) == UPSTREAM_ADDRESS
+        assert sinkhole.stats["forwarded"] == 1
+        assert sinkhole.stats["cache_hits"] == 1
+        assert response_ttls(second)
+    _run(scenario)
+
+
+def test_exception_rule_is_forwarded():
+    async def scenario(sinkhole):
+        reply = await _ask(sinkhole, "music.youtube.com")
+        assert _answer_address(reply) == UPSTREAM_ADDRESS
+    _run(scenario)
+
+
+def test_blocking_can_be_switched_off():
+    async def scenario(sinkhole):
+        sinkhole.blocking_enabled = False
+        reply = await _ask(sinkhole, "www.youtube.com")
+        assert _answer_address(reply) == UPSTREAM_ADDRESS
+    _run(scenario)
+
+
+def test_tcp_queries():
+    async def scenario(sinkhole):
+        reply = await _ask_tcp(sinkhole, "m.youtube.com")
+        assert struct.unpack_from("!H", reply)[0] == 0x4321
+        assert _answer_address(reply) == bytes(4)
+    _run(scenario)
+
+
+def test_unreachable_upstream_gives_servfail():
+    async def scenario(sinkhole):
+        reply = await _ask(sinkhole, "example.org")
+        assert _rcode(reply) == RCODE_SERVFAIL
+        assert sinkhole.stats["upstream_errors"] == 1
+    _run(scenario, upstream=False, timeout=0.2)
+
+
+def test_malformed_query_gives_servfail():
+    async def scenario(sinkhole):
+        # A header that promises a question, followed by a truncated label
+        query = struct.pack("!HHHHHH", 7, 0x0100, 1, 0, 0, 0) + b"\x05you"
+        assert _rcode(await _ask(sinkhole, None, query=query)) == RCODE_SERVFAIL
+    _run(scenario)
+
+
+
+def test_datagrams_shorter_than_a_header_are_dropped():
+    async def scenario(sinkhole):
+        for query in (b"\x01", bytes(11)):
+            try:
+                reply = await asyncio.wait_for(_ask(sinkhole, None, query=query), 0.3)
+            except asyncio.TimeoutError:
+                reply = None
+            assert reply is None
+        assert sinkhole.stats["forwarded"] == 0
+        # The server is still answering
+        assert _answer_address(await _ask(sinkhole, "www.youtube.com")) == bytes(4)
+    _run(scenario)
+
+
+def test_short_tcp_query_closes_the_connection():
+    async def scenario(sinkhole):
+        reader, writer = await asyncio.open_connection(*sinkhole.listen)
+        try:
+            writer.write(struct.pack("!H", 1) + b"\x01")
+            assert await asyncio.wait_for(reader.read(), 2) == b""
+        finally:
+            writer.close()
+        assert sinkhole.stats["forwarded"] == 0
+    _run(scenario)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the DomainTrie rule matcher
+
+Run with: python -m pytest -q
+"""
+
+import pytest
+
+from youtube_stopper import DomainTrie
+
+
+@pytest.mark.parametrize("hostname, blocked", [
+    ("example.com", True),
+    ("www.example.com", False),
+    ("youtube.com", True),
+    ("m.youtube.com", True),
+    ("a.b.youtube.com", True),
+    ("notyoutube.com", False),
+    ("youtube.com.evil.example", False),
+    ("com", False),
+])
+def test_exact_and_wildcard_rules(hostname, blocked):
+    trie = DomainTrie(["example.com", "*.youtube.com"])
+    assert trie.match(hostname) is blocked
+
+
+@pytest.mark.parametrize("hostname, blocked", [
+    # An exact exception only lets that one name through
+    ("music.youtube.com", False),
+    ("www.music.youtube.com", True),
+    # A wildcard exception covers its whole subtree...
+    ("studio.youtube.com", False),
+    ("a.studio.youtube.com", False),
+    # ...until a more specific block rule below it
+    ("ads.studio.youtube.com", True),
+    ("x.ads.studio.youtube.com", False),
+    ("tv.ads.studio.youtube.com", True),
+    ("www.youtube.com", True),
+])
+def test_the_most_specific_rule_wins(hostname, blocked):
+    trie = DomainTrie(["*.youtube.com", "!music.youtube.com", "!*.studio.youtube.com",
+                       "ads.studio.youtube.com", "*.tv.ads.studio.youtube.com"])
+    assert trie.match(hostname) is blocked
+
+
+def test_an_exception_beats_a_block_at_the_same_level():
+    trie = DomainTrie(["*.example.com", "!*.example.com"])
+    assert not trie.match("example.com")
+    assert not trie.match("www.example.com")
+    trie = DomainTrie(["example.com", "!example.com"])
+    assert not trie.match("example.com")
+
+
+def test_rule_order_does_not_matter():
+    rules = ["*.youtube.com", "!music.youtube.com", "youtu.be"]
+    names = ["youtube.com", "music.youtube.com", "www.youtube.com", "youtu.be"]
+    forward, backward = DomainTrie(rules), DomainTrie(reversed(rules))
+    assert [forward.match(n) for n in names] == [backward.match(n) for n in names]
+
+
+def test_case_and_trailing_dots_are_ignored():
+    trie = DomainTrie(["*.YouTube.com."])
+    assert trie.match("WWW.youtube.COM.")
+    assert len(DomainTrie(["a.example", "A.example.", "a.example"])) == 1
+
+
+def test_concrete_hosts_skip_exceptions_and_duplicates():
+    trie = DomainTrie(["*.youtube.com", "!www.youtube.com", "m.youtube.com", "youtu.be"])
+    hosts = trie.concrete_hosts(wildcard_prefixes=("www", "m"))
+    assert hosts == ["youtube.com", "m.youtube.com", "youtu.be"]
+    assert trie.hosts_entries("0.0.0.0")[0] == "0.0.0.0 youtube.com"
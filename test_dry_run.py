@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+End-to-end tests of YouTubeBlocker on the dry-run backend
+
+YOUTUBE_STOPPER_BACKEND=dry-run keeps the block list in memory, so the
+whole blocker runs without admin rights or a hosts file. conftest.py
+points HOME at a temporary directory for every test.
+
+Run with: python -m pytest -q
+"""
+
+import pytest
+
+from blocking_backends import DryRunBackend, BACKEND_ENV_VAR
+from youtube_stopper import YouTubeBlocker
+
+
+@pytest.fixture
+def blocker(monkeypatch):
+    monkeypatch.setenv(BACKEND_ENV_VAR, "dry-run")
+    blocker = YouTubeBlocker()
+    yield blocker
+    blocker.close()
+
+
+def _applies(blocker):
+    return [op for op in blocker.backend.operations if op[0] == "apply"]
+
+
+def test_the_environment_selects_the_dry_run_backend(blocker, isolated_home):
+    assert isinstance(blocker.backend, DryRunBackend)
+    assert blocker.hosts_file is None
+    assert not blocker.needs_admin()
+    assert blocker.store.snapshot_path.startswith(str(isolated_home))
+
+
+def test_block_and_unblock(blocker):
+    assert not blocker.is_blocked()
+    assert blocker.block_youtube()
+    assert blocker.is_blocked()
+    assert "127.0.0.1 www.youtube.com" in blocker.backend.entries
+    assert blocker.is_domain_blocked("m.youtube.com")
+    # Blocking twice does not apply again
+    assert blocker.block_youtube()
+    assert len(_applies(blocker)) == 1
+
+    assert blocker.unblock_youtube()
+    assert not blocker.is_blocked()
+    assert blocker.backend.entries is None
+    assert blocker.backend.operations[-1] == ("clear", 0)
+
+
+def test_custom_domains_while_blocked(blocker):
+    blocker.block_youtube()
+    assert blocker.add_custom_domain("Reddit.com")
+    assert blocker.has_custom_domain("reddit.com")
+    assert "127.0.0.1 reddit.com" in blocker.backend.entries
+    # A domain that is already there changes nothing
+    assert not blocker.add_custom_domain("reddit.com")
+    assert len(_applies(blocker)) == 2
+
+    assert blocker.remove_custom_domain("REDDIT.com")
+    assert not blocker.has_custom_domain("reddit.com")
+    assert "127.0.0.1 reddit.com" not in blocker.backend.entries
+    assert not blocker.remove_custom_domain("reddit.com")
+    assert len(_applies(blocker)) == 3
+
+
+def test_custom_domains_while_unblocked_apply_on_the_next_block(blocker):
+    assert blocker.add_custom_domain("news.example")
+    assert _applies(blocker) == []
+    blocker.block_youtube()
+    assert "127.0.0.1 news.example" in blocker.backend.entries
+
+
+def test_batch_applies_once(blocker):
+    blocker.block_youtube()
+    with blocker.batch():
+        for name in ("a", "b", "c"):
+            blocker.add_custom_domain(f"{name}.example")
+        blocker.remove_custom_domain("b.example")
+    assert len(_applies(blocker)) == 2
+    assert blocker.get_custom_domains() == ["a.example", "c.example"]
+
+
+def test_flushes_are_requested(blocker):
+    blocker.block_youtube()
+    blocker.flush_scheduler.close()
+    assert ("flush", 0) in blocker.backend.operations
+
+
+def test_sessions_are_recorded(blocker):
+    blocker.block_youtube()
+    blocker.unblock_youtube()
+    history = blocker.open_history()
+    try:
+        assert history.open_session is None
+        assert history.summary()["sessions"] == 1
+    finally:
+        history.close()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for scheduled focus windows across DST changes
+
+Run with: python -m pytest -q
+"""
+
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from focus_schedule import Schedule, ScheduleRule
+
+# US DST in 2026: clocks go 02:00 -> 03:00 on March 8 and 02:00 -> 01:00 on November 1
+SPRING_FORWARD = date(2026, 3, 8)
+FALL_BACK = date(2026, 11, 1)
+
+
+@pytest.fixture(autouse=True)
+def new_york(monkeypatch):
+    """Run in America/New_York local time"""
+    if not hasattr(time, "tzset") or not os.path.exists("/usr/share/zoneinfo/America/New_York"):
+        pytest.skip("needs time.tzset and the tz database")
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _utc(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def test_window_on_the_spring_forward_day():
+    start, end = ScheduleRule.parse("daily 09:00-17:00").window(SPRING_FORWARD)
+    # 09:00 EDT, and still eight hours long
+    assert _utc(start) == datetime(2026, 3, 8, 13, 0)
+    assert end - start == 8 * 3600
+
+
+def test_window_across_the_spring_forward_gap_is_an_hour_shorter():
+    start, end = ScheduleRule.parse("daily 01:00-04:00").window(SPRING_FORWARD)
+    assert _utc(start) == datetime(2026, 3, 8, 6, 0)
+    assert _utc(end) == datetime(2026, 3, 8, 8, 0)
+    assert end - start == 2 * 3600
+
+
+def test_start_inside_the_spring_forward_gap_moves_forward():
+    start, _ = ScheduleRule.parse("daily 02:30-05:00").window(SPRING_FORWARD)
+    # 02:30 never happens; the window opens at 03:30 EDT
+    assert _utc(start) == datetime(2026, 3, 8, 7, 30)
+
+
+def test_window_across_the_fall_back_hour_is_an_hour_longer():
+    start, end = ScheduleRule.parse("daily 01:00-04:00").window(FALL_BACK)
+    assert _utc(start) == datetime(2026, 11, 1, 5, 0)
+    assert _utc(end) == datetime(2026, 11, 1, 9, 0)
+    assert end - start == 4 * 3600
+
+
+def test_repeated_hour_uses_its_first_pass():
+    start, end = ScheduleRule.parse("daily 01:30-02:00").window(FALL_BACK)
+    # 01:30 EDT, then through the repeated hour to 02:00 EST
+    assert _utc(start) == datetime(2026, 11, 1, 5, 30)
+    assert _utc(end) == datetime(2026, 11, 1, 7, 0)
+
+
+def test_overnight_window_across_fall_back():
+    start, end = ScheduleRule.parse("sat 22:00-06:00").window(date(2026, 10, 31))
+    assert end - start == 9 * 3600
+    assert _utc(end) == datetime(2026, 11, 1, 11, 0)
+
+
+@pytest.mark.parametrize("day, expected_utc_hour", [(SPRING_FORWARD, 13), (FALL_BACK, 14)])
+def test_next_transition_crosses_the_change(day, expected_utc_hour):
+    schedule = Schedule.parse(["daily 09:00-17:00"])
+    evening_before = datetime.combine(day - timedelta(days=1), datetime.min.time()).timestamp() + 18 * 3600
+    at, active = schedule.next_transition(evening_before)
+    assert active
+    assert _utc(at) == datetime(day.year, day.month, day.day, expected_utc_hour, 0)
+    assert not schedule.is_active(at - 1)
+    assert schedule.is_active(at)
+    at, active = schedule.next_transition(at)
+    assert not active
+    assert _utc(at) == datetime(day.year, day.month, day.day, expected_utc_hour + 8, 0)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for the hosts file engine: crash recovery and the section index
+
+A crash is simulated by running the rewrite in a child process that
+exits on the spot (os._exit, no cleanup) when it reaches a given step.
+
+Run with: python -m pytest -q
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import hosts_file
+from hosts_file import HostsFile, START_MARKER, TEMP_PREFIX
+
+HERE = Path(__file__).parent
+
+OLD_SECTION = ["0.0.0.0 youtube.com"]
+NEW_SECTION = ["0.0.0.0 youtube.com", "0.0.0.0 www.youtube.com"]
+
+# Rewrites the hosts file with NEW_SECTION and dies at the nth span named step
+CRASHING_REWRITE = """
+import os
+import sys
+import hosts_file
+
+path, index_path, step, nth = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+real_span = hosts_file.span
+reached = []
+
+def crashing_span(name):
+    if name == step:
+        reached.append(name)
+        if len(reached) == nth:
+            os._exit(9)
+    return real_span(name)
+
+hosts_file.span = crashing_span
+hosts_file.HostsFile(path, index_path=index_path).rewrite(%r)
+""" % (NEW_SECTION,)
+
+
+@pytest.fixture
+def hosts(tmp_path):
+    """A hosts file with OLD_SECTION written through HostsFile"""
+    path = tmp_path / "hosts"
+    path.write_text("127.0.0.1 localhost\n")
+    hosts = HostsFile(path, index_path=tmp_path / "hosts_index.json")
+    hosts.rewrite(OLD_SECTION)
+    return hosts
+
+
+def _crash_rewrite(hosts, step, nth=1):
+    result = subprocess.run([sys.executable, "-c", CRASHING_REWRITE,
+                             hosts.path, hosts.index_path, step, str(nth)],
+                            cwd=HERE, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 9, result.stderr
+
+
+def _leftovers(hosts):
+    return sorted(name for name in os.listdir(os.path.dirname(hosts.path))
+                  if name.startswith(TEMP_PREFIX))
+
+
+def _recover(hosts):
+    """recover() on a fresh HostsFile, as on the next start"""
+    recovered = HostsFile(hosts.path, index_path=hosts.index_path)
+    actions = recovered.recover(grace=0)
+    assert not _leftovers(recovered)
+    text = Path(recovered.path).read_text()
+    assert text.startswith("127.0.0.1 localhost\n")
+    assert text.count(START_MARKER) == 1
+    assert recovered.section_intact()
+    return recovered, [action for action, _ in actions]
+
+
+def test_crash_after_the_temp_file_is_written_rolls_back(hosts):
+    # The journal is the commit point; without one the write never happened
+    _crash_rewrite(hosts, "journal")
+    assert len(_leftovers(hosts)) == 1
+    recovered, actions = _recover(hosts)
+    assert actions == ["rolled back"]
+    assert recovered.read_section() == OLD_SECTION
+
+
+def test_crash_after_the_journal_is_written_rolls_forward(hosts):
+    _crash_rewrite(hosts, "index")
+    assert len(_leftovers(hosts)) == 2
+    recovered, actions = _recover(hosts)
+    assert actions == ["rolled forward"]
+    assert recovered.read_section() == NEW_SECTION
+
+
+def test_crash_after_the_index_is_saved_rolls_forward(hosts):
+    _crash_rewrite(hosts, "rename")
+    recovered, actions = _recover(hosts)
+    assert actions == ["rolled forward"]
+    assert recovered.read_section() == NEW_SECTION
+
+
+def test_crash_after_the_rename_keeps_the_new_file(hosts):
+    # The second fsync is the directory's, right after the rename
+    _crash_rewrite(hosts, "fsync", nth=2)
+    assert len(_leftovers(hosts)) == 1
+    recovered, actions = _recover(hosts)
+    assert actions == []
+    assert recovered.read_section() == NEW_SECTION
+
+
+def test_hosts_file_changed_before_recovery_rolls_back(hosts):
+    _crash_rewrite(hosts, "rename")
+    with open(hosts.path, "a") as f:
+        f.write("10.0.0.1 intranet\n")
+    recovered, actions = _recover(hosts)
+    assert actions == ["rolled back"]
+    assert recovered.read_section() == OLD_SECTION
+    assert Path(hosts.path).read_text().endswith("10.0.0.1 intranet\n")
+
+
+def test_failed_rename_restores_the_previous_index(hosts, monkeypatch):
+    digest = hosts.expected_digest()
+
+    def failing_replace(src, dst):
+        raise OSError("rename failed")
+
+    monkeypatch.setattr(hosts_file.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        hosts.rewrite(NEW_SECTION)
+    monkeypatch.undo()
+    assert not _leftovers(hosts)
+    reopened = HostsFile(hosts.path, index_path=hosts.index_path)
+    assert reopened.expected_digest() == digest
+    assert reopened.section_intact()
+    assert reopened.read_section() == OLD_SECTION
+
+
+def _count_scans(hosts, monkeypatch):
+    scans = []
+    real_scan = hosts._scan_section
+    monkeypatch.setattr(hosts, "_scan_section", lambda: scans.append(1) or real_scan())
+    return scans
+
+
+def test_index_is_used_while_the_fingerprint_matches(hosts, monkeypatch):
+    scans = _count_scans(hosts, monkeypatch)
+    assert hosts.read_section() == OLD_SECTION
+    assert hosts.has_section()
+    assert scans == []
+
+
+def test_index_is_rebuilt_when_the_file_changes(hosts, monkeypatch):
+    scans = _count_scans(hosts, monkeypatch)
+    # Moves the section: the remembered offsets are wrong now
+    text = Path(hosts.path).read_text()
+    Path(hosts.path).write_text("10.0.0.1 intranet\n" + text)
+    assert hosts.read_section() == OLD_SECTION
+    assert scans == [1]
+    # The rebuilt index is trusted again
+    assert hosts.read_section() == OLD_SECTION
+    assert scans == [1]
+
+
+def test_index_is_rebuilt_for_a_replaced_file(hosts, monkeypatch):
+    scans = _count_scans(hosts, monkeypatch)
+    replacement = hosts.path + ".new"
+    Path(replacement).write_text("127.0.0.1 localhost\n")
+    os.replace(replacement, hosts.path)
+    assert hosts.read_section() is None
+    assert scans == [1]
+    assert not hosts.section_intact()
+
+
+def test_index_saved_by_another_process_is_picked_up(hosts):
+    other = HostsFile(hosts.path, index_path=hosts.index_path)
+    assert other.read_section() == OLD_SECTION
+    hosts.rewrite(NEW_SECTION)
+    assert other.read_section() == NEW_SECTION
+    assert other.section_intact()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the fast-start CLI
+
+Run with: python -m pytest -q (add --benchmark to check the start-up budget)
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from blocker_daemon import DAEMON_ADDRESS_ENV_VAR
+
+HERE = Path(__file__).parent
+
+# Modules `status` must never import (requests is loaded only by the subscription commands)
+GUI_ONLY_MODULES = {"tkinter", "PIL", "pystray", "psutil", "requests"}
+
+# Runs `status` and then lists every module it left in sys.modules
+LIST_MODULES = """
+import sys
+import stopper_cli
+try:
+    stopper_cli.main(["status"])
+finally:
+    print(" ".join(sys.modules), file=sys.stderr)
+"""
+
+
+def _cli_env(tmp_path):
+    # No daemon to talk to and nothing written to the real home directory
+    return dict(os.environ, HOME=str(tmp_path), YOUTUBE_STOPPER_BACKEND="dry-run",
+                **{DAEMON_ADDRESS_ENV_VAR: str(tmp_path / "absent.sock")})
+
+
+@pytest.mark.benchmark
+def test_startup_check_passes(tmp_path):
+    result = subprocess.run([sys.executable, str(HERE / "benchmark_hosts.py"), "startup", "5", "--check"],
+                            env=_cli_env(tmp_path), capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Within the start-up budget" in result.stdout
+
+
+def test_status_imports_no_gui_modules(tmp_path):
+    result = subprocess.run([sys.executable, "-c", LIST_MODULES], cwd=HERE,
+                            env=_cli_env(tmp_path), capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert "YouTube is currently" in result.stdout
+    imported = {name.split(".")[0] for name in result.stderr.split()}
+    assert not imported & set(GUI_ONLY_MODULES)
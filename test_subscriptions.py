@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for remote blocklist subscriptions against a local http.server
+
+Run with: python -m pytest -q
+"""
+
+import pytest
+
+DOMAINS = [f"ads{i}.example" for i in range(100)]
+
+
+def test_subscribe_fetches_and_blocks(blocker, blocklist_server):
+    result = blocker.add_subscription(blocklist_server.url, "ads")
+    assert result.status == "updated"
+    assert (result.added, result.removed, result.count) == (100, 0, 100)
+    assert blocker.is_domain_blocked("ads7.example")
+    assert blocker.get_subscriptions()[result.name]["count"] == 100
+
+
+def test_refresh_without_changes_is_not_modified(blocker, blocklist_server):
+    blocker.add_subscription(blocklist_server.url, "ads")
+    hosts_before = blocker.backend.hosts.read_section()
+    result, = blocker.refresh_subscriptions()
+    assert result.status == "unchanged"
+    assert not result.changed
+    assert result.count == 100
+    assert blocker.backend.hosts.read_section() == hosts_before
+
+
+def test_refresh_merges_the_delta(blocker, blocklist_server):
+    blocker.add_subscription(blocklist_server.url, "ads")
+    blocklist_server.body = "".join(f"0.0.0.0 {domain}\n"
+                          for domain in DOMAINS[10:] + ["new1.example", "new2.example"]).encode()
+    blocklist_server.version = 2
+    result, = blocker.refresh_subscriptions()
+    assert result.status == "updated"
+    assert (result.added, result.removed, result.count) == (2, 10, 92)
+    assert blocker.is_domain_blocked("new1.example")
+    assert not blocker.is_domain_blocked("ads0.example")
+
+
+def test_same_content_with_a_new_etag(blocker, blocklist_server):
+    blocker.add_subscription(blocklist_server.url, "ads")
+    blocklist_server.version = 2
+    result, = blocker.refresh_subscriptions()
+    assert result.status == "same-content"
+    assert not result.changed
+
+
+def test_invalid_names_are_rejected(blocker, blocklist_server):
+    with pytest.raises(ValueError):
+        blocker.add_subscription(blocklist_server.url, "../../etc/evil")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Shared clock tick for YouTube Stopper's Tkinter timers
+
+The session timer and the Pomodoro timer both subscribe to one
+TickService instead of running their own after(1000) loops. The service
+wakes once per whole second of time.monotonic(), calls every subscriber
+with the current time, and sleeps again. Subscribers compute what to show
+from deadlines rather than counting callbacks, so a late or skipped tick
+never makes a timer drift.
+
+While the window is minimized nothing is drawn, so the service stops
+ticking and runs one catch-up tick when the window is restored. Given a
+RefreshManager, it follows that instead and reports its wake-ups there. Timed
+events that must happen even when minimized (the end of a Pomodoro
+period) use call_at(), which is a single one-shot timer.
+"""
+
+import math
+import time
+import itertools
+
+
+class Subscription:
+    """Returned by TickService.subscribe(); cancel() unsubscribes"""
+
+    def __init__(self, service, key):
+        self._service = service
+        self._key = key
+
+    def cancel(self):
+        self._service._subscribers.pop(self._key, None)
+
+
+class TickService:
+    """
+    Calls subscribers once per monotonic second while the window is visible
+    """
+
+    def __init__(self, root, clock=time.monotonic, refresh=None):
+        self.root = root
+        self.clock = clock
+        self.refresh = refresh
+        self.paused = False
+        self.ticks = 0
+        self.text_updates = 0
+        self.text_skips = 0
+        self._subscribers = {}
+        self._keys = itertools.count()
+        self._after_id = None
+        self._texts = {}
+        if refresh is not None:
+            refresh.add_listener(self._on_visibility_changed)
+        else:
+            root.bind("<Unmap>", self._on_unmap, add="+")
+            root.bind("<Map>", self._on_map, add="+")
+
+    def subscribe(self, callback):
+        """Call callback(now) on every tick, starting right away"""
+        key = next(self._keys)
+        self._subscribers[key] = callback
+        callback(self.clock())
+        self._schedule()
+        return Subscription(self, key)
+
+    def call_at(self, deadline, callback):
+        """
+        Call callback() once the monotonic clock reaches deadline, even while
+        minimized. Returns an after id for root.after_cancel().
+        """
+        delay_ms = max(0, math.ceil((deadline - self.clock()) * 1000))
+        return self.root.after(delay_ms, callback)
+
+    def set_text(self, widget, text):
+        """Configure a widget's text only if it differs from the last value set"""
+        key = str(widget)
+        if self._texts.get(key) == text:
+            self.text_skips += 1
+            return False
+        self._texts[key] = text
+        widget.config(text=text)
+        self.text_updates += 1
+        return True
+
+    def pause(self):
+        self.paused = True
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def resume(self):
+        """Start ticking again, bringing every subscriber up to date at once"""
+        if not self.paused:
+            return
+        self.paused = False
+        self._tick()
+
+    # ------------------------------------------------------------------
+    # Internals
+
+    def _schedule(self):
+        if self.paused or self._after_id is not None or not self._subscribers:
+            return
+        now = self.clock()
+        # Wake just after the next whole second; after() may fire a little early
+        delay_ms = math.ceil((math.floor(now) + 1 - now) * 1000) + 1
+        self._after_id = self.root.after(delay_ms, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self.ticks += 1
+        if self.refresh is not None:
+            self.refresh.record_wakeup()
+        now = self.clock()
+        for callback in list(self._subscribers.values()):
+            try:
+                callback(now)
+            except Exception as e:
+                print(f"❌ Timer update failed: {e}")
+        self._schedule()
+
+    def _on_visibility_changed(self, visible):
+        if visible:
+            self.resume()
+        else:
+            self.pause()
+
+    def _on_unmap(self, event):
+        # Child widgets share the toplevel's bindings; only the window itself counts
+        if event.widget is self.root:
+            self.pause()
+
+    def _on_map(self, event):
+        if event.widget is self.root:
+            self.resume()
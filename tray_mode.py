@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+System-tray mode for YouTube Stopper
+
+Closing the window no longer has to stop the app. TrayController owns the
+long-lived state (the blocker and the session history) and switches
+between two modes on the main thread:
+
+- window: a Tk root and the full YouTubeStopperApp, built from scratch
+- tray: the Tk tree destroyed, leaving only a pystray icon whose menu can
+  block/unblock, toggle profiles and show the status
+
+The Tk interpreter and its widgets are the bulk of the app's memory, so
+they are released completely while in the tray and rebuilt only when the
+window is opened again. The two icon images are drawn once with Pillow
+and cached. Resident memory is sampled with psutil (if installed) on each
+switch so the saving can be checked.
+
+pystray and Pillow are optional: without them the app runs window-only.
+"""
+
+import gc
+import functools
+import importlib.util
+
+from blocker_daemon import connect_blocker
+from session_history import format_duration
+from session_history import block_and_record, unblock_and_record
+
+WINDOW, TRAY, QUIT = "window", "tray", "quit"
+
+ICON_SIZE = 64
+
+
+def tray_available():
+    """True if pystray and Pillow can be imported (checked without importing them)"""
+    return all(importlib.util.find_spec(name) is not None for name in ("pystray", "PIL"))
+
+
+def resident_memory():
+    """Resident set size of this process in bytes, or None without psutil"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+@functools.lru_cache(maxsize=None)
+def icon_image(blocked):
+    """The tray icon for a state, drawn on first use and reused afterwards"""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGBA", (ICON_SIZE, ICON_SIZE), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    accent = "#86efac" if blocked else "#fca5a5"
+    draw.rounded_rectangle((2, 10, 62, 54), radius=12, fill="#232946", outline=accent, width=4)
+    # Play button, struck through while blocking is on
+    draw.polygon([(25, 20), (25, 44), (45, 32)], fill="#eebbc3")
+    if blocked:
+        draw.line((12, 52, 52, 12), fill=accent, width=6)
+    return image
+
+
+class TrayController:
+    """
+    Runs the app as a tray icon plus a window that exists only while open.
+    app_factory(root, blocker=..., history=..., on_hide=...) builds the window.
+    """
+
+    def __init__(self, app_factory):
+        self.app_factory = app_factory
+        # Use the background daemon when it is running, otherwise block in-process
+        self.blocker = connect_blocker()
+        if self.blocker is None:
+            from youtube_stopper import YouTubeBlocker
+            self.blocker = YouTubeBlocker()
+        self.blocker.start_watching()
+        self.blocker.start_watchdog()
+        self.history = self.blocker.open_history()
+        self.mode = WINDOW
+        self.icon = None
+        self.tray_failed = False
+        self._blocked = None
+        # Resident memory with the window open and in the tray, for the report
+        self.memory = {WINDOW: None, TRAY: None}
+
+    def run(self, start_in_tray=False):
+        self.mode = TRAY if start_in_tray else WINDOW
+        try:
+            while self.mode != QUIT:
+                if self.mode == WINDOW:
+                    self.run_window()
+                else:
+                    self.run_tray()
+        finally:
+            self.blocker.close()
+            self.history.close()
+
+    # ------------------------------------------------------------------
+    # Window mode
+
+    def run_window(self):
+        import tkinter as tk
+
+        root = tk.Tk()
+        on_hide = None if self.tray_failed else self.hide_window
+        self.app_factory(root, blocker=self.blocker, history=self.history, on_hide=on_hide)
+        # Closing the window quits, unless it was hidden to the tray
+        self.mode = QUIT
+        root.mainloop()
+
+    def hide_window(self):
+        """Called by the app just before it destroys its widgets"""
+        self.memory[WINDOW] = resident_memory()
+        self.mode = TRAY
+
+    # ------------------------------------------------------------------
+    # Tray mode
+
+    def run_tray(self):
+        # Let go of the Tk interpreter and everything the widgets held
+        gc.collect()
+        try:
+            import pystray
+            self._blocked = self.blocker.is_blocked()
+            self.icon = pystray.Icon("youtube_stopper", icon_image(self._blocked),
+                                     self.title(), menu=self.build_menu(pystray))
+            self.icon.run(setup=self.on_tray_ready)
+        except Exception as e:
+            print(f"⚠️ System tray unavailable ({e}), showing the window instead")
+            self.tray_failed = True
+            self.mode = WINDOW
+        finally:
+            self.icon = None
+
+    def on_tray_ready(self, icon):
+        icon.visible = True
+        self.memory[TRAY] = resident_memory()
+        before, after = self.memory[WINDOW], self.memory[TRAY]
+        if after is None:
+            print("📥 YouTube Stopper is running in the system tray")
+        elif before is None:
+            print(f"📥 Running in the system tray ({after / 2**20:.1f} MB resident)")
+        else:
+            print(f"📥 Running in the system tray: {after / 2**20:.1f} MB resident, "
+                  f"{(before - after) / 2**20:.1f} MB less than with the window open")
+
+    def build_menu(self, pystray):
+        item = pystray.MenuItem
+        return pystray.Menu(
+            item(lambda _: self.status_text(), None, enabled=False),
+            item(lambda _: "Unblock YouTube" if self._blocked else "Block YouTube", self.toggle_block),
+            item("Profiles", pystray.Menu(lambda: self.profile_items(pystray))),
+            pystray.Menu.SEPARATOR,
+            item("Open YouTube Stopper", self.open_window, default=True),
+            item("Quit", self.quit),
+        )
+
+    def profile_items(self, pystray):
+        # Read once per menu build, not once per item
+        return [pystray.MenuItem(name, self.profile_action(name),
+                                 checked=lambda _, active=active: active)
+                for name, active in self.blocker.get_profiles()]
+
+    def profile_action(self, name):
+        # A plain function: pystray passes (icon, item) based on the argument count
+        def toggle(icon, item):
+            self.toggle_profile(name, icon, item)
+        return toggle
+
+    def title(self):
+        return f"YouTube Stopper - {'Blocked' if self._blocked else 'Accessible'}"
+
+    def status_text(self):
+        """Menu header; also brings the icon up to date with outside changes"""
+        self.refresh_icon()
+        state = "✅ Blocked" if self._blocked else "⚠️ Accessible"
+        return f"{state} · {format_duration(self.history.today_seconds())} today"
+
+    def refresh_icon(self):
+        blocked = self.blocker.is_blocked()
+        if blocked != self._blocked and self.icon is not None:
+            self._blocked = blocked
+            self.icon.icon = icon_image(blocked)
+            self.icon.title = self.title()
+        self._blocked = blocked
+
+    def toggle_block(self, icon, item):
+        try:
+            if self.blocker.is_blocked():
+                success, _ = unblock_and_record(self.blocker, self.history)
+            else:
+                success = block_and_record(self.blocker, self.history)
+        except (Exception, SystemExit) as e:
+            # SystemExit too: run_as_admin() exits, which must not end the tray loop
+            success = False
+            print(f"❌ Tray action failed: {e}")
+        if not success:
+            icon.notify("Could not change blocking. Please run as administrator.", "YouTube Stopper")
+        self.refresh_icon()
+        icon.update_menu()
+
+    def toggle_profile(self, name, icon, item):
+        try:
+            self.blocker.set_profile_active(name, not item.checked)
+        except Exception as e:
+            print(f"❌ Could not switch profile '{name}': {e}")
+        icon.update_menu()
+
+    def open_window(self, icon, item):
+        self.mode = WINDOW
+        icon.stop()
+
+    def quit(self, icon, item):
+        self.mode = QUIT
+        icon.stop()
@@ -11,35 +11,287 @@ This application helps users avoid YouTube distractions by:
 
 import os
 import sys
-import subprocess
+import functools
+import threading
 from pathlib import Path
+from contextlib import contextmanager
 
+import instrumentation
+from instrumentation import traced, span
+from hosts_file import START_MARKER, END_MARKER
+from blocking_backends import select_backend
+from dns_flush import FlushScheduler
+from hosts_watcher import FileWatcher, stat_fingerprint
+from blocklist_formats import iter_domains
+from blocklist_store import BlocklistStore
+from blocking_profiles import ProfileManager
 
-class YouTubeBlocker:
+# Subdomains written to the hosts file for a wildcard rule like *.example.com
+WILDCARD_HOSTS_PREFIXES = ('www', 'm')
+
+
+def _serialized(method):
+    """Run a method that changes the blocked state under the blocker's write lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class DomainTrie:
     """
-    Core class that handles the blocking functionality
+    Reversed-label trie for blocking rules
+
+    Rules:
+        example.com        block exactly example.com
+        *.example.com      block example.com and every subdomain
+        !accounts.x.com    never block accounts.x.com
+        !*.x.com           never block x.com or any of its subdomains
+
+    A lookup walks one trie node per label from the TLD down, so it costs
+    O(label count) no matter how many rules there are. The most specific
+    rule wins, and an exception beats a block rule at the same level.
     """
 
-    def __init__(self):
-        # Define YouTube domains to block
-        self.youtube_domains = [
-            'youtube.com',
-            'www.youtube.com',
-            'm.youtube.com',
-            'music.youtube.com',
-            'youtu.be',
-            'gaming.youtube.com'
-        ]
+    EXACT_BLOCK = 1
+    EXACT_EXCEPT = 2
+    WILDCARD_BLOCK = 4
+    WILDCARD_EXCEPT = 8
+
+    class _Node:
+        __slots__ = ('children', 'flags')
+
+        def __init__(self):
+            self.children = {}
+            self.flags = 0
+
+    def __init__(self, rules=()):
+        self.root = self._Node()
+        self.rules = []
+        for rule in rules:
+            self.add_rule(rule)
+
+    def __len__(self):
+        return len(self.rules)
+
+    @staticmethod
+    def parse_rule(rule):
+        """Split a rule into (hostname, flag)"""
+        rule = rule.strip().lower().rstrip('.')
+        exception = rule.startswith('!')
+        if exception:
+            rule = rule[1:]
+        wildcard = rule.startswith('*.')
+        if wildcard:
+            rule = rule[2:]
+        if wildcard:
+            flag = DomainTrie.WILDCARD_EXCEPT if exception else DomainTrie.WILDCARD_BLOCK
+        else:
+            flag = DomainTrie.EXACT_EXCEPT if exception else DomainTrie.EXACT_BLOCK
+        return rule, flag
 
-        # Windows hosts file location
-        self.hosts_file = r"C:\Windows\System32\drivers\etc\hosts"
+    def add_rule(self, rule):
+        hostname, flag = self.parse_rule(rule)
+        if not hostname:
+            return
+        node = self.root
+        for label in reversed(hostname.split('.')):
+            child = node.children.get(label)
+            if child is None:
+                child = node.children[label] = self._Node()
+            node = child
+        if not node.flags & flag:
+            node.flags |= flag
+            self.rules.append((hostname, flag))
+
+    def match(self, hostname):
+        """Return True if hostname is blocked by the rule set"""
+        node = self.root
+        verdict = False
+        for label in reversed(hostname.lower().rstrip('.').split('.')):
+            node = node.children.get(label)
+            if node is None:
+                return verdict
+            flags = node.flags
+            if flags & self.WILDCARD_EXCEPT:
+                verdict = False
+            elif flags & self.WILDCARD_BLOCK:
+                verdict = True
+        if node.flags & self.EXACT_EXCEPT:
+            return False
+        if node.flags & self.EXACT_BLOCK:
+            return True
+        return verdict
+
+    def hosts_entries(self, address):
+        """Hosts file lines pointing every concrete hostname at address"""
+        return [f"{address} {hostname}" for hostname in self.concrete_hosts()]
+
+    def concrete_hosts(self, wildcard_prefixes=WILDCARD_HOSTS_PREFIXES):
+        """
+        Return the minimal list of hostnames to write to a hosts file, in rule
+        order: no duplicates and nothing an exception rule lets through.
+        Wildcards cannot be expressed in a hosts file, so *.example.com is
+        written as example.com plus the common wildcard_prefixes subdomains.
+        """
+        hosts = []
+        seen = set()
+        for hostname, flag in self.rules:
+            if flag == self.EXACT_BLOCK:
+                candidates = [hostname]
+            elif flag == self.WILDCARD_BLOCK:
+                candidates = [hostname] + [f"{prefix}.{hostname}" for prefix in wildcard_prefixes]
+            else:
+                continue
+            for candidate in candidates:
+                if candidate not in seen and self.match(candidate):
+                    seen.add(candidate)
+                    hosts.append(candidate)
+        return hosts
 
+
+class YouTubeBlocker:
+    """
+    Core class that handles the blocking functionality
+    """
+
+    def __init__(self, hosts_file=None, backend=None):
         # Backup file location
         self.backup_file = Path.home() / "youtube_stopper_hosts_backup.txt"
 
+        # Plain-text custom blocklist (import/export format, migrated on first use)
+        self.custom_file = Path.home() / "youtube_stopper_custom_blocklist.txt"
+
+        # Custom blocklist store: compact snapshot plus append-only journal
+        self.store = BlocklistStore(Path.home() / "youtube_stopper_blocklist.db",
+                                    legacy_text_path=self.custom_file)
+
+        # Named profiles (video, social, news, custom) compiled to hosts fragments
+        self.profiles = ProfileManager(Path.home() / "youtube_stopper_profiles", self.store)
+
         # Marker comments for our entries
-        self.start_marker = "# YouTube Stopper - START"
-        self.end_marker = "# YouTube Stopper - END"
+        self.start_marker = START_MARKER
+        self.end_marker = END_MARKER
+
+        # Remote blocklists, each kept as a "sub-..." profile (see blocklist_subscriptions.py)
+        self.subscriptions_file = Path.home() / "youtube_stopper_subscriptions.json"
+        self._subscriptions = None
+
+        # Focus sessions, recorded on every block and unblock whoever asked for
+        # it: GUI, tray, CLI or the daemon's schedule (see session_history.py)
+        self.history_file = Path.home() / "youtube_stopper_history.db"
+        self._history = None
+
+        # Recurring focus windows, enforced by the daemon (see focus_schedule.py)
+        self.schedule_file = Path.home() / "youtube_stopper_schedule.json"
+
+        # Sidecar index with the byte offsets of our section in the hosts file
+        self.index_file = Path.home() / "youtube_stopper_hosts_index.json"
+
+        # Blocking engine (hosts file, DNS sinkhole or dry run), chosen at startup
+        self.backend = backend or select_backend(hosts_file=hosts_file, index_path=self.index_file)
+
+        # File holding the block list, None for backends without one
+        self.hosts_file = self.backend.path
+
+        # Finish or undo a hosts file write cut short by a crash or power loss
+        try:
+            for action, path in self.backend.recover():
+                print(f"🩹 Interrupted hosts file write {action} ({os.path.basename(path)})")
+        except OSError as e:
+            print(f"⚠️ Could not recover an interrupted hosts file write: {e}")
+
+        # DNS flushes run in the background and bursts are merged into one
+        self.flush_scheduler = FlushScheduler(self.backend.flush, self._report_flush)
+        self.flush_callback = None
+
+        # In-memory view of the blocked state. It is only trusted while a
+        # file watcher is running to invalidate it.
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._own_writes = {}
+        self._watcher = None
+        self.cache_hits = 0
+
+        # Nesting depth of batch() and whether an update was deferred
+        self._batch_depth = 0
+        self._batch_pending = False
+
+        # Held while the blocked state changes; the watchdog repairs under it too
+        self.write_lock = threading.RLock()
+        self.watchdog = None
+
+        # Per-stage timings, off unless YOUTUBE_STOPPER_TRACE is set (see instrumentation.py)
+        instrumentation.configure_from_env()
+
+    def start_watching(self, poll_interval=1.0):
+        """
+        Keep the blocked state in memory, invalidated by a file watcher so
+        edits made by other programs (hosts file or blocklist store) are
+        still picked up
+        """
+        if self._watcher is None:
+            paths = [self.store.snapshot_path, self.store.journal_path]
+            if self.hosts_file:
+                paths.append(self.hosts_file)
+            self._watcher = FileWatcher(paths, self._on_file_changed, poll_interval)
+            self._watcher.start()
+
+    def start_watchdog(self):
+        """
+        Restore our hosts section whenever another program changes it.
+        Returns False for backends without a hosts file or without admin rights.
+        """
+        if getattr(self.backend, 'hosts', None) is None or self.needs_admin():
+            return False
+        if self.watchdog is None:
+            from hosts_watchdog import HostsWatchdog
+            self.watchdog = HostsWatchdog(self)
+            self.watchdog.start()
+        return True
+
+    def stop_watchdog(self):
+        if self.watchdog is not None:
+            self.watchdog.stop()
+            print(f"🛡️ Hosts watchdog: {self.watchdog.repairs} repair(s) this session")
+            self.watchdog = None
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _on_file_changed(self, path):
+        if not self.hosts_file or path != os.path.abspath(self.hosts_file):
+            # The store only replays what another process appended
+            self.store.refresh()
+            return
+        # Ignore the notification for a write we made ourselves
+        if stat_fingerprint(path) == self._own_writes.get(path):
+            return
+        with self._cache_lock:
+            self._cache.pop('blocked', None)
+
+    def _cached(self, key):
+        """Return (True, value) if key is cached and the watcher is running"""
+        if self._watcher is None:
+            return False, None
+        with self._cache_lock:
+            if key in self._cache:
+                self.cache_hits += 1
+                return True, self._cache[key]
+        return False, None
+
+    def _remember(self, key, value, written_path=None):
+        if written_path is not None:
+            path = os.path.abspath(str(written_path))
+            self._own_writes[path] = stat_fingerprint(path)
+        if self._watcher is not None:
+            with self._cache_lock:
+                self._cache[key] = value
 
     def is_admin(self):
         """
@@ -61,6 +313,7 @@ class YouTubeBlocker:
             return True
         else:
             # Re-run the program with admin rights
+            import subprocess
             try:
                 subprocess.run([
                     'powershell', '-Command',
@@ -75,13 +328,10 @@ class YouTubeBlocker:
         """
         Create a backup of the original hosts file before modification
         """
+        import shutil
         try:
-            if os.path.exists(self.hosts_file):
-                with open(self.hosts_file, 'r', encoding='utf-8') as original:
-                    content = original.read()
-
-                with open(self.backup_file, 'w', encoding='utf-8') as backup:
-                    backup.write(content)
+            if self.hosts_file and os.path.exists(self.hosts_file):
+                shutil.copyfile(self.hosts_file, self.backup_file)
 
                 print(f"✅ Hosts file backed up to: {self.backup_file}")
                 return True
@@ -93,116 +343,253 @@ class YouTubeBlocker:
         """
         Check if YouTube is currently blocked
         """
+        hit, blocked = self._cached('blocked')
+        if hit:
+            return blocked
         try:
-            with open(self.hosts_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                return self.start_marker in content
+            blocked = self.backend.status()
         except Exception as e:
             print(f"❌ Error checking block status: {e}")
             return False
+        self._remember('blocked', blocked)
+        return blocked
 
     def get_custom_domains(self):
-        custom_file = Path.home() / "youtube_stopper_custom_blocklist.txt"
-        if custom_file.exists():
-            with open(custom_file, 'r', encoding='utf-8') as f:
-                return [line.strip() for line in f if line.strip() and not line.startswith('#')]
-        return []
+        """Return the custom domains in sorted order"""
+        return list(self.store)
+
+    def has_custom_domain(self, domain):
+        """Membership check that does not build the whole domain list"""
+        return domain in self.store
 
     def add_custom_domain(self, domain):
         """Add a custom domain to the blocklist"""
-        custom_file = Path.home() / "youtube_stopper_custom_blocklist.txt"
-        domains = set(self.get_custom_domains())
-        domains.add(domain)
-        with open(custom_file, 'w', encoding='utf-8') as f:
-            for d in sorted(domains):
-                f.write(d + '\n')
-        
+        return self.add_custom_domains([domain]) > 0
+
+    def remove_custom_domain(self, domain):
+        """Remove a custom domain from the blocklist"""
+        return self.remove_custom_domains([domain]) > 0
+
+    @traced("add")
+    def add_custom_domains(self, new_domains):
+        """
+        Add many domains at once: the blocklist is written once and the
+        hosts file updated once. Returns the number of domains added.
+        """
+        with span("store"):
+            added = self.store.add(new_domains)
+        if not added:
+            return 0
+
         # If blocking is currently active, update the hosts file immediately
         if self.is_blocked():
-            print(f"🔄 Updating hosts file to include {domain}...")
+            print(f"🔄 Updating hosts file to include {added} new domain(s)...")
             self.update_blocked_domains()
+        return added
 
-    def remove_custom_domain(self, domain):
-        """Remove a custom domain from the blocklist"""
-        custom_file = Path.home() / "youtube_stopper_custom_blocklist.txt"
-        domains = set(self.get_custom_domains())
-        if domain in domains:
-            domains.remove(domain)
-            with open(custom_file, 'w', encoding='utf-8') as f:
-                for d in sorted(domains):
-                    f.write(d + '\n')
-            
-            # If blocking is currently active, update the hosts file immediately
-            if self.is_blocked():
-                print(f"🔄 Removing {domain} from hosts file...")
-                self.update_blocked_domains()
+    @traced("remove")
+    def remove_custom_domains(self, old_domains):
+        """
+        Remove many domains at once with a single blocklist and hosts write.
+        Returns the number of domains removed.
+        """
+        with span("store"):
+            removed = self.store.remove(old_domains)
+        if not removed:
+            return 0
+
+        # If blocking is currently active, update the hosts file immediately
+        if self.is_blocked():
+            print(f"🔄 Removing {removed} domain(s) from hosts file...")
+            self.update_blocked_domains()
+        return removed
+
+    def import_blocklist(self, lines):
+        """
+        Import domains from hosts, plain-domain or AdBlock-style lines.
+        Returns the number of new domains added.
+        """
+        return self.add_custom_domains(iter_domains(lines))
+
+    def export_blocklist(self, out):
+        """Write the custom blocklist, one domain per line, to a text stream"""
+        return self.store.export_text(out)
+
+    def get_schedule(self):
+        """Return the saved focus Schedule"""
+        from focus_schedule import Schedule
+        return Schedule.load(self.schedule_file)
+
+    def set_schedule(self, lines):
+        """Validate and save schedule rules, return the new Schedule"""
+        from focus_schedule import Schedule
+        schedule = Schedule.parse(lines)
+        schedule.save(self.schedule_file)
+        return schedule
+
+    def get_rule_trie(self):
+        """
+        Return the DomainTrie for the rules of the active profiles.
+        It is rebuilt only when a profile or the active set has changed.
+        """
+        return self.profiles.rule_trie()
+
+    def get_blocklist(self):
+        """The active profiles as a CompiledBlocklist for the backend"""
+        with span("compile"):
+            return self.profiles.compile(getattr(self.backend, 'address', '127.0.0.1'))
+
+    def count_blocked_domains(self):
+        """Number of hostnames the active profiles block"""
+        return len(self.get_blocklist().hosts_entries(getattr(self.backend, 'address', '127.0.0.1')))
+
+    def get_profiles(self):
+        """Return [(name, active)] for every profile"""
+        active = self.profiles.active()
+        return [(name, name in active) for name in self.profiles.names()]
+
+    def set_profile_active(self, name, enabled):
+        """
+        Switch a profile on or off. While blocking is active the hosts file
+        is updated right away. Returns True if anything changed.
+        """
+        changed = self.profiles.set_active(name, enabled)
+        if changed and self.is_blocked():
+            self.update_blocked_domains()
+        return changed
+
+    def _subscription_manager(self):
+        if self._subscriptions is None:
+            from blocklist_subscriptions import SubscriptionManager
+            self._subscriptions = SubscriptionManager(self.profiles, self.subscriptions_file)
+        return self._subscriptions
+
+    def get_subscriptions(self):
+        """Return {name: state} for every remote blocklist subscription"""
+        return self._subscription_manager().subscriptions()
+
+    def add_subscription(self, url, name=None):
+        """Subscribe to a remote list and block it; returns a FetchResult"""
+        result = self._subscription_manager().add(url, name)
+        if self.is_blocked():
+            self.update_blocked_domains()
+        return result
+
+    def remove_subscription(self, name):
+        """Unsubscribe from a remote list; returns False if it did not exist"""
+        removed = self._subscription_manager().remove(name)
+        if removed and self.is_blocked():
+            self.update_blocked_domains()
+        return removed
+
+    def refresh_subscriptions(self):
+        """
+        Fetch every subscription. The hosts file is only touched when a list
+        actually changed. Returns a FetchResult per subscription.
+        """
+        results = self._subscription_manager().refresh()
+        if any(result.changed for result in results) and self.is_blocked():
+            self.update_blocked_domains()
+        return results
+
+    def is_domain_blocked(self, hostname):
+        """Check a single hostname against the rule set"""
+        return self.get_rule_trie().match(hostname)
+
+    def get_timings(self, limit=10):
+        """The last operation timing records, newest last (empty while timing is off)"""
+        return instrumentation.recent_operations(limit)
 
     def get_all_blocked_domains(self):
-        """Get all domains to block, including variations of custom domains"""
-        all_domains = self.youtube_domains.copy()
-        
-        # Add custom domains with common variations
-        for domain in self.get_custom_domains():
-            all_domains.append(domain)
-            # Add www prefix if not already present
-            if not domain.startswith('www.'):
-                all_domains.append(f'www.{domain}')
-            # Add mobile prefix for social media sites
-            if any(social in domain for social in ['facebook', 'instagram', 'twitter', 'tiktok']):
-                all_domains.append(f'm.{domain}')
-        
-        return all_domains
+        """Get all concrete hostnames to block, including variations of custom domains"""
+        return self.get_blocklist().concrete_hosts()
+
+    def flush_dns(self):
+        """
+        Request a DNS cache flush so blocking changes take effect.
+        Returns immediately; the result goes to flush_callback.
+        """
+        self.flush_scheduler.request()
+        return True
+
+    def get_history(self):
+        """The SessionHistory this blocker records into (opened on first use)"""
+        if self._history is None:
+            from session_history import SessionHistory
+            self._history = SessionHistory(self.history_file)
+        return self._history
+
+    def open_history(self):
+        """A SessionHistory for the GUI, tray or `stats`; the caller closes it"""
+        from session_history import SessionHistory
+        return SessionHistory(self.history_file)
+
+    def _record_session(self, blocked):
+        """Open or close the focus session; a history error never fails blocking"""
+        try:
+            if blocked:
+                self.get_history().start_session(self.count_blocked_domains())
+            else:
+                self.get_history().end_session()
+        except Exception as e:
+            print(f"⚠️ Could not record the focus session: {e}")
+
+    def set_flush_callback(self, callback):
+        """Receive a FlushResult (from a background thread) after every flush"""
+        self.flush_callback = callback
 
+    def _report_flush(self, result):
+        if self.flush_callback is not None:
+            self.flush_callback(result)
+        elif result.ok:
+            print(f"🔄 DNS cache flushed ({result.latency * 1000:.0f} ms)")
+        else:
+            print("⚠️ Could not flush DNS cache - you may need to restart your browser")
+
+    def close(self):
+        """Finish pending DNS flushes and release watchers and backend resources"""
+        self.stop_watchdog()
+        self.flush_scheduler.close()
+        self.stop_watching()
+        self.backend.close()
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
+    def needs_admin(self):
+        """True if the backend needs admin rights and we do not have them"""
+        return self.backend.requires_admin and not self.is_admin()
+
+    @_serialized
+    @traced("block")
     def block_youtube(self):
         """
         Add YouTube domains to hosts file to block access
         """
-        if not self.is_admin():
+        if self.needs_admin():
             print("Requesting admin rights...")
             self.run_as_admin()
             return
 
         try:
             # First, create a backup
-            if not self.backup_file.exists():
+            if self.hosts_file and not self.backup_file.exists():
                 self.backup_hosts_file()
 
-            # Read current hosts file
-            with open(self.hosts_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
             # Check if already blocked
-            if self.start_marker in content:
+            if self.backend.status():
                 print("🔒 YouTube is already blocked")
+                self._record_session(True)
                 return True
 
-            # Prepare blocking entries
-            blocking_entries = [
-                "",  # Empty line for spacing
-                self.start_marker,
-                "# Blocking YouTube domains for productivity"
-            ]
-
-            for domain in self.get_all_blocked_domains():
-                blocking_entries.append(f"127.0.0.1 {domain}")
-
-            blocking_entries.append(self.end_marker)
-            blocking_entries.append("")  # Empty line at the end
+            # Hand the compiled rule set to the blocking engine
+            self.backend.apply(self.get_blocklist())
+            self._remember('blocked', True, written_path=self.hosts_file)
 
-            # Add to hosts file
-            new_content = content + "\n" + "\n".join(blocking_entries)
-
-            with open(self.hosts_file, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-
-            # Flush DNS cache (Windows)
-            try:
-                subprocess.run(['ipconfig', '/flushdns'],
-                             capture_output=True, check=True)
-                print("🔄 DNS cache flushed")
-            except subprocess.CalledProcessError:
-                print("⚠️ Could not flush DNS cache")
+            # Flush DNS cache
+            self.flush_dns()
 
+            self._record_session(True)
             print("🔒 YouTube blocked successfully!")
             return True
 
@@ -210,46 +597,26 @@ class YouTubeBlocker:
             print(f"❌ Error blocking YouTube: {e}")
             return False
 
+    @_serialized
+    @traced("unblock")
     def unblock_youtube(self):
         """
         Remove YouTube blocking entries from hosts file
         """
-        if not self.is_admin():
+        if self.needs_admin():
             print("Requesting admin rights...")
             self.run_as_admin()
             return
 
         try:
-            with open(self.hosts_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            # Remove lines between markers
-            new_lines = []
-            skip = False
-
-            for line in lines:
-                if self.start_marker in line:
-                    skip = True
-                    continue
-                elif self.end_marker in line:
-                    skip = False
-                    continue
-
-                if not skip:
-                    new_lines.append(line)
-
-            # Write back to hosts file
-            with open(self.hosts_file, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
+            # Copy everything except our section in a single pass
+            self.backend.clear()
+            self._remember('blocked', False, written_path=self.hosts_file)
 
             # Flush DNS cache
-            try:
-                subprocess.run(['ipconfig', '/flushdns'],
-                             capture_output=True, check=True)
-                print("🔄 DNS cache flushed")
-            except subprocess.CalledProcessError:
-                print("⚠️ Could not flush DNS cache")
+            self.flush_dns()
 
+            self._record_session(False)
             print("🔓 YouTube unblocked successfully!")
             return True
 
@@ -257,57 +624,67 @@ class YouTubeBlocker:
             print(f"❌ Error unblocking YouTube: {e}")
             return False
 
+    @_serialized
+    @traced("repair")
+    def repair_block(self):
+        """
+        Write our hosts section back after another program changed it.
+        Only the section is rewritten; the rest of the file is kept.
+        """
+        written = self.backend.restore(self.get_blocklist())
+        self._remember('blocked', True, written_path=self.hosts_file)
+        self.flush_dns()
+        return written
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several domain edits into one hosts file write and one DNS flush.
+
+            with blocker.batch():
+                for domain in domains:
+                    blocker.add_custom_domain(domain)
+
+        The write lock is held for the whole batch, so other threads wait
+        instead of having their updates deferred into it.
+        """
+        with self.write_lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._batch_pending:
+                    self._batch_pending = False
+                    self.update_blocked_domains()
+
+    @_serialized
+    @traced("update")
     def update_blocked_domains(self):
-        """Update the hosts file with current domain list (when blocking is active)"""
-        if not self.is_admin():
+        """
+        Update the hosts file with current domain list (when blocking is active).
+        Only the entries that were added or removed are changed, and nothing
+        is written or flushed when the section is already up to date.
+        """
+        if self._batch_depth:
+            self._batch_pending = True
+            return True
+
+        if self.needs_admin():
             print("Admin rights required to update blocked domains")
             return False
             
         try:
-            # First unblock (remove old entries)
-            with open(self.hosts_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            new_lines = []
-            skip = False
-
-            for line in lines:
-                if self.start_marker in line:
-                    skip = True
-                    continue
-                elif self.end_marker in line:
-                    skip = False
-                    continue
-
-                if not skip:
-                    new_lines.append(line)
-
-            # Add updated blocking entries
-            blocking_entries = [
-                "",  # Empty line for spacing
-                self.start_marker,
-                "# Blocking domains for productivity"
-            ]
-
-            for domain in self.get_all_blocked_domains():
-                blocking_entries.append(f"127.0.0.1 {domain}")
-
-            blocking_entries.append(self.end_marker)
-            blocking_entries.append("")  # Empty line at the end
-
-            # Write updated content
-            new_content = "".join(new_lines) + "\n".join(blocking_entries)
-            
-            with open(self.hosts_file, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            # The backend diffs once and rewrites only the changed entries
+            added, removed = self.backend.apply(self.get_blocklist())
+            if not added and not removed:
+                print("✅ Hosts file already up to date")
+                return True
+            print(f"🔄 Applied hosts changes: +{len(added)} / -{len(removed)} entries")
+            self._remember('blocked', True, written_path=self.hosts_file)
 
             # Flush DNS cache
-            try:
-                subprocess.run(['ipconfig', '/flushdns'],
-                             capture_output=True, check=True)
-                print("🔄 DNS cache flushed - changes should take effect immediately")
-            except subprocess.CalledProcessError:
-                print("⚠️ Could not flush DNS cache - you may need to restart your browser")
+            self.flush_dns()
 
             return True
 
@@ -316,27 +693,13 @@ class YouTubeBlocker:
             return False
 
 
+def main():
+    """Command-line entry point, see stopper_cli.py"""
+    from stopper_cli import main as cli_main
+    cli_main()
+
+
 if __name__ == "__main__":
-    blocker = YouTubeBlocker()
-
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
-        if command == "block":
-            blocker.block_youtube()
-        elif command == "unblock":
-            blocker.unblock_youtube()
-        elif command == "status":
-            if blocker.is_blocked():
-                print("🔒 YouTube is currently blocked.")
-            else:
-                print("🔓 YouTube is currently accessible.")
-        else:
-            print(f"Unknown command: {command}")
-            print("Usage: python youtube_stopper.py [block|unblock|status]")
-    else:
-        print("🎯 YouTube Stopper")
-        print("Usage: python youtube_stopper.py [block|unblock|status]")
-        if blocker.is_blocked():
-            print("Current status: 🔒 Blocked")
-        else:
-            print("Current status: 🔓 Accessible")
+    # Let stopper_cli reuse this module instead of importing it a second time
+    sys.modules.setdefault("youtube_stopper", sys.modules[__name__])
+    main()